@@ -0,0 +1,286 @@
+# --- Cubo analítico en memoria ---
+# Mantiene una copia columnar de los tickets en arreglos NumPy (técnico, problema, ubicación, urgencia y estado
+# codificados como enteros, y las fechas como datetime64) para responder agrupaciones y filtros arbitrarios
+# sin ir a la BD: cada agrupación es un `np.bincount` sobre los códigos combinados.
+#
+# La copia se actualiza de forma incremental: en cada `refresh` se leen solo los tickets nuevos y los que
+# publicaron un evento en `ticket_events` desde la última vez. Cada ANALYTICS_FULL_REFRESH_SECONDS se recarga
+# completa, para incluir cambios hechos por otros procesos. Las consultas se hacen sobre un `CubeSnapshot`
+# inmutable (el que retorna `get_cube`), así no se mezclan con un `refresh` en curso en otro hilo.
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select, or_
+
+from database import SessionLocal
+from models import Ticket, User, ProblemType, Location, TicketStatus, TicketUrgency
+import ticket_events
+
+ANALYTICS_FULL_REFRESH_SECONDS = float(os.environ.get("ANALYTICS_FULL_REFRESH_SECONDS", 3600))
+
+# Dimensiones categóricas: nombre -> (columna del ticket, etiqueta para la interfaz)
+CATEGORICAL_DIMENSIONS = {
+    'technician': (Ticket.technician_id, 'Técnico'),
+    'problem': (Ticket.problem_type_id, 'Tipo de Problema'),
+    'location': (Ticket.location_id, 'Ubicación'),
+    'urgency': (Ticket.urgency, 'Urgencia'),
+    'status': (Ticket.status, 'Estado'),
+}
+DATE_FIELDS = {'created_at': 'Creación', 'assigned_at': 'Asignación', 'resolved_at': 'Resolución'}
+TIME_BUCKETS = {'day': 'día', 'week': 'semana', 'month': 'mes'}
+
+# Etiqueta del código 0, reservado para los valores nulos de cada dimensión.
+NULL_LABELS = {'technician': 'Sin asignar', 'problem': 'Sin clasificar', 'location': 'Sin especificar',
+               'urgency': 'Sin clasificar', 'status': 'N/A'}
+
+# Por encima de esta cantidad de combinaciones posibles se agrupa con `np.unique` en vez de `np.bincount`.
+_MAX_BINCOUNT_CELLS = 20_000_000
+
+
+def dimension_choices() -> dict[str, str]:
+    """Dimensiones disponibles para agrupar, con su etiqueta (incluye las fechas por día/semana/mes)."""
+    choices = {name: label for name, (_, label) in CATEGORICAL_DIMENSIONS.items()}
+    for field, field_label in DATE_FIELDS.items():
+        for bucket, bucket_label in TIME_BUCKETS.items():
+            choices[f'{field}_{bucket}'] = f'{field_label} por {bucket_label}'
+    return choices
+
+
+def _to_datetime64_array(values) -> np.ndarray:
+    """Convierte fechas (UTC, con o sin zona horaria) a datetime64; los `None` quedan como NaT."""
+    return np.array([value.replace(tzinfo=None) if value is not None and value.tzinfo else value for value in values],
+                    dtype='datetime64[s]')
+
+
+@dataclass(frozen=True, eq=False)
+class CubeSnapshot:
+    """
+    Estado del cubo en un momento dado. `TicketCube.refresh` arma uno nuevo y lo reemplaza en una sola
+    asignación, así las consultas que tomaron un snapshot no ven columnas a medio actualizar.
+    """
+    ids: np.ndarray
+    codes: dict[str, np.ndarray]
+    dates: dict[str, np.ndarray]
+    sla_violation: np.ndarray
+    # Etiquetas por código; el código 0 corresponde a NULL.
+    labels: dict[str, list[str]]
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- Consultas ---
+    def mask(self, date_field: str = 'created_at', start: datetime | None = None, end: datetime | None = None,
+             where: dict[str, list[str]] | None = None, sla_violation: bool | None = None) -> np.ndarray:
+        """
+        Filas que cumplen todos los filtros: rango [start, end) sobre `date_field`, valores permitidos por
+        dimensión (`where={'urgency': ['Alta', 'Media']}`, por etiqueta) y el indicador de SLA.
+        """
+        selected = np.ones(len(self.ids), dtype=bool)
+        if start is not None:
+            selected &= self.dates[date_field] >= np.datetime64(start, 's')
+        if end is not None:
+            selected &= self.dates[date_field] < np.datetime64(end, 's')
+        for name, allowed in (where or {}).items():
+            allowed_codes = [code for code, label in enumerate(self.labels[name]) if label in allowed]
+            selected &= np.isin(self.codes[name], allowed_codes)
+        if sla_violation is not None:
+            selected &= self.sla_violation == sla_violation
+        return selected
+
+    def _dimension(self, name: str, selected: np.ndarray) -> tuple[np.ndarray, list, np.ndarray]:
+        """Códigos (0..n-1) de la dimensión para las filas seleccionadas, sus etiquetas y la máscara de válidas."""
+        if name in self.codes:
+            return self.codes[name][selected], self.labels[name], np.ones(int(selected.sum()), dtype=bool)
+
+        field, bucket = name.rsplit('_', 1)
+        values = self.dates[field][selected]
+        valid = ~np.isnat(values)
+        if bucket == 'month':
+            units = values.astype('datetime64[M]').astype(np.int64)
+            to_label = lambda unit: str(np.datetime64(unit, 'M'))
+        elif bucket == 'week':
+            # El 1970-01-01 fue jueves: se cuentan semanas a partir del lunes 1969-12-29.
+            units = (values.astype('datetime64[D]').astype(np.int64) + 3) // 7
+            to_label = lambda unit: str(np.datetime64(unit * 7 - 3, 'D'))
+        else:
+            units = values.astype('datetime64[D]').astype(np.int64)
+            to_label = lambda unit: str(np.datetime64(unit, 'D'))
+
+        if not valid.any():
+            return np.zeros(len(values), dtype=np.int64), [], valid
+        first = int(units[valid].min())
+        codes = np.where(valid, units - first, 0)
+        labels = [to_label(first + i) for i in range(int(codes.max()) + 1)]
+        return codes, labels, valid
+
+    def group_by(self, dimensions: list[str], selected: np.ndarray | None = None) -> list[tuple]:
+        """
+        Cuenta los tickets por combinación de valores de `dimensions` dentro de `selected`.
+        Retorna tuplas `(etiqueta_1, ..., etiqueta_n, cantidad)` ordenadas por cantidad descendente.
+        """
+        if selected is None:
+            selected = np.ones(len(self.ids), dtype=bool)
+        if not dimensions:
+            return [(int(selected.sum()),)]
+
+        parts = [self._dimension(name, selected) for name in dimensions]
+        valid = np.logical_and.reduce([part[2] for part in parts])
+        sizes = [max(1, len(part[1])) for part in parts]
+        flat = np.ravel_multi_index([part[0][valid] for part in parts], sizes)
+
+        cells = int(np.prod(sizes, dtype=np.int64))
+        if cells <= _MAX_BINCOUNT_CELLS:
+            counts = np.bincount(flat, minlength=cells)
+            keys = np.nonzero(counts)[0]
+            counts = counts[keys]
+        else:
+            keys, counts = np.unique(flat, return_counts=True)
+
+        order = np.argsort(-counts, kind='stable')
+        indexes = np.unravel_index(keys[order], sizes)
+        return [
+            tuple(parts[d][1][indexes[d][i]] for d in range(len(parts))) + (int(counts[order][i]),)
+            for i in range(len(order))
+        ]
+
+
+
+class TicketCube:
+    """Copia columnar de los tickets para análisis ad-hoc."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirty: set[int] = set()
+        self._loaded_at = 0.0
+        self._labels = {name: [NULL_LABELS[name]] for name in CATEGORICAL_DIMENSIONS}
+        self._code_of: dict[str, dict] = {name: {None: 0} for name in CATEGORICAL_DIMENSIONS}
+        self._code_of['urgency'].update({u: i + 1 for i, u in enumerate(TicketUrgency)})
+        self._code_of['status'].update({s: i + 1 for i, s in enumerate(TicketStatus)})
+        self._labels['urgency'] += [u.value.title() for u in TicketUrgency]
+        self._labels['status'] += [s.value.replace('_', ' ').title() for s in TicketStatus]
+        self.snapshot = self._snapshot(np.empty(0, dtype=np.int64),
+                                       {name: np.empty(0, dtype=np.int32) for name in CATEGORICAL_DIMENSIONS},
+                                       {field: np.empty(0, dtype='datetime64[s]') for field in DATE_FIELDS},
+                                       np.empty(0, dtype=bool))
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def mark_dirty(self, ticket_id: int):
+        self._dirty.add(ticket_id)
+
+    def _snapshot(self, ids, codes, dates, sla_violation) -> CubeSnapshot:
+        labels = {name: list(labels) for name, labels in self._labels.items()}
+        return CubeSnapshot(ids, codes, dates, sla_violation, labels)
+
+    # --- Carga ---
+    def _refresh_labels(self, db):
+        """Agrega a los diccionarios los técnicos, problemas y ubicaciones nuevos (los códigos existentes no cambian)."""
+        sources = {
+            'technician': db.query(User.id, User.username),
+            'problem': db.query(ProblemType.id, ProblemType.name),
+            'location': db.query(Location.id, Location.description),
+        }
+        for name, query in sources.items():
+            code_of, labels = self._code_of[name], self._labels[name]
+            for member_id, label in query.all():
+                if member_id not in code_of:
+                    code_of[member_id] = len(labels)
+                    labels.append(label or f'#{member_id}')
+                else:
+                    labels[code_of[member_id]] = label or f'#{member_id}'
+
+    def _load_rows(self, db, condition=None, chunk_size: int = 50_000):
+        columns = [Ticket.id] + [column for column, _ in CATEGORICAL_DIMENSIONS.values()] + \
+                  [getattr(Ticket, field) for field in DATE_FIELDS] + [Ticket.sla_violation_sent]
+        statement = select(*columns).order_by(Ticket.id)
+        if condition is not None:
+            statement = statement.where(condition)
+
+        names = list(CATEGORICAL_DIMENSIONS)
+        ids, codes, dates, sla = [], {n: [] for n in names}, {f: [] for f in DATE_FIELDS}, []
+        result = db.connection().execute(statement.execution_options(yield_per=chunk_size))
+        for chunk in result.partitions():
+            columns = list(zip(*chunk))
+            ids.append(np.array(columns[0], dtype=np.int64))
+            for offset, name in enumerate(names, start=1):
+                code_of = self._code_of[name]
+                codes[name].append(np.array([code_of.get(value, 0) for value in columns[offset]], dtype=np.int32))
+            for offset, field in enumerate(DATE_FIELDS, start=1 + len(names)):
+                dates[field].append(_to_datetime64_array(columns[offset]))
+            sla.append(np.array(columns[-1], dtype=bool))
+
+        def join(parts, dtype):
+            return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+        return (join(ids, np.int64),
+                {n: join(v, np.int32) for n, v in codes.items()},
+                {f: join(v, 'datetime64[s]') for f, v in dates.items()},
+                join(sla, bool))
+
+    def refresh(self, full: bool = False):
+        """Lee los tickets nuevos y los modificados. Con `full=True` (o vencido el intervalo) recarga todo."""
+        with self._lock:
+            current = self.snapshot
+            full = full or not len(current) or time.monotonic() - self._loaded_at > ANALYTICS_FULL_REFRESH_SECONDS
+            dirty, self._dirty = self._dirty, set()
+            if not full and not dirty:
+                condition = Ticket.id > int(current.ids[-1])
+            elif not full:
+                condition = or_(Ticket.id > int(current.ids[-1]), Ticket.id.in_(dirty))
+            else:
+                condition = None
+
+            db = SessionLocal()
+            try:
+                self._refresh_labels(db)
+                ids, codes, dates, sla = self._load_rows(db, condition)
+            finally:
+                db.close()
+
+            if full:
+                self.snapshot = self._snapshot(ids, codes, dates, sla)
+                self._loaded_at = time.monotonic()
+                return
+
+            # Los que ya están en el cubo se sobrescriben en su posición (sobre copias: el snapshot actual puede estar
+            # en uso). Los demás se insertan en orden de id: no siempre son mayores al último, porque los ids pueden
+            # confirmarse fuera de orden y los tickets de otros procesos llegan después (ver background_jobs.py).
+            existing = np.isin(ids, current.ids)
+            missing = ~existing
+            new_ids = current.ids
+            new_codes, new_dates, new_sla = dict(current.codes), dict(current.dates), current.sla_violation
+            if existing.any():
+                positions = np.searchsorted(current.ids, ids[existing])
+                for name in new_codes:
+                    new_codes[name] = new_codes[name].copy()
+                    new_codes[name][positions] = codes[name][existing]
+                for field in new_dates:
+                    new_dates[field] = new_dates[field].copy()
+                    new_dates[field][positions] = dates[field][existing]
+                new_sla = new_sla.copy()
+                new_sla[positions] = sla[existing]
+            if missing.any():
+                positions = np.searchsorted(current.ids, ids[missing])
+                new_ids = np.insert(new_ids, positions, ids[missing])
+                for name in new_codes:
+                    new_codes[name] = np.insert(new_codes[name], positions, codes[name][missing])
+                for field in new_dates:
+                    new_dates[field] = np.insert(new_dates[field], positions, dates[field][missing])
+                new_sla = np.insert(new_sla, positions, sla[missing])
+            self.snapshot = self._snapshot(new_ids, new_codes, new_dates, new_sla)
+
+
+cube = TicketCube()
+ticket_events.subscribe(lambda event_type, ticket_id, previous: cube.mark_dirty(ticket_id))
+
+
+async def get_cube() -> CubeSnapshot:
+    """Retorna el cubo actualizado; la lectura de la BD se hace fuera del event loop."""
+    await asyncio.get_running_loop().run_in_executor(None, cube.refresh)
+    return cube.snapshot
@@ -1,19 +1,121 @@
+import os
+import time
+from collections import deque
 
-from database import SessionLocal, verify_password
+from nicegui import run
+
+from database import SessionLocal
 from models import User
+from passwords import verify_password
+
+# --- Límite de intentos de inicio de sesión ---
+# Cada verificación bcrypt consume ~250 ms de CPU. Se limitan los intentos fallidos (y los que están en curso)
+# por nombre de usuario y por IP dentro de una ventana deslizante, antes de consultar la BD o verificar la
+# contraseña, para que una ráfaga de credenciales robadas no acapare la CPU. Un login exitoso no cuenta.
+LOGIN_MAX_FAILURES_PER_USERNAME = int(os.environ.get("LOGIN_MAX_FAILURES_PER_USERNAME", 5))
+LOGIN_MAX_FAILURES_PER_IP = int(os.environ.get("LOGIN_MAX_FAILURES_PER_IP", 30))
+LOGIN_THROTTLE_WINDOW_SECONDS = float(os.environ.get("LOGIN_THROTTLE_WINDOW_SECONDS", 300))
+
+
+class LoginThrottled(Exception):
+    """Se superó el límite de intentos; `retry_after` son los segundos hasta el próximo intento permitido."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"Demasiados intentos de inicio de sesión. Intente nuevamente en {max(1, round(retry_after / 60))} minuto(s).")
+
+
+class SlidingWindowLimiter:
+    """Cuenta eventos por clave en los últimos `window` segundos y permite hasta `limit` de ellos."""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self._hits: dict[str, deque] = {}
+
+    def _prune(self, key: str, now: float) -> deque | None:
+        hits = self._hits.get(key)
+        while hits and hits[0] <= now - self.window:
+            hits.popleft()
+        if hits is not None and not hits:
+            del self._hits[key]
+            return None
+        return hits
+
+    def retry_after(self, key: str) -> float:
+        """Segundos que faltan para que la clave vuelva a tener intentos disponibles (0 si ya los tiene)."""
+        if self.limit <= 0:
+            return 0.0
+        now = time.monotonic()
+        hits = self._prune(key, now)
+        if not hits or len(hits) < self.limit:
+            return 0.0
+        return hits[-self.limit] + self.window - now
+
+    def hit(self, key: str) -> float:
+        """Registra un evento y retorna su marca de tiempo (para `forget`)."""
+        now = time.monotonic()
+        if len(self._hits) > 10000:
+            # Las claves sin eventos recientes se descartan para que la memoria no crezca con cada IP o usuario.
+            for stale in list(self._hits):
+                self._prune(stale, now)
+        self._hits.setdefault(key, deque()).append(now)
+        return now
+
+    def forget(self, key: str, stamp: float):
+        hits = self._hits.get(key)
+        if hits and stamp in hits:
+            hits.remove(stamp)
+
+    def reset(self, key: str):
+        self._hits.pop(key, None)
+
+
+_username_failures = SlidingWindowLimiter(LOGIN_MAX_FAILURES_PER_USERNAME, LOGIN_THROTTLE_WINDOW_SECONDS)
+_ip_failures = SlidingWindowLimiter(LOGIN_MAX_FAILURES_PER_IP, LOGIN_THROTTLE_WINDOW_SECONDS)
+
+
+def _load_user(username: str) -> User | None:
+    db = SessionLocal()
+    try:
+        return db.query(User).filter(User.username == username).first()
+    finally:
+        db.close()
+
 
 def authenticate_user(username: str, password: str) -> User | None:
     """
     Verifica las credenciales de un usuario contra la base de datos.
     Retorna el objeto `User` si la autenticación es exitosa, o `None` si falla.
+    Bloquea el hilo durante la verificación bcrypt: desde la interfaz se usa `authenticate_user_async`.
     """
-    db = SessionLocal()
-    try:
-        user = db.query(User).filter(User.username == username).first()
-        if not user:
-            return None
-        if not verify_password(password, user.password_hash):
-            return None
-        return user
-    finally:
-        db.close()
+    user = _load_user(username)
+    if not user:
+        return None
+    if not verify_password(password, user.password_hash):
+        return None
+    return user
+
+
+async def authenticate_user_async(username: str, password: str, client_ip: str | None) -> User | None:
+    """
+    Como `authenticate_user`, pero la verificación bcrypt se ejecuta en el pool de procesos para no detener
+    el event loop. Lanza `LoginThrottled` si el usuario o la IP superaron el límite de intentos fallidos.
+    """
+    username_key = (username or '').strip().lower()
+    ip_key = client_ip or 'desconocida'
+    retry_after = max(_username_failures.retry_after(username_key), _ip_failures.retry_after(ip_key))
+    if retry_after > 0:
+        raise LoginThrottled(retry_after)
+
+    # El intento cuenta como fallido mientras se verifica, así las solicitudes simultáneas también se limitan.
+    _username_failures.hit(username_key)
+    ip_stamp = _ip_failures.hit(ip_key)
+
+    user = _load_user(username)
+    valid = bool(user) and await run.cpu_bound(verify_password, password, user.password_hash)
+    if not valid:
+        return None
+    _username_failures.reset(username_key)
+    _ip_failures.forget(ip_key, ip_stamp)
+    return user
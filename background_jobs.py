@@ -0,0 +1,98 @@
+# --- Tareas de fondo de la aplicación ---
+# Lector de correo, verificador de SLA y armado de los reportes mensuales, junto con el envío de las
+# notificaciones que generan. Por defecto las ejecuta el mismo proceso que sirve la interfaz (main.py). Con
+# `BACKGROUND_TASKS=worker` el proceso web solo sirve la interfaz y las tareas corren en `worker.py`, un proceso
+# sin NiceGUI que se puede escalar y perfilar por separado. En ambos casos, con varios procesos cada tarea la
+# ejecuta uno solo a la vez (ver scheduler.py).
+#
+# Los eventos de tickets (ticket_events.py) no cruzan procesos: en modo `worker`, el proceso web busca cada
+# `TICKET_RELAY_INTERVAL_SECONDS` los tickets que creó otro proceso (p. ej. desde un correo) y los publica
+# en su propio bus, para que los dashboards abiertos los muestren. Los demás cambios hechos por el worker
+# (p. ej. las marcas de SLA) aparecen al recargar la página, y en los agregados por período cuando vencen
+# (`DASHBOARD_CLOSED_PERIOD_TTL_SECONDS`) o se recargan (`MONTHLY_REPORTS_RELOAD_SECONDS`).
+import os
+
+from sqlalchemy import func
+
+from database import SessionLocal
+from models import MailSettings, Ticket
+from mail_reader import check_new_emails
+from sla_checker import check_sla_warnings
+from monthly_reports import (precompute_monthly_reports, load_monthly_reports, MONTHLY_REPORTS_INTERVAL_SECONDS,
+                             MONTHLY_REPORTS_RELOAD_SECONDS)
+import scheduler
+import ticket_events
+
+# 'web': el proceso de la interfaz ejecuta las tareas de fondo. 'worker': las ejecuta `worker.py`.
+BACKGROUND_TASKS = os.environ.get("BACKGROUND_TASKS", "web").strip().lower()
+# Cada cuántos segundos el proceso web busca tickets creados por el worker (solo en modo 'worker').
+TICKET_RELAY_INTERVAL_SECONDS = float(os.environ.get("TICKET_RELAY_INTERVAL_SECONDS", 10))
+
+
+def runs_in_web() -> bool:
+    """Indica si el proceso web debe ejecutar las tareas de fondo."""
+    return BACKGROUND_TASKS != 'worker'
+
+
+def start_jobs():
+    """Programa el lector de correo, el verificador de SLA y el armado de los reportes mensuales."""
+    # Tarea para el lector de correo
+    db_session = SessionLocal()
+    mail_settings = db_session.query(MailSettings).first()
+    if mail_settings and mail_settings.is_active:
+        interval = (mail_settings.check_interval_minutes or 5) * 60
+        scheduler.start(interval, check_new_emails)
+        print(f"Lector de correo activado. Revisando cada {interval / 60} minuto(s).")
+    else:
+        print("Lector de correo desactivado.")
+    db_session.close()
+
+    # Tarea para el verificador de SLA
+    sla_interval = 600  # 10 minutos
+    scheduler.start(sla_interval, check_sla_warnings)
+    print(f"Verificador de SLA activado. Revisando cada {sla_interval / 60} minutos.")
+
+    # Tarea para los reportes de los meses cerrados
+    scheduler.start(MONTHLY_REPORTS_INTERVAL_SECONDS, precompute_monthly_reports)
+    print(f"Reportes mensuales activados. Revisando cada {MONTHLY_REPORTS_INTERVAL_SECONDS / 60:g} minutos.")
+
+
+def start_web_jobs():
+    """Programa las tareas que necesita cada proceso web, ejecute o no las tareas de fondo."""
+    # Cada proceso carga en su caché los reportes mensuales que armó el proceso que tiene el turno.
+    scheduler.start(MONTHLY_REPORTS_RELOAD_SECONDS, load_monthly_reports, singleton=False)
+    if not runs_in_web():
+        ticket_events.subscribe(_remember_local_ticket)
+        scheduler.start(TICKET_RELAY_INTERVAL_SECONDS, relay_new_tickets, singleton=False)
+        print("Tareas de fondo delegadas a worker.py.")
+
+
+# --- Tickets creados por otros procesos ---
+_last_seen_id: int | None = None
+_local_ticket_ids: set[int] = set()
+
+
+def _remember_local_ticket(event_type: str, ticket_id: int, previous: dict | None):
+    # Los tickets creados en este proceso ya se publicaron: `relay_new_tickets` no debe repetirlos.
+    if event_type == ticket_events.CREATED:
+        _local_ticket_ids.add(ticket_id)
+
+
+async def relay_new_tickets():
+    """Publica en el bus de este proceso los tickets que otro proceso creó desde la búsqueda anterior."""
+    global _last_seen_id
+    db = SessionLocal()
+    try:
+        if _last_seen_id is None:
+            _last_seen_id = db.query(func.max(Ticket.id)).scalar() or 0
+            _local_ticket_ids.clear()
+            return
+        new_ids = [row.id for row in db.query(Ticket.id).filter(Ticket.id > _last_seen_id).order_by(Ticket.id)]
+    finally:
+        db.close()
+    for ticket_id in new_ids:
+        _last_seen_id = ticket_id
+        if ticket_id in _local_ticket_ids:
+            _local_ticket_ids.discard(ticket_id)
+            continue
+        ticket_events.publish(ticket_events.CREATED, ticket_id)
@@ -0,0 +1,198 @@
+# Prueba de carga del flujo de correo completo sin servidores reales:
+#   IMAP en proceso -> mail_reader.check_new_emails -> tickets en BD -> notification_manager -> SMTP en proceso
+#
+# Reporta el throughput de ingesta, tickets/segundo, percentiles de latencia de las notificaciones
+# (desde que se encolan hasta que el servidor SMTP las recibe) y el pico de memoria del proceso.
+# Funciona sin red ni MariaDB (SQLite en memoria por defecto).
+#
+# Uso:
+#     python -m benchmarks.bench_mail --messages 1000
+#     python -m benchmarks.bench_mail --messages 5000 --delivery async --json
+import argparse
+import asyncio
+import contextlib
+import email
+import io
+import json
+import logging
+import os
+import random
+import re
+import resource
+import time
+import tracemalloc
+from email.header import decode_header, make_header
+from email.mime.text import MIMEText
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark del flujo de correo entrante y saliente.")
+    parser.add_argument('--messages', type=int, default=1000, help="Correos entrantes a sembrar en el buzón IMAP.")
+    parser.add_argument('--senders', type=int, default=50, help="Cantidad de remitentes distintos.")
+    parser.add_argument('--new-senders', type=int, default=5, help="Remitentes que aún no existen como usuarios (se crean durante la ingesta).")
+    parser.add_argument('--ignored-ratio', type=float, default=0.1, help="Fracción de correos cuyo asunto no genera ticket.")
+    parser.add_argument('--delivery', choices=['thread', 'async'], default='thread', help="Modo de entrega SMTP (SMTP_DELIVERY_MODE).")
+    parser.add_argument('--coalesce-seconds', type=float, default=0, help="Ventana de agrupación de notificaciones.")
+    parser.add_argument('--rate-per-minute', type=float, default=0, help="Límite SMTP por minuto (0 = sin límite).")
+    parser.add_argument('--database-url', default='sqlite://', help="URL de la BD de pruebas (por defecto SQLite en memoria).")
+    parser.add_argument('--timeout', type=float, default=300, help="Segundos máximos de espera para la entrega de notificaciones.")
+    parser.add_argument('--tracemalloc', action='store_true', help="Mide además el pico de memoria Python con tracemalloc (más lento).")
+    parser.add_argument('--json', action='store_true', help="Imprime el resultado en JSON.")
+    parser.add_argument('--seed', type=int, default=42)
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    # Deben definirse antes de importar los módulos de la aplicación, que leen estas variables al cargarse.
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["SMTP_DELIVERY_MODE"] = args.delivery
+    os.environ["NOTIFICATION_COALESCE_SECONDS"] = str(args.coalesce_seconds)
+    os.environ["SMTP_RATE_PER_MINUTE"] = str(args.rate_per_minute)
+
+
+def build_inbound_message(index: int, sender: str, ignored: bool) -> bytes:
+    subject = f"Consulta general {index}" if ignored else f"Reporte #{index}: falla en equipo de la oficina {index % 40}"
+    message = MIMEText(f"Buenos días,\n\nEl equipo número {index} no enciende desde esta mañana.\n\nGracias.", "plain", "utf-8")
+    message["Subject"] = subject
+    message["From"] = f"Usuario {sender.split('@')[0]} <{sender}>"
+    message["To"] = "soporte@helpdeskoi.local"
+    return message.as_bytes()
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def ticket_id_from_message(raw_message: bytes) -> int | None:
+    message = email.message_from_bytes(raw_message)
+    subject = str(make_header(decode_header(message.get('Subject', ''))))
+    match = re.search(r'#(\d+)', subject)
+    return int(match.group(1)) if match else None
+
+
+async def run(args) -> dict:
+    from sqlalchemy.orm import joinedload
+
+    import database
+    import email_utils
+    import notification_manager
+    from crypto_utils import encrypt_text
+    from mail_reader import check_new_emails
+    from models import Base, MailSettings, Ticket, User, UserRole
+    from benchmarks.mail_servers import IMAPStandIn, SMTPSink, ServerThread
+
+    logging.getLogger('mail_reader').setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+
+    with ServerThread(IMAPStandIn()) as imap, ServerThread(SMTPSink(keep_messages=True)) as sink:
+        # --- Preparación de la BD y del buzón ---
+        Base.metadata.create_all(bind=database.engine)
+        senders = [f"usuario{i}@empresa.local" for i in range(args.senders)]
+        db = database.SessionLocal()
+        try:
+            db.add(MailSettings(
+                server='127.0.0.1', port=imap.port, use_ssl=0, email='soporte@helpdeskoi.local',
+                username='soporte', password=encrypt_text('benchmark'), is_active=1,
+                smtp_server='127.0.0.1', smtp_port=sink.port, smtp_use_ssl=0,
+            ))
+            # Se reutiliza un único hash para no medir bcrypt al sembrar los usuarios existentes.
+            shared_hash = database.get_password_hash('benchmark')
+            for address in senders[args.new_senders:]:
+                db.add(User(username=address, email=address, password_hash=shared_hash, role=UserRole.AUTOSERVICIO, is_active=1))
+            db.commit()
+        finally:
+            db.close()
+
+        for index in range(args.messages):
+            ignored = rng.random() < args.ignored_ratio
+            imap.add_message(build_inbound_message(index, rng.choice(senders), ignored))
+
+        # El servidor SMTP local no ofrece TLS ni autenticación: se indica explícitamente a los emisores.
+        smtp_config = {
+            'server': '127.0.0.1', 'port': sink.port, 'security': 'none',
+            'sender_email': 'soporte@helpdeskoi.local', 'login_user': '', 'password': '',
+        }
+        email_utils.get_smtp_config = lambda: smtp_config
+        if args.delivery == 'async':
+            from email_async import async_sender
+            async_sender._config_loader = lambda: smtp_config
+
+        if args.tracemalloc:
+            tracemalloc.start()
+
+        # --- Fase 1: ingesta ---
+        ingest_start = time.perf_counter()
+        await check_new_emails()
+        ingest_seconds = time.perf_counter() - ingest_start
+
+        db = database.SessionLocal()
+        try:
+            tickets = db.query(Ticket).options(joinedload(Ticket.creator)).order_by(Ticket.id).all()
+        finally:
+            db.close()
+
+        # --- Fase 2: notificaciones ---
+        sink.reset()
+        enqueued_at = {}
+        notify_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for ticket in tickets:
+                enqueued_at[ticket.id] = time.perf_counter()
+                notification_manager.notify_new_ticket(ticket)
+
+            expected = len(tickets)
+            deadline = time.perf_counter() + args.timeout
+            while sink.message_count < expected and time.perf_counter() < deadline:
+                await asyncio.sleep(0.01)
+        notify_seconds = time.perf_counter() - notify_start
+
+        latencies = sorted(
+            (received_at - enqueued_at[ticket_id]) * 1000
+            for received_at, raw_message in sink.messages
+            if (ticket_id := ticket_id_from_message(raw_message)) in enqueued_at
+        )
+
+        python_peak_mb = None
+        if args.tracemalloc:
+            python_peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+
+        if args.delivery == 'async':
+            from email_async import async_sender
+            await async_sender.close()
+
+    return {
+        'messages': args.messages,
+        'delivery': args.delivery,
+        'ingest_seconds': round(ingest_seconds, 3),
+        'ingest_messages_per_second': round(args.messages / ingest_seconds, 1) if ingest_seconds else None,
+        'tickets_created': len(tickets),
+        'tickets_per_second': round(len(tickets) / ingest_seconds, 1) if ingest_seconds else None,
+        'unseen_left': imap.unseen_count(),
+        'notifications_delivered': sink.message_count,
+        'notify_seconds': round(notify_seconds, 3),
+        'latency_ms_p50': round(percentile(latencies, 50), 1),
+        'latency_ms_p90': round(percentile(latencies, 90), 1),
+        'latency_ms_p99': round(percentile(latencies, 99), 1),
+        'latency_ms_max': round(latencies[-1], 1) if latencies else 0.0,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'python_peak_mb': round(python_peak_mb, 1) if python_peak_mb is not None else None,
+    }
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    for key, value in result.items():
+        print(f"{key:<28} {value}")
+
+
+if __name__ == '__main__':
+    main()
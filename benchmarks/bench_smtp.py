@@ -0,0 +1,86 @@
+# Compara el envío de correos por hilos (smtplib) contra el envío asíncrono (aiosmtplib)
+# usando un servidor SMTP local en proceso.
+#
+# Uso:
+#     python -m benchmarks.bench_smtp
+#     python -m benchmarks.bench_smtp --sizes 10 100 1000 --connections 2
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import time
+
+# La BD solo se importa de forma indirecta; se usa SQLite en memoria para no requerir MariaDB.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from email_utils import send_email_notification
+from email_async import AsyncSMTPSender
+import notification_templates as nt
+from benchmarks.mail_servers import SMTPSink, ServerThread
+
+
+def make_config(port: int) -> dict:
+    return {
+        'server': '127.0.0.1',
+        'port': port,
+        'security': 'none',
+        'sender_email': 'helpdesk@helpdeskoi.local',
+        'login_user': '',
+        'password': '',
+    }
+
+
+async def run_threaded(count: int, config: dict, body: str):
+    """Reproduce el camino actual: un `run_in_executor` por correo en el pool por defecto."""
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(
+        loop.run_in_executor(None, send_email_notification, f"user{i}@example.com", f"Ticket #{i}", body, config)
+        for i in range(count)
+    ))
+
+
+async def run_async(count: int, config: dict, body: str, connections: int):
+    sender = AsyncSMTPSender(connections=connections, config_loader=lambda: config)
+    try:
+        await asyncio.gather(*(
+            sender.send(f"user{i}@example.com", f"Ticket #{i}", body)
+            for i in range(count)
+        ))
+    finally:
+        await sender.close()
+
+
+def measure(sink: SMTPSink, coroutine_factory) -> dict:
+    sink.reset()
+    start = time.perf_counter()
+    # Los envíos imprimen una línea por correo; se silencian durante la medición.
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(coroutine_factory())
+    elapsed = time.perf_counter() - start
+    return {'seconds': elapsed, 'delivered': sink.message_count, 'connections': sink.connections}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de entrega SMTP: hilos vs asyncio.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--connections', type=int, default=2, help="Conexiones del modo asíncrono.")
+    args = parser.parse_args()
+
+    body = nt.ticket_update_notification(1, "Impresora sin conexión", "tecnico1", "Se reinició el equipo.")
+
+    with ServerThread(SMTPSink()) as sink:
+        config = make_config(sink.port)
+        print(f"{'modo':<8} {'mensajes':>9} {'segundos':>9} {'msg/s':>9} {'entregados':>11} {'conexiones':>11}")
+        for size in args.sizes:
+            results = {
+                'thread': measure(sink, lambda: run_threaded(size, config, body)),
+                'async': measure(sink, lambda: run_async(size, config, body, args.connections)),
+            }
+            for mode, r in results.items():
+                rate = r['delivered'] / r['seconds'] if r['seconds'] else 0
+                print(f"{mode:<8} {size:>9} {r['seconds']:>9.3f} {rate:>9.0f} {r['delivered']:>11} {r['connections']:>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+# Servidores de correo mínimos que se ejecutan dentro del proceso para pruebas de carga.
+# No implementan autenticación ni TLS: solo lo necesario para que `smtplib`/`aiosmtplib`
+# entreguen mensajes sin depender de servidores reales ni de acceso a la red.
+import asyncio
+import re
+import threading
+import time
+
+
+class SMTPSink:
+    """Servidor SMTP que acepta todos los mensajes y los cuenta (opcionalmente los guarda)."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, keep_messages: bool = False):
+        self.host = host
+        self.port = port
+        self.keep_messages = keep_messages
+        self.connections = 0
+        self.message_count = 0
+        # Lista de (instante de recepción según `time.perf_counter()`, mensaje en bytes).
+        self.messages: list[tuple[float, bytes]] = []
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, limit=2**20)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def reset(self):
+        self.connections = 0
+        self.message_count = 0
+        self.messages = []
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        writer.write(b"220 helpdeskoi-sink ESMTP\r\n")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line[:4].upper()
+                if command == b'EHLO':
+                    writer.write(b"250-helpdeskoi-sink\r\n250-PIPELINING\r\n250-8BITMIME\r\n250 SIZE 52428800\r\n")
+                elif command == b'DATA':
+                    writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    await writer.drain()
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    self.message_count += 1
+                    if self.keep_messages:
+                        self.messages.append((time.perf_counter(), data[:-5]))
+                    writer.write(b"250 OK: queued\r\n")
+                elif command == b'QUIT':
+                    writer.write(b"221 Bye\r\n")
+                    await writer.drain()
+                    break
+                elif command in (b'HELO', b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                    writer.write(b"250 OK\r\n")
+                else:
+                    writer.write(b"502 Command not implemented\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class IMAPStandIn:
+    """
+    Servidor IMAP con un único buzón en memoria. Implementa solo los comandos que usa
+    `mail_reader.check_new_emails`: CAPABILITY, LOGIN, SELECT, SEARCH, FETCH, STORE, NOOP y LOGOUT.
+    Acepta cualquier usuario y contraseña.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.host = host
+        self.port = port
+        self.connections = 0
+        # Mensajes en orden de secuencia IMAP (1..N) y sus banderas.
+        self.messages: list[bytes] = []
+        self.flags: list[set[str]] = []
+        self._server = None
+
+    def add_message(self, raw_message: bytes):
+        self.messages.append(raw_message)
+        self.flags.append(set())
+
+    def unseen_count(self) -> int:
+        return sum(1 for flags in self.flags if '\\Seen' not in flags)
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, limit=2**20)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        writer.write(b"* OK [CAPABILITY IMAP4rev1] helpdeskoi-imap ready\r\n")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode('utf-8', errors='ignore').strip().split(' ', 2)
+                if len(parts) < 2:
+                    writer.write(b"* BAD empty command\r\n")
+                    await writer.drain()
+                    continue
+                tag, command = parts[0], parts[1].upper()
+                args = parts[2] if len(parts) > 2 else ''
+                if command == 'UID':
+                    writer.write(f"{tag} NO UID not supported\r\n".encode())
+                else:
+                    handler = getattr(self, f"_cmd_{command.lower()}", None)
+                    if handler is None:
+                        writer.write(f"{tag} BAD unknown command\r\n".encode())
+                    else:
+                        writer.write(handler(tag, args))
+                await writer.drain()
+                if command == 'LOGOUT':
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _cmd_capability(self, tag: str, args: str) -> bytes:
+        return f"* CAPABILITY IMAP4rev1\r\n{tag} OK CAPABILITY completed\r\n".encode()
+
+    def _cmd_login(self, tag: str, args: str) -> bytes:
+        return f"{tag} OK LOGIN completed\r\n".encode()
+
+    def _cmd_noop(self, tag: str, args: str) -> bytes:
+        return f"{tag} OK NOOP completed\r\n".encode()
+
+    def _cmd_logout(self, tag: str, args: str) -> bytes:
+        return f"* BYE logging out\r\n{tag} OK LOGOUT completed\r\n".encode()
+
+    def _cmd_select(self, tag: str, args: str) -> bytes:
+        return (f"* {len(self.messages)} EXISTS\r\n* 0 RECENT\r\n* FLAGS (\\Seen)\r\n"
+                f"{tag} OK [READ-WRITE] SELECT completed\r\n").encode()
+
+    def _cmd_search(self, tag: str, args: str) -> bytes:
+        if 'UNSEEN' in args.upper():
+            ids = [str(i + 1) for i, flags in enumerate(self.flags) if '\\Seen' not in flags]
+        else:
+            ids = [str(i + 1) for i in range(len(self.messages))]
+        return f"* SEARCH {' '.join(ids)}\r\n{tag} OK SEARCH completed\r\n".encode()
+
+    def _cmd_fetch(self, tag: str, args: str) -> bytes:
+        seq = int(args.split(' ', 1)[0])
+        if not 1 <= seq <= len(self.messages):
+            return f"{tag} NO no such message\r\n".encode()
+        raw_message = self.messages[seq - 1]
+        # FETCH RFC822 marca implícitamente el mensaje como leído.
+        self.flags[seq - 1].add('\\Seen')
+        return (f"* {seq} FETCH (RFC822 {{{len(raw_message)}}}\r\n".encode() + raw_message +
+                f")\r\n{tag} OK FETCH completed\r\n".encode())
+
+    def _cmd_store(self, tag: str, args: str) -> bytes:
+        match = re.match(r'(\d+)\s+([+-]?)FLAGS(?:\.SILENT)?\s+\(?([^)]*)\)?', args, re.IGNORECASE)
+        if not match or not 1 <= int(match.group(1)) <= len(self.messages):
+            return f"{tag} BAD invalid STORE\r\n".encode()
+        seq, mode, flags = int(match.group(1)), match.group(2), set(match.group(3).split())
+        if mode == '+':
+            self.flags[seq - 1] |= flags
+        elif mode == '-':
+            self.flags[seq - 1] -= flags
+        else:
+            self.flags[seq - 1] = flags
+        current = ' '.join(sorted(self.flags[seq - 1]))
+        return f"* {seq} FETCH (FLAGS ({current}))\r\n{tag} OK STORE completed\r\n".encode()
+
+
+class ServerThread:
+    """
+    Ejecuta un servidor (con métodos `start`/`stop` asíncronos) en un event loop propio en un hilo aparte,
+    para que los clientes bloqueantes del proceso principal no lo detengan.
+    """
+
+    def __init__(self, server):
+        self.server = server
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self.server
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
@@ -0,0 +1,173 @@
+# Generador de datos sintéticos para pruebas de rendimiento.
+#
+# Crea el esquema de models.Base en la BD indicada por DATABASE_URL (SQLite o MariaDB) con database.init_db
+# (SLAs, catálogo ITIL y ubicaciones iniciales) y la llena con usuarios, ubicaciones, tickets y actualizaciones.
+# Los tickets se reparten en los últimos `months` meses con estados, técnicos, urgencias y tiempos
+# de asignación/resolución realistas. Se insertan por lotes con SQLAlchemy Core para que generar
+# un millón de tickets sea viable.
+#
+# Uso:
+#     DATABASE_URL=sqlite:///bench.db python -m benchmarks.synthetic_data --tickets 100000
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+BATCH_SIZE = 10_000
+
+# Distribución de estados de los tickets generados
+STATUS_WEIGHTS = {
+    'NUEVO': 5, 'ASIGNADO': 8, 'EN_PROCESO': 7, 'RESUELTO': 60, 'CERRADO': 15, 'RECHAZADO': 5,
+}
+
+
+def _batches(rows_iter, size: int = BATCH_SIZE):
+    batch = []
+    for row in rows_iter:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(tickets: int, technicians: int = 20, requesters: int = 500, locations: int = 40,
+             months: int = 24, updates_per_ticket: int = 2, seed: int = 42, end: datetime | None = None,
+             verbose: bool = True) -> dict:
+    """
+    Llena la BD configurada con datos sintéticos. Debe llamarse con una BD vacía.
+    Retorna un resumen con la cantidad de filas creadas y el tiempo empleado.
+    """
+    from sqlalchemy import insert, select
+
+    import database
+    from models import User, UserRole, Location, ProblemType, Ticket, TicketUpdate, TicketStatus, TicketUrgency
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    end = end or datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(days=30 * months)
+    span_seconds = (end - start).total_seconds()
+
+    database.init_db()
+
+    # Se reutiliza un único hash: el costo de bcrypt no es parte de lo que se mide.
+    shared_hash = database.get_password_hash('benchmark')
+
+    with database.engine.begin() as conn:
+        conn.execute(insert(Location), [
+            {'name': f'LOC-{i:03d}', 'description': f'Oficina Regional {i}'} for i in range(locations)
+        ])
+        location_ids = conn.execute(select(Location.id).where(Location.name.like('LOC-%'))).scalars().all()
+
+        users = [{'username': 'supervisor', 'email': 'supervisor@bench.local', 'role': UserRole.SUPERVISOR}]
+        users += [{'username': f'tecnico{i}', 'email': f'tecnico{i}@bench.local', 'role': UserRole.TECNICO} for i in range(technicians)]
+        users += [{'username': f'usuario{i}', 'email': f'usuario{i}@bench.local', 'role': UserRole.AUTOSERVICIO} for i in range(requesters)]
+        conn.execute(insert(User), [
+            {**u, 'password_hash': shared_hash, 'full_name': u['username'].title(), 'is_active': 1,
+             'location_id': rng.choice(location_ids)}
+            for u in users
+        ])
+        supervisor_id = conn.execute(select(User.id).where(User.username == 'supervisor')).scalar_one()
+        technician_ids = conn.execute(select(User.id).where(User.role == UserRole.TECNICO)).scalars().all()
+        requester_ids = conn.execute(select(User.id).where(User.role == UserRole.AUTOSERVICIO)).scalars().all()
+        problem_type_ids = conn.execute(select(ProblemType.id)).scalars().all()
+
+    statuses = [TicketStatus[name] for name in STATUS_WEIGHTS]
+    weights = list(STATUS_WEIGHTS.values())
+    urgencies = list(TicketUrgency)
+
+    def ticket_rows():
+        for i in range(tickets):
+            created_at = start + timedelta(seconds=rng.random() * span_seconds)
+            status = rng.choices(statuses, weights)[0]
+            requester_id = rng.choice(requester_ids)
+            row = {
+                'title': f'Incidente {i}: falla reportada en equipo {rng.randint(1, 5000)}',
+                'description': 'Descripción generada para pruebas de rendimiento. ' * rng.randint(1, 4),
+                'status': status,
+                'urgency': rng.choice(urgencies) if status != TicketStatus.NUEVO else None,
+                'created_at': created_at,
+                'assigned_at': None,
+                'resolved_at': None,
+                'sla_warning_sent_level': None,
+                'sla_violation_sent': rng.random() < 0.08,
+                'requester_id': requester_id,
+                'creator_id': rng.choice([requester_id, supervisor_id]),
+                'technician_id': None,
+                'problem_type_id': rng.choice(problem_type_ids) if status != TicketStatus.NUEVO else None,
+                'location_id': rng.choice(location_ids),
+            }
+            if status not in (TicketStatus.NUEVO, TicketStatus.RECHAZADO):
+                row['technician_id'] = rng.choice(technician_ids)
+                row['assigned_at'] = min(end, created_at + timedelta(minutes=rng.randint(5, 8 * 60)))
+            if status in (TicketStatus.RESUELTO, TicketStatus.CERRADO):
+                row['resolved_at'] = min(end, row['assigned_at'] + timedelta(minutes=rng.randint(30, 72 * 60)))
+            yield row
+
+    ticket_count = 0
+    update_count = 0
+    for batch in _batches(ticket_rows()):
+        with database.engine.begin() as conn:
+            first_id = (conn.execute(select(Ticket.id).order_by(Ticket.id.desc()).limit(1)).scalar() or 0) + 1
+            conn.execute(insert(Ticket), batch)
+
+            updates = []
+            for offset, ticket in enumerate(batch):
+                ticket_id = first_id + offset
+                author_id = ticket['technician_id'] or supervisor_id
+                moment = ticket['created_at']
+                if ticket['status'] == TicketStatus.RECHAZADO:
+                    updates.append({'ticket_id': ticket_id, 'author_id': supervisor_id,
+                                    'comment': 'Ticket Rechazado. Motivo: solicitud duplicada.',
+                                    'timestamp': moment + timedelta(minutes=rng.randint(5, 600))})
+                    continue
+                for n in range(updates_per_ticket if ticket['technician_id'] else 0):
+                    moment = moment + timedelta(minutes=rng.randint(5, 600))
+                    updates.append({'ticket_id': ticket_id, 'author_id': author_id,
+                                    'comment': f'Seguimiento {n + 1}: se revisó el equipo y se actualizó el estado.',
+                                    'timestamp': min(end, moment)})
+            if updates:
+                conn.execute(insert(TicketUpdate), updates)
+
+        ticket_count += len(batch)
+        update_count += len(updates)
+        if verbose:
+            print(f"  {ticket_count}/{tickets} tickets", end='\r', flush=True)
+
+    if verbose:
+        print()
+    return {
+        'tickets': ticket_count,
+        'updates': update_count,
+        'technicians': technicians,
+        'requesters': requesters,
+        'locations': locations,
+        'seconds': round(time.perf_counter() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos en la BD de DATABASE_URL.")
+    parser.add_argument('--tickets', type=int, default=10_000)
+    parser.add_argument('--technicians', type=int, default=20)
+    parser.add_argument('--requesters', type=int, default=500)
+    parser.add_argument('--locations', type=int, default=40)
+    parser.add_argument('--months', type=int, default=24, help="Meses hacia atrás en los que se reparten los tickets.")
+    parser.add_argument('--updates-per-ticket', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        parser.error("Defina DATABASE_URL con la BD de pruebas (p. ej. sqlite:///bench.db).")
+
+    summary = generate(args.tickets, args.technicians, args.requesters, args.locations,
+                       args.months, args.updates_per_ticket, args.seed)
+    for key, value in summary.items():
+        print(f"{key:<14} {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+# --- Recursos de marca (logo) ---
+# Se sirven como archivos estáticos en lugar de incrustarlos en cada página: el navegador los descarga una vez
+# y los conserva en caché. La URL lleva un hash del contenido (`?v=...`), así que se puede cachear por mucho
+# tiempo y un logo nuevo se descarga igual al cambiar el archivo. Starlette agrega ETag y Last-Modified.
+import hashlib
+from pathlib import Path
+
+from nicegui import app
+
+BRANDING_DIR = Path(__file__).parent / 'branding'
+BRANDING_URL = '/branding'
+BRANDING_CACHE_SECONDS = 365 * 24 * 3600
+
+app.add_static_files(BRANDING_URL, BRANDING_DIR, max_cache_age=BRANDING_CACHE_SECONDS)
+
+_versions: dict[str, str] = {}
+
+
+def asset_url(name: str) -> str:
+    """URL versionada de un archivo de `branding/`."""
+    if name not in _versions:
+        _versions[name] = hashlib.sha256((BRANDING_DIR / name).read_bytes()).hexdigest()[:12]
+    return f"{BRANDING_URL}/{name}?v={_versions[name]}"
@@ -2,58 +2,62 @@ from nicegui import app, ui
 from sqlalchemy import func, case
 from sqlalchemy.orm import joinedload
 from datetime import datetime, timezone
+import asyncio
+import os
 
 import pytz
 from database import SessionLocal
 from models import Ticket, User, UserRole, TicketStatus, TicketUrgency, ProblemType, TicketUpdate, Location
 from main_layout import create_main_layout
-from datetime_utils import to_local_time
+from datetime_utils import to_local_time, filter_by_period
 import notification_manager as notifier
-from ticket_utils import load_tickets
+from ticket_utils import load_tickets, load_ticket_rows, get_available_years
+import ticket_events
+import ticket_transitions
+import session_user
+import period_cache
 
-@ui.page('/dashboard')
-def dashboard_page():
-    if not app.storage.user.get('authenticated', False):
-        return ui.navigate.to('/')
+# --- Caché de los gráficos del supervisor ---
+# Los mismos agregados se piden desde todas las sesiones de supervisores, monitores y administradores;
+# se comparten por (año, mes) y se invalidan cuando cambia un ticket del período (ver `period_cache`).
+DASHBOARD_CACHE_TTL_SECONDS = float(os.environ.get("DASHBOARD_CACHE_TTL_SECONDS", 30))
+# Los meses cerrados también vencen, para reflejar los cambios hechos en otros procesos (worker u otra instancia web).
+DASHBOARD_CLOSED_PERIOD_TTL_SECONDS = float(os.environ.get("DASHBOARD_CLOSED_PERIOD_TTL_SECONDS", 600))
 
-    def get_available_years():
-        db = SessionLocal()
-        try:
-            years_query = db.query(func.extract('year', Ticket.created_at)).distinct().order_by(func.extract('year', Ticket.created_at).desc()).all()
-            return [year[0] for year in years_query if year[0] is not None]
-        finally:
-            db.close()
+def _load_supervisor_chart_data(year=None, month=None):
+    """Conteo de tickets por estado y desglose por técnico y urgencia para el período indicado."""
+    db = SessionLocal()
+    try:
+        ticket_query = filter_by_period(db.query(Ticket), Ticket.created_at, year, month)
 
-    def get_supervisor_chart_data(year=None, month=None):
-        db = SessionLocal()
-        try:
-            ticket_query = db.query(Ticket)
-            if year:
-                ticket_query = ticket_query.filter(func.extract('year', Ticket.created_at) == year)
-            if month:
-                ticket_query = ticket_query.filter(func.extract('month', Ticket.created_at) == month)
+        status_data = ticket_query.with_entities(Ticket.status, func.count(Ticket.id)).group_by(Ticket.status).all()
 
-            status_data = ticket_query.with_entities(Ticket.status, func.count(Ticket.id)).group_by(Ticket.status).all()
-            
-            # Consulta para obtener el desglose de tickets por técnico y urgencia
-            tech_query = db.query(
-                User.username,
-                func.count(Ticket.id).label('total'),
-                func.sum(case((Ticket.urgency == TicketUrgency.ALTA, 1), else_=0)).label('alta'),
-                func.sum(case((Ticket.urgency == TicketUrgency.MEDIA, 1), else_=0)).label('media'),
-                func.sum(case((Ticket.urgency == TicketUrgency.BAJA, 1), else_=0)).label('baja')
-            ).join(User, Ticket.technician_id == User.id).filter(Ticket.technician_id.isnot(None))
-
-            if year:
-                tech_query = tech_query.filter(func.extract('year', Ticket.created_at) == year)
-            if month:
-                tech_query = tech_query.filter(func.extract('month', Ticket.created_at) == month)
-            
-            tech_data = tech_query.group_by(User.username).all()
+        # Consulta para obtener el desglose de tickets por técnico y urgencia
+        tech_query = db.query(
+            User.username,
+            func.count(Ticket.id).label('total'),
+            func.sum(case((Ticket.urgency == TicketUrgency.ALTA, 1), else_=0)).label('alta'),
+            func.sum(case((Ticket.urgency == TicketUrgency.MEDIA, 1), else_=0)).label('media'),
+            func.sum(case((Ticket.urgency == TicketUrgency.BAJA, 1), else_=0)).label('baja')
+        ).join(User, Ticket.technician_id == User.id).filter(Ticket.technician_id.isnot(None))
 
-            return status_data, tech_data
-        finally:
-            db.close()
+        tech_query = filter_by_period(tech_query, Ticket.created_at, year, month)
+        tech_data = tech_query.group_by(User.username).all()
+
+        return status_data, tech_data
+    finally:
+        db.close()
+
+supervisor_chart_cache = period_cache.register(period_cache.PeriodCache(
+    _load_supervisor_chart_data, DASHBOARD_CACHE_TTL_SECONDS, closed_ttl_seconds=DASHBOARD_CLOSED_PERIOD_TTL_SECONDS))
+
+def get_supervisor_chart_data(year=None, month=None):
+    return supervisor_chart_cache.get(year, month)
+
+@ui.page('/dashboard')
+def dashboard_page():
+    if not app.storage.user.get('authenticated', False):
+        return ui.navigate.to('/')
 
     def get_technician_stats(user_id, year=None, month=None):
         db = SessionLocal()
@@ -61,17 +65,11 @@ def dashboard_page():
             open_statuses = [TicketStatus.ASIGNADO, TicketStatus.EN_PROCESO]
             
             open_query = db.query(Ticket).filter(Ticket.technician_id == user_id, Ticket.status.in_(open_statuses))
-            if year:
-                open_query = open_query.filter(func.extract('year', Ticket.created_at) == year)
-            if month:
-                open_query = open_query.filter(func.extract('month', Ticket.created_at) == month)
+            open_query = filter_by_period(open_query, Ticket.created_at, year, month)
             open_count = open_query.count()
 
             resolved_query = db.query(Ticket).filter(Ticket.technician_id == user_id, Ticket.status == TicketStatus.RESUELTO)
-            if year:
-                resolved_query = resolved_query.filter(func.extract('year', Ticket.created_at) == year)
-            if month:
-                resolved_query = resolved_query.filter(func.extract('month', Ticket.created_at) == month)
+            resolved_query = filter_by_period(resolved_query, Ticket.created_at, year, month)
             resolved_count = resolved_query.count()
 
             return open_count, resolved_count
@@ -94,7 +92,8 @@ def dashboard_page():
             local_clock.set_text(panama_now.strftime('%H:%M:%S'))
         ui.timer(1.0, update_clocks)
 
-        current_role = app.storage.user.get('role')
+        principal = session_user.current_user()
+        current_role = principal.role
         
         # --- FILTROS ---
         if current_role in [UserRole.SUPERVISOR.value, UserRole.MONITOR.value, UserRole.ADMINISTRADOR.value, UserRole.TECNICO.value]:
@@ -116,14 +115,58 @@ def dashboard_page():
                     }
                     month_selector = ui.select(months, label="Mes", value=datetime.now().month).props('filled dense bg-white')
 
-        @ui.refreshable
-        def charts_section():
+        current_user_id = principal.id
+        open_statuses = [TicketStatus.ASIGNADO, TicketStatus.EN_PROCESO]
+
+        # Contadores de los gráficos para el filtro actual. Se cargan de la BD al abrir la página o cambiar
+        # el filtro, y luego se ajustan en memoria con cada evento de ticket (ver `on_ticket_event`).
+        chart_state = {'year': None, 'month': None, 'status': {}, 'techs': {}, 'open': 0, 'resolved': 0}
+
+        def load_chart_state():
             year = year_selector.value if 'year_selector' in locals() else None
             month = month_selector.value if 'month_selector' in locals() and month_selector.value != 0 else None
-            
+            chart_state.update({'year': year, 'month': month, 'status': {}, 'techs': {}, 'open': 0, 'resolved': 0})
+
+            if current_role in [UserRole.SUPERVISOR.value, UserRole.MONITOR.value, UserRole.ADMINISTRADOR.value]:
+                status_counts, tech_counts = get_supervisor_chart_data(year=year, month=month)
+                chart_state['status'] = {status: count for status, count in status_counts if status}
+                chart_state['techs'] = {
+                    tech.username: {'total': tech.total, 'alta': tech.alta or 0, 'media': tech.media or 0, 'baja': tech.baja or 0}
+                    for tech in tech_counts
+                }
+            elif current_role == UserRole.TECNICO.value:
+                chart_state['open'], chart_state['resolved'] = get_technician_stats(current_user_id, year=year, month=month)
+
+        def apply_to_chart_state(ticket_state, sign):
+            """Suma (sign=1) o resta (sign=-1) un ticket de los contadores si pertenece al período filtrado."""
+            if not ticket_state or not ticket_state['created_at']:
+                return
+            created_at = ticket_state['created_at']
+            if chart_state['year'] and created_at.year != chart_state['year']:
+                return
+            if chart_state['month'] and created_at.month != chart_state['month']:
+                return
+
+            status = ticket_state['status']
+            chart_state['status'][status] = chart_state['status'].get(status, 0) + sign
+            tech_name = ticket_state['technician_name']
+            if tech_name:
+                tech = chart_state['techs'].setdefault(tech_name, {'total': 0, 'alta': 0, 'media': 0, 'baja': 0})
+                tech['total'] += sign
+                if ticket_state['urgency']:
+                    tech[ticket_state['urgency'].value] += sign
+            if ticket_state['technician_id'] == current_user_id:
+                if status in open_statuses:
+                    chart_state['open'] += sign
+                elif status == TicketStatus.RESUELTO:
+                    chart_state['resolved'] += sign
+
+        @ui.refreshable
+        def charts_section():
             with ui.row().classes('w-full grid grid-cols-1 md:grid-cols-2 gap-6'):
                 if current_role in [UserRole.SUPERVISOR.value, UserRole.MONITOR.value, UserRole.ADMINISTRADOR.value]:
-                    status_counts, tech_counts = get_supervisor_chart_data(year=year, month=month)
+                    status_counts = [(status, count) for status, count in chart_state['status'].items() if count > 0]
+                    tech_counts = [(username, counts) for username, counts in chart_state['techs'].items() if counts['total'] > 0]
                     
                     with ui.card().classes('w-full rounded-xl shadow-md p-4'):
                         ui.label("Tickets por Estado").classes('text-lg font-semibold text-gray-600 text-center')
@@ -154,47 +197,47 @@ def dashboard_page():
                         ui.label("Tickets Asignados por Técnico").classes('text-lg font-semibold text-gray-600 text-center mb-4')
                         if tech_counts:
                             # Ordenar técnicos por cantidad de tickets de forma descendente
-                            sorted_techs = sorted(tech_counts, key=lambda item: item.total, reverse=True)
+                            sorted_techs = sorted(tech_counts, key=lambda item: item[1]['total'], reverse=True)
                             with ui.grid().classes('grid-cols-1 sm:grid-cols-2 md:grid-cols-3 lg:grid-cols-4 gap-4 w-full'):
-                                for tech in sorted_techs:
+                                for username, tech in sorted_techs:
                                     with ui.card().classes('p-3 w-full flex flex-col items-center'):
-                                        ui.label(tech.username).classes('font-semibold text-gray-700 text-center')
-                                        ui.label(tech.total).classes('text-3xl font-bold text-blue-600')
+                                        ui.label(username).classes('font-semibold text-gray-700 text-center')
+                                        ui.label(tech['total']).classes('text-3xl font-bold text-blue-600')
                                         with ui.row().classes('w-full justify-around mt-2 text-xs'):
                                             with ui.column().classes('items-center'):
                                                 ui.label('Alta').classes('text-red-500 font-medium')
-                                                ui.label(tech.alta).classes('text-red-500 font-bold')
+                                                ui.label(tech['alta']).classes('text-red-500 font-bold')
                                             with ui.column().classes('items-center'):
                                                 ui.label('Media').classes('text-orange-500 font-medium')
-                                                ui.label(tech.media).classes('text-orange-500 font-bold')
+                                                ui.label(tech['media']).classes('text-orange-500 font-bold')
                                             with ui.column().classes('items-center'):
                                                 ui.label('Baja').classes('text-yellow-500 font-medium')
-                                                ui.label(tech.baja).classes('text-yellow-500 font-bold')
+                                                ui.label(tech['baja']).classes('text-yellow-500 font-bold')
                         else:
                             ui.label("No hay datos para este filtro").classes('text-center text-gray-500 p-8 w-full col-span-full')
                 
                 elif current_role == UserRole.TECNICO.value:
-                    db = SessionLocal()
-                    user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-                    db.close()
-                    open_tickets, resolved_tickets = get_technician_stats(user.id, year=year, month=month)
-                    
                     with ui.card().classes('w-full rounded-xl shadow-md p-6 flex flex-col items-center justify-center text-center'):
                         ui.label("Mis Tickets Abiertos").classes('text-lg font-semibold text-gray-500')
-                        ui.label(open_tickets).classes('text-5xl font-bold text-blue-600 mt-2')
+                        ui.label(chart_state['open']).classes('text-5xl font-bold text-blue-600 mt-2')
                     with ui.card().classes('w-full rounded-xl shadow-md p-6 flex flex-col items-center justify-center text-center'):
                         ui.label("Mis Tickets Resueltos").classes('text-lg font-semibold text-gray-500')
-                        ui.label(resolved_tickets).classes('text-5xl font-bold text-green-600 mt-2')
+                        ui.label(chart_state['resolved']).classes('text-5xl font-bold text-green-600 mt-2')
                 
                 elif current_role == UserRole.AUTOSERVICIO.value:
                     with ui.card().classes('w-full rounded-xl shadow-md p-6'):
                         ui.label("Bienvenido").classes('text-lg font-semibold text-gray-600')
                         ui.label("Utilice la tabla de abajo para ver el estado de sus tickets.").classes('text-center text-gray-500 p-4')
 
+        def reload_charts():
+            load_chart_state()
+            charts_section.refresh()
+
         if 'year_selector' in locals():
-            year_selector.on('update:model-value', charts_section.refresh)
-            month_selector.on('update:model-value', charts_section.refresh)
+            year_selector.on('update:model-value', reload_charts)
+            month_selector.on('update:model-value', reload_charts)
         
+        load_chart_state()
         charts_section()
 
         with ui.card().classes('w-full rounded-xl shadow-md p-4'):
@@ -308,8 +351,8 @@ def dashboard_page():
                                     
                                     try:
                                         # El "asignador" es el usuario actual que realiza la acción
-                                        assigner = db_session.query(User).filter(User.id == app.storage.user.get('id')).first()
-                                        
+                                        assigner = principal
+
                                         # Notificar al creador sobre el nuevo ticket
                                         # Se notifica al solicitante (requester), no necesariamente al creador (supervisor/monitor)
                                         if new_ticket.requester:
@@ -321,8 +364,8 @@ def dashboard_page():
                                     except Exception as e:
                                         print(f"ERROR: No se pudo enviar la notificación por correo. Causa: {e}")
 
-                                    table.rows = load_tickets()
-                                    table.update()
+                                    # La tabla de esta y de las demás sesiones se actualiza a través del evento.
+                                    ticket_events.publish(ticket_events.CREATED, new_ticket.id)
                                     dialog.close()
                                 except Exception as e:
                                     db_session.rollback()
@@ -336,6 +379,11 @@ def dashboard_page():
                         dialog.open()
                     ui.button("Nuevo Ticket", on_click=open_new_ticket_dialog, icon='add').props('outline color=primary')
 
+            # Barra de acciones masivas (supervisores): aparece al seleccionar tickets en la tabla.
+            can_bulk_edit = current_role in [UserRole.SUPERVISOR.value, UserRole.ADMINISTRADOR.value, UserRole.MONITOR.value]
+            bulk_bar = ui.row().classes('w-full items-center gap-2 mb-2')
+            bulk_bar.set_visibility(False)
+
             columns = [
                 {'name': 'id', 'label': 'ID', 'field': 'id', 'sortable': True},
                 {'name': 'title', 'label': 'Título', 'field': 'title', 'align': 'left', 'style': 'white-space: normal; text-align: justify;'},
@@ -349,7 +397,8 @@ def dashboard_page():
                 {'name': 'actions', 'label': 'Acciones', 'align': 'right'},
             ]
 
-            table = ui.table(columns=columns, rows=load_tickets(), row_key='id').classes('w-full')
+            table = ui.table(columns=columns, rows=load_tickets(), row_key='id',
+                             selection='multiple' if can_bulk_edit else None).classes('w-full')
             table.add_slot('body-cell-actions', '''
                 <q-td :props="props">
                     <div class="flex items-center justify-end">
@@ -358,3 +407,175 @@ def dashboard_page():
                 </q-td>
             ''')
             table.on('view', lambda e: ui.navigate.to(f'/ticket/{e.args["id"]}'))
+
+            if can_bulk_edit:
+                # Cada acción es un único UPDATE sobre todos los tickets seleccionados (ver ticket_transitions.py).
+                def update_bulk_bar():
+                    bulk_bar.set_visibility(bool(table.selected))
+                    selection_label.set_text(f"{len(table.selected)} ticket(s) seleccionado(s)")
+
+                def load_bulk_catalogues():
+                    db = SessionLocal()
+                    try:
+                        return {
+                            'problem_types': {p.id: p.name for p in db.query(ProblemType).all()},
+                            'technicians': {t.id: t.username for t in db.query(User).filter(User.role == UserRole.TECNICO, User.is_active == 1).all()},
+                            'locations': {loc.id: loc.description for loc in db.query(Location).all()},
+                        }
+                    finally:
+                        db.close()
+
+                def notify_bulk_recipients(result, assigned):
+                    """Envía un correo por destinatario con todos sus tickets afectados."""
+                    db = SessionLocal()
+                    try:
+                        tickets = db.query(Ticket).options(joinedload(Ticket.creator), joinedload(Ticket.technician)).filter(Ticket.id.in_(list(result.previous))).all()
+                        notifier.notify_bulk_update(tickets, principal, result.comments, assigned)
+                    except Exception as e:
+                        print(f"ERROR: No se pudo enviar la notificación por correo. Causa: {e}")
+                    finally:
+                        db.close()
+
+                def run_bulk_action(action, event_type, done_label, skipped_hint, assigned=False):
+                    try:
+                        result = action([row['id'] for row in table.selected])
+                    except Exception as e:
+                        return ui.notify(f"Error en la acción masiva: {e}", color='negative', multi_line=True)
+
+                    table.selected = []
+                    update_bulk_bar()
+                    # La tabla de esta y de las demás sesiones se actualiza a través de los eventos.
+                    ticket_events.publish_many(event_type, result.previous)
+                    if result.previous:
+                        ui.notify(f"{len(result.previous)} ticket(s) {done_label}.", color='positive')
+                        notify_bulk_recipients(result, assigned)
+                    if result.skipped:
+                        shown = ', '.join(f"#{ticket_id}" for ticket_id in result.skipped[:20])
+                        if len(result.skipped) > 20:
+                            shown += ', ...'
+                        ui.notify(f"Se omitieron {len(result.skipped)} ticket(s) ({skipped_hint}): {shown}", color='warning', multi_line=True)
+
+                async def bulk_classify():
+                    catalogues = load_bulk_catalogues()
+                    with ui.dialog() as dialog, ui.card().style('width: 500px; max-width: 90vw;').classes('rounded-lg'):
+                        ui.label(f"Clasificar {len(table.selected)} ticket(s)").classes('text-lg font-semibold p-4')
+                        with ui.column().classes('w-full p-4 gap-4'):
+                            problem_type_select = ui.select(catalogues['problem_types'], label="Tipo de Problema").props('filled').classes('w-full')
+                            urgency_select = ui.select({u.name: u.value for u in TicketUrgency}, label="Urgencia").props('filled').classes('w-full')
+                            location_select = ui.select(catalogues['locations'], label="Ubicación (Opcional)").props('filled').classes('w-full')
+                        with ui.row().classes('w-full justify-end gap-2 p-4'):
+                            ui.button("Clasificar", on_click=lambda: dialog.submit((problem_type_select.value, urgency_select.value, location_select.value)), color='primary')
+                            ui.button("Cancelar", on_click=dialog.close)
+
+                    result = await dialog
+                    if not result:
+                        return
+                    problem_type_id, urgency, location_id = result
+                    if not problem_type_id or not urgency:
+                        return ui.notify("Debe seleccionar el tipo de problema y la urgencia.", color='warning')
+                    run_bulk_action(
+                        lambda ids: ticket_transitions.bulk_classify(
+                            ids, current_user_id, problem_type_id, catalogues['problem_types'][problem_type_id],
+                            TicketUrgency[urgency], location_id, catalogues['locations'].get(location_id)),
+                        ticket_events.UPDATED, "clasificado(s)", "solo se clasifican tickets nuevos")
+
+                async def bulk_assign():
+                    technicians = load_bulk_catalogues()['technicians']
+                    with ui.dialog() as dialog, ui.card().classes('rounded-lg'):
+                        ui.label(f"Asignar {len(table.selected)} ticket(s)").classes('text-lg font-semibold p-4')
+                        with ui.column().classes('p-4 gap-4'):
+                            tech_select = ui.select(technicians, label="Seleccionar Técnico").props('filled')
+                        with ui.row().classes('w-full justify-end gap-2 p-4'):
+                            ui.button("Asignar", on_click=lambda: dialog.submit(tech_select.value), color='primary')
+                            ui.button("Cancelar", on_click=dialog.close)
+
+                    technician_id = await dialog
+                    if technician_id:
+                        run_bulk_action(
+                            lambda ids: ticket_transitions.bulk_assign(ids, current_user_id, technician_id, technicians[technician_id]),
+                            ticket_events.ASSIGNED, "asignado(s)", "solo se asignan tickets nuevos ya clasificados", assigned=True)
+
+                async def bulk_change_status():
+                    with ui.dialog() as dialog, ui.card().classes('rounded-lg'):
+                        ui.label(f"Cambiar estado de {len(table.selected)} ticket(s)").classes('text-lg font-semibold p-4')
+                        with ui.column().classes('p-4 gap-4'):
+                            status_select = ui.select({s: s.value for s in [TicketStatus.EN_PROCESO, TicketStatus.RESUELTO]}, label="Nuevo Estado").props('filled')
+                        with ui.row().classes('w-full justify-end gap-2 p-4'):
+                            ui.button("Confirmar", on_click=lambda: dialog.submit(status_select.value), color='primary')
+                            ui.button("Cancelar", on_click=dialog.close)
+
+                    new_status = await dialog
+                    if new_status:
+                        run_bulk_action(
+                            lambda ids: ticket_transitions.bulk_change_status(ids, current_user_id, new_status),
+                            ticket_events.STATUS_CHANGED, "actualizado(s)", "solo se cambian tickets abiertos con otro estado")
+
+                async def bulk_reject():
+                    with ui.dialog() as dialog, ui.card().classes('rounded-lg'):
+                        ui.label(f"Rechazar {len(table.selected)} ticket(s)").classes('text-lg font-semibold p-4')
+                        with ui.column().classes('p-4 gap-4'):
+                            reason_input = ui.textarea().props("filled label='Motivo del rechazo'").classes('w-full')
+                        with ui.row().classes('w-full justify-end gap-2 p-4'):
+                            ui.button("Confirmar Rechazo", on_click=lambda: dialog.submit(reason_input.value), color='negative')
+                            ui.button("Cancelar", on_click=dialog.close)
+
+                    reason = await dialog
+                    if reason:
+                        run_bulk_action(
+                            lambda ids: ticket_transitions.bulk_reject(ids, current_user_id, reason),
+                            ticket_events.STATUS_CHANGED, "rechazado(s)", "solo se rechazan tickets nuevos")
+
+                with bulk_bar:
+                    selection_label = ui.label().classes('text-sm text-gray-600 mr-2')
+                    ui.button("Clasificar", on_click=bulk_classify, icon='category').props('outline color=primary')
+                    ui.button("Asignar", on_click=bulk_assign, icon='person_add').props('outline color=primary')
+                    ui.button("Cambiar Estado", on_click=bulk_change_status, icon='sync').props('outline color=primary')
+                    ui.button("Rechazar", on_click=bulk_reject, icon='block').props('outline color=negative')
+                table.on_select(update_bulk_bar)
+
+        # --- Actualizaciones en vivo ---
+        # Los eventos se acumulan y se aplican juntos en la siguiente vuelta del event loop: una acción masiva
+        # publica un evento por ticket, pero cada sesión los carga en una sola consulta y envía la tabla una vez.
+        loop = asyncio.get_running_loop()
+        pending_events = {}
+
+        def on_ticket_event(event_type, ticket_id, previous):
+            if not pending_events:
+                loop.call_soon_threadsafe(apply_pending_events)
+            # Si el ticket cambió varias veces, los contadores se ajustan desde el estado previo al primer cambio.
+            pending_events.setdefault(ticket_id, previous)
+
+        def apply_pending_events():
+            """Aplica los cambios de los tickets a la tabla y a los contadores sin volver a cargar la página."""
+            events = dict(pending_events)
+            pending_events.clear()
+            if not events or table.is_deleted:
+                return
+            loaded = load_ticket_rows(list(events), current_role, current_user_id)
+
+            rows = list(table.rows)
+            positions = {r['id']: i for i, r in enumerate(rows)}
+            new_rows, removed, charts_changed = [], set(), False
+            for ticket_id, previous in events.items():
+                row, current = loaded.get(ticket_id, (None, None))
+                index = positions.get(ticket_id)
+                if row and index is not None:
+                    rows[index] = row
+                elif row:
+                    new_rows.insert(0, row)
+                elif index is not None:
+                    removed.add(ticket_id)
+
+                apply_to_chart_state(previous, -1)
+                apply_to_chart_state(current, 1)
+                charts_changed = charts_changed or previous != current
+
+            rows = new_rows + [r for r in rows if r['id'] not in removed]
+            if rows != table.rows:
+                table.rows = rows
+                table.update()
+            if charts_changed:
+                charts_section.refresh()
+
+        unsubscribe = ticket_events.subscribe(on_ticket_event)
+        ui.context.client.on_delete(unsubscribe)
@@ -1,11 +1,12 @@
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from passlib.context import CryptContext
+from sqlalchemy.pool import StaticPool
+from passwords import pwd_context, get_password_hash, verify_password
 import csv
 import os
 
-from models import Base, User, UserRole, SLA, TicketUrgency, ITILCategory, ITILSubCategory, ProblemType, Location
+from models import Base, User, UserRole, SLA, TicketUrgency, ITILCategory, ITILSubCategory, ProblemType, Location, Ticket, TicketUpdate
 
 # --- Configuración para SQLite (para desarrollo) ---
 # DATABASE_URL = "sqlite:///./helpdeskoi.db"
@@ -13,30 +14,36 @@ from models import Base, User, UserRole, SLA, TicketUrgency, ITILCategory, ITILS
 
 # --- Configuración para MariaDB/MySQL (para producción) ---
 # Las variables se cargan desde el archivo .env al iniciar la aplicación en main.py
-DB_USER = os.environ.get("DB_USER")
-DB_PASSWORD = os.environ.get("DB_PASSWORD")
-DB_HOST = os.environ.get("DB_HOST")
-DB_PORT = os.environ.get("DB_PORT")
-DB_NAME = os.environ.get("DB_NAME")
+# Si se define DATABASE_URL (p. ej. sqlite:///./helpdeskoi.db) se usa directamente,
+# lo que permite ejecutar pruebas de carga y benchmarks sin un servidor MariaDB.
+DATABASE_URL = os.environ.get("DATABASE_URL")
 
-# Validar que todas las variables de entorno necesarias para la BD estén presentes
-required_db_vars = {"DB_USER": DB_USER, "DB_PASSWORD": DB_PASSWORD, "DB_HOST": DB_HOST, "DB_PORT": DB_PORT, "DB_NAME": DB_NAME}
-missing_vars = [key for key, value in required_db_vars.items() if value is None]
-if missing_vars:
-    raise ValueError(f"Faltan las siguientes variables de entorno de base de datos requeridas: {', '.join(missing_vars)}. Asegúrate de que el archivo .env esté configurado.")
+if DATABASE_URL:
+    if DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+        # Base de datos en memoria compartida por todos los hilos (benchmarks).
+        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    elif DATABASE_URL.startswith("sqlite"):
+        engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(DATABASE_URL)
+else:
+    DB_USER = os.environ.get("DB_USER")
+    DB_PASSWORD = os.environ.get("DB_PASSWORD")
+    DB_HOST = os.environ.get("DB_HOST")
+    DB_PORT = os.environ.get("DB_PORT")
+    DB_NAME = os.environ.get("DB_NAME")
 
-DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-engine = create_engine(DATABASE_URL)
+    # Validar que todas las variables de entorno necesarias para la BD estén presentes
+    required_db_vars = {"DB_USER": DB_USER, "DB_PASSWORD": DB_PASSWORD, "DB_HOST": DB_HOST, "DB_PORT": DB_PORT, "DB_NAME": DB_NAME}
+    missing_vars = [key for key, value in required_db_vars.items() if value is None]
+    if missing_vars:
+        raise ValueError(f"Faltan las siguientes variables de entorno de base de datos requeridas: {', '.join(missing_vars)}. Asegúrate de que el archivo .env esté configurado.")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    DATABASE_URL = f"mysql+mysqlconnector://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    engine = create_engine(DATABASE_URL)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
 
 itil_data = [
     {
@@ -232,6 +239,10 @@ def populate_locations():
 def init_db():
     # Crea todas las tablas
     Base.metadata.create_all(bind=engine)
+    # `create_all` no agrega índices a tablas que ya existen; se crean aquí los que falten.
+    for table in (Ticket.__table__, TicketUpdate.__table__):
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
     db = SessionLocal()
     try:
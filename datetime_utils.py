@@ -28,4 +28,26 @@ def format_utc_time(utc_dt: datetime) -> str:
     """
     if utc_dt is None:
         return 'N/A'
-    return utc_dt.strftime('%Y-%m-%d %H:%M (UTC)')
\ No newline at end of file
+    return utc_dt.strftime('%Y-%m-%d %H:%M (UTC)')
+
+def period_bounds(year: int, month: int | None = None) -> tuple[datetime, datetime]:
+    """
+    Retorna el rango semiabierto [inicio, fin) de un año o de un mes, para filtrar columnas de fecha
+    con comparaciones simples (`>=` y `<`) que sí pueden aprovechar un índice, a diferencia de `EXTRACT`.
+    Las fechas se guardan en UTC, por lo que los límites también son UTC.
+    """
+    if month:
+        start = datetime(year, month, 1)
+        end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    else:
+        start = datetime(year, 1, 1)
+        end = datetime(year + 1, 1, 1)
+    return start, end
+
+
+def filter_by_period(query, column, year: int | None = None, month: int | None = None):
+    """Aplica a `query` el filtro de año y mes opcionales sobre `column` (p. ej. `Ticket.created_at`)."""
+    if not year:
+        return query
+    start, end = period_bounds(year, month)
+    return query.filter(column >= start, column < end)
@@ -0,0 +1,130 @@
+import asyncio
+import os
+import ssl
+
+import aiosmtplib
+
+from email_utils import get_smtp_config, build_message
+
+# --- Configuración del envío asíncrono ---
+# Número de conexiones SMTP persistentes que se mantienen abiertas en paralelo.
+SMTP_ASYNC_CONNECTIONS = int(os.environ.get("SMTP_ASYNC_CONNECTIONS", 2))
+# Segundos sin tráfico tras los cuales se cierra una conexión inactiva.
+SMTP_IDLE_TIMEOUT_SECONDS = 30
+
+
+class AsyncSMTPSender:
+    """
+    Envía correos desde el event loop usando `aiosmtplib`.
+
+    Cada conexión es atendida por una tarea que toma mensajes de una cola común y los envía
+    uno tras otro sobre la misma sesión SMTP/TLS, de modo que muchos mensajes comparten
+    unas pocas conexiones en lugar de abrir una por correo (y un hilo por correo).
+    """
+
+    def __init__(self, connections: int = SMTP_ASYNC_CONNECTIONS, idle_timeout: float = SMTP_IDLE_TIMEOUT_SECONDS, config_loader=get_smtp_config):
+        self.connections = max(1, connections)
+        self.idle_timeout = idle_timeout
+        self._config_loader = config_loader
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def send(self, recipient_email: str, subject: str, body: str) -> asyncio.Future:
+        """
+        Encola un correo para su envío. Debe llamarse desde el event loop.
+        Retorna un futuro que se resuelve a `True` si el correo fue entregado al servidor.
+        """
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((recipient_email, subject, body, future))
+        return future
+
+    def pending(self) -> int:
+        """Cantidad de correos en espera de ser enviados."""
+        return self._queue.qsize() if self._queue else 0
+
+    async def close(self):
+        """Detiene las tareas de envío y cierra sus conexiones."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._workers = [worker for worker in self._workers if not worker.done()]
+        while len(self._workers) < self.connections:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def _connect(self, config: dict) -> aiosmtplib.SMTP:
+        context = ssl.create_default_context()
+        smtp = aiosmtplib.SMTP(
+            hostname=config['server'],
+            port=config['port'],
+            use_tls=config['security'] == 'ssl',
+            start_tls=config['security'] == 'starttls',
+            tls_context=context,
+        )
+        await smtp.connect()
+        if config['password']:
+            await smtp.login(config['login_user'], config['password'])
+        return smtp
+
+    async def _disconnect(self, smtp: aiosmtplib.SMTP | None):
+        if smtp is None:
+            return
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    async def _worker(self):
+        smtp, config = None, None
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=self.idle_timeout if smtp else None)
+                except asyncio.TimeoutError:
+                    await self._disconnect(smtp)
+                    smtp, config = None, None
+                    continue
+
+                recipient_email, subject, body, future = item
+                try:
+                    # La configuración se lee al abrir la conexión y se reutiliza mientras siga abierta.
+                    if smtp is None or not smtp.is_connected:
+                        config = await asyncio.to_thread(self._config_loader)
+                        if not config:
+                            print(f"WARN: SMTP settings are not configured or inactive. Email to {recipient_email} was not sent.")
+                            if not future.done():
+                                future.set_result(False)
+                            continue
+                        smtp = await self._connect(config)
+
+                    message = build_message(config['sender_email'], recipient_email, subject, body)
+                    try:
+                        await smtp.sendmail(config['sender_email'], [recipient_email], message)
+                    except aiosmtplib.SMTPServerDisconnected:
+                        # El servidor cerró la sesión por inactividad: reconectar y reintentar una vez.
+                        smtp = await self._connect(config)
+                        await smtp.sendmail(config['sender_email'], [recipient_email], message)
+
+                    print(f"Notification email sent to {recipient_email}")
+                    if not future.done():
+                        future.set_result(True)
+                except Exception as e:
+                    print(f"ERROR: Could not send email to {recipient_email}. Reason: {e}")
+                    if smtp is not None and not smtp.is_connected:
+                        smtp = None
+                    if not future.done():
+                        future.set_result(False)
+                finally:
+                    self._queue.task_done()
+        finally:
+            await self._disconnect(smtp)
+
+
+# Instancia compartida por toda la aplicación.
+async_sender = AsyncSMTPSender()
@@ -1,3 +1,4 @@
+import os
 import smtplib
 import ssl
 from email.mime.text import MIMEText
@@ -7,45 +8,68 @@ from database import SessionLocal
 from models import MailSettings
 from crypto_utils import decrypt_text
 
-def send_email_notification(recipient_email: str, subject: str, body: str):
+# Modo de entrega de correos salientes:
+# - 'thread': `smtplib` bloqueante ejecutado en el pool de hilos (una conexión por correo).
+# - 'async': `email_async.AsyncSMTPSender`, que reutiliza unas pocas conexiones desde el event loop.
+SMTP_DELIVERY_MODE = os.environ.get("SMTP_DELIVERY_MODE", "thread").strip().lower()
+
+def get_smtp_config() -> dict | None:
+    """
+    Lee la configuración SMTP activa desde la base de datos.
+    Retorna un diccionario con los datos de conexión, o `None` si el envío no está configurado o está inactivo.
+    """
     db = SessionLocal()
     try:
         settings = db.query(MailSettings).first()
         if not settings or not settings.smtp_server or not settings.is_active:
-            print(f"WARN: SMTP settings are not configured or inactive. Email to {recipient_email} was not sent.")
-            return
-
-        sender_email = settings.email
-        password = decrypt_text(settings.password)
-        
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = f"HelpdeskOI <{sender_email}>"
-        message["To"] = recipient_email
-
-        # El cuerpo del correo es HTML, generado desde `notification_templates`.
-        part = MIMEText(body, "html")
-        message.attach(part)
-
-        context = ssl.create_default_context()
-        
-        try:
-            login_user = settings.username if settings.username else sender_email
-            
-            if settings.smtp_use_ssl:
-                with smtplib.SMTP_SSL(settings.smtp_server, settings.smtp_port, context=context) as server:
-                    server.login(login_user, password)
-                    server.sendmail(sender_email, recipient_email, message.as_string())
-            else: # Usar STARTTLS
-                with smtplib.SMTP(settings.smtp_server, settings.smtp_port) as server:
-                    server.starttls(context=context)
-                    server.login(login_user, password)
-                    server.sendmail(sender_email, recipient_email, message.as_string())
-            
-            print(f"Notification email sent to {recipient_email}")
-
-        except Exception as e:
-            print(f"ERROR: Could not send email to {recipient_email}. Reason: {e}")
-
+            return None
+        return {
+            'server': settings.smtp_server,
+            'port': settings.smtp_port,
+            # 'ssl' (SMTPS), 'starttls' o 'none' (solo para servidores locales de prueba).
+            'security': 'ssl' if settings.smtp_use_ssl else 'starttls',
+            'sender_email': settings.email,
+            'login_user': settings.username if settings.username else settings.email,
+            'password': decrypt_text(settings.password),
+        }
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def build_message(sender_email: str, recipient_email: str, subject: str, body: str) -> str:
+    """Construye el mensaje MIME listo para enviarse."""
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = f"HelpdeskOI <{sender_email}>"
+    message["To"] = recipient_email
+
+    # El cuerpo del correo es HTML, generado desde `notification_templates`.
+    part = MIMEText(body, "html")
+    message.attach(part)
+    return message.as_string()
+
+def send_email_notification(recipient_email: str, subject: str, body: str, smtp_config: dict | None = None):
+    config = smtp_config or get_smtp_config()
+    if not config:
+        print(f"WARN: SMTP settings are not configured or inactive. Email to {recipient_email} was not sent.")
+        return
+
+    sender_email = config['sender_email']
+    message = build_message(sender_email, recipient_email, subject, body)
+    context = ssl.create_default_context()
+
+    try:
+        if config['security'] == 'ssl':
+            server = smtplib.SMTP_SSL(config['server'], config['port'], context=context)
+        else:
+            server = smtplib.SMTP(config['server'], config['port'])
+        with server:
+            if config['security'] == 'starttls':
+                server.starttls(context=context)
+            if config['password']:
+                server.login(config['login_user'], config['password'])
+            server.sendmail(sender_email, recipient_email, message)
+
+        print(f"Notification email sent to {recipient_email}")
+
+    except Exception as e:
+        print(f"ERROR: Could not send email to {recipient_email}. Reason: {e}")
@@ -1,132 +1,165 @@
-import pandas as pd
 import io
-from datetime import datetime
+from collections import defaultdict
+from datetime import datetime, timedelta
 
-def generate_excel_report(report_data: dict) -> bytes:
+import xlsxwriter
+
+# Ancho máximo de columna, para que una descripción larga no genere columnas enormes.
+MAX_COLUMN_WIDTH = 80
+
+
+class SheetWriter:
     """
-    Genera un archivo Excel en memoria a partir de los datos del reporte.
+    Escribe una hoja fila por fila y va calculando el ancho de cada columna mientras escribe,
+    sin tener que guardar las filas para medirlas al final.
+    """
+
+    def __init__(self, workbook, sheet_name: str, headers: list[str], title: str | None = None):
+        self.worksheet = workbook.add_worksheet(sheet_name)
+        self.widths = [len(str(header)) for header in headers]
+        self.row = 0
+        # En modo `constant_memory` las filas deben escribirse en orden: el título va antes que los encabezados.
+        if title:
+            self.worksheet.write(0, 0, title)
+            self.row = 1
+        self.write_row(headers)
+
+    def write_row(self, values: list):
+        for col, value in enumerate(values):
+            self.worksheet.write(self.row, col, value)
+            self.widths[col] = max(self.widths[col], len(str(value)))
+        self.row += 1
+
+    def close(self):
+        # Con `constant_memory` el ancho de las columnas se puede fijar después de escribir las filas,
+        # porque la definición de columnas se arma al cerrar el libro.
+        for col, width in enumerate(self.widths):
+            self.worksheet.set_column(col, col, min(width + 2, MAX_COLUMN_WIDTH))
+
+
+def _percentage(part: int, total: int) -> str:
+    return f"{((part / total) * 100):.1f}%" if total > 0 else "N/A"
+
+
+def excel_report_data(report, start_date: datetime, end_date: datetime) -> dict:
+    """
+    Arma el diccionario que recibe `write_excel_report` a partir de un `ReportData` del rango [start_date, end_date).
+    """
+    tech_distribution = defaultdict(list)
+    for row in report.tech_distribution:
+        tech_distribution[row.username].append(row)
+    return {
+        'tech': report.tech_performance,
+        'problem': report.problem_analysis,
+        'volume': report.ticket_volume,
+        'location': report.location_analysis,
+        'location_problem': report.location_problem,
+        'assigned': report.assigned_volume,
+        'rejected': report.rejected_volume,
+        'resolved_vol': report.resolved_volume,
+        'tech_distribution': tech_distribution,
+        'tech_sla_violations': report.sla_violations,
+        'start_date': start_date.strftime('%Y-%m-%d'),
+        'end_date': (end_date - timedelta(days=1)).strftime('%Y-%m-%d'),
+    }
+
+
+def write_excel_report(report_data: dict, output) -> None:
+    """
+    Escribe el reporte en un archivo Excel.
+
+    Las filas se envían directamente a xlsxwriter en modo `constant_memory`, que vuelca cada fila
+    al disco en cuanto se pasa a la siguiente, por lo que la memoria no crece con el tamaño del reporte.
 
     Args:
         report_data: Un diccionario que contiene todos los datos procesados para el reporte.
-
-    Returns:
-        Los bytes del archivo Excel generado.
+        output: Ruta del archivo de destino, o un objeto tipo archivo (p. ej. `BytesIO`).
     """
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # Diccionario para almacenar los dataframes y poder ajustar las columnas después
-        dataframes = {}
-        
+    options = {'in_memory': True} if hasattr(output, 'write') else {'constant_memory': True}
+    workbook = xlsxwriter.Workbook(output, options)
+    try:
         # --- Hoja 1: Rendimiento de Técnicos ---
         if report_data.get('tech'):
-            tech_rows = []
+            sheet = SheetWriter(workbook, 'Rendimiento_Tecnicos', ['Técnico', 'Tickets Asignados', 'Tickets Resueltos', 'Efectividad %'])
             for row in report_data['tech']:
-                assigned_count = row['assigned_count']
-                resolved_count = row['resolved_count']
-                efectividad = f"{((resolved_count / assigned_count) * 100):.1f}%" if assigned_count > 0 else "N/A"
-                tech_rows.append({
-                    'Técnico': row['username'],
-                    'Tickets Asignados': assigned_count,
-                    'Tickets Resueltos': resolved_count,
-                    'Efectividad %': efectividad
-                })
-            df_tech = pd.DataFrame(tech_rows)
-            df_tech.to_excel(writer, sheet_name='Rendimiento_Tecnicos', index=False)
-            dataframes['Rendimiento_Tecnicos'] = df_tech
+                sheet.write_row([row['username'], row['assigned_count'], row['resolved_count'],
+                                 _percentage(row['resolved_count'], row['assigned_count'])])
+            sheet.close()
 
         # --- Hoja 2: Cumplimiento de SLA ---
         if report_data.get('tech'):
-            sla_rows = []
+            sheet = SheetWriter(workbook, 'Cumplimiento_SLA', ['Técnico', 'Tickets Fuera de SLA', 'Total Asignados', '% Fuera de SLA'])
             for tech_row in report_data['tech']:
-                tech_username = tech_row['username']
-                assigned_count = tech_row['assigned_count']
-                violation_count = report_data['tech_sla_violations'].get(tech_username, 0)
-                percentage = f"{((violation_count / assigned_count) * 100):.1f}%" if assigned_count > 0 else "N/A"
-                sla_rows.append({
-                    'Técnico': tech_username,
-                    'Tickets Fuera de SLA': violation_count,
-                    'Total Asignados': assigned_count,
-                    '% Fuera de SLA': percentage
-                })
-            df_sla = pd.DataFrame(sla_rows)
-            df_sla.to_excel(writer, sheet_name='Cumplimiento_SLA', index=False)
-            dataframes['Cumplimiento_SLA'] = df_sla
+                violation_count = report_data['tech_sla_violations'].get(tech_row['username'], 0)
+                sheet.write_row([tech_row['username'], violation_count, tech_row['assigned_count'],
+                                 _percentage(violation_count, tech_row['assigned_count'])])
+            sheet.close()
 
         # --- Hoja 3: Distribución de Carga ---
         if report_data.get('tech_distribution'):
-            dist_rows = []
+            sheet = SheetWriter(workbook, 'Distribucion_Carga', ['Técnico', 'Tipo de Problema', 'Urgencia', 'Cantidad'])
             for tech, rows in report_data['tech_distribution'].items():
                 for row in rows:
-                    dist_rows.append({
-                        'Técnico': tech,
-                        'Tipo de Problema': row.problem_name,
-                        'Urgencia': row.urgency.value.title(),
-                        'Cantidad': row.ticket_count
-                    })
-            df_dist = pd.DataFrame(dist_rows)
-            df_dist.to_excel(writer, sheet_name='Distribucion_Carga', index=False)
-            dataframes['Distribucion_Carga'] = df_dist
+                    sheet.write_row([tech, row.problem_name, row.urgency.value.title(), row.ticket_count])
+            sheet.close()
 
         # --- Hoja 4: Incidencias por Tipo ---
         if report_data.get('problem'):
-            df_problem = pd.DataFrame([{'Tipo de Problema': r.name, 'Cantidad': r.ticket_count} for r in report_data['problem']])
-            df_problem.to_excel(writer, sheet_name='Incidencias_por_Tipo', index=False)
-            dataframes['Incidencias_por_Tipo'] = df_problem
+            sheet = SheetWriter(workbook, 'Incidencias_por_Tipo', ['Tipo de Problema', 'Cantidad'])
+            for r in report_data['problem']:
+                sheet.write_row([r.name, r.ticket_count])
+            sheet.close()
 
         # --- Hoja 5: Incidencias por Ubicación ---
         if report_data.get('location'):
-            df_location = pd.DataFrame([{'Ubicación': r.description, 'Cantidad': r.ticket_count} for r in report_data['location']])
-            df_location.to_excel(writer, sheet_name='Incidencias_por_Ubicacion', index=False)
-            dataframes['Incidencias_por_Ubicacion'] = df_location
+            sheet = SheetWriter(workbook, 'Incidencias_por_Ubicacion', ['Ubicación', 'Cantidad'])
+            for r in report_data['location']:
+                sheet.write_row([r.description, r.ticket_count])
+            sheet.close()
 
         # --- Hoja 6: Resumen Ubicación-Problema ---
         if report_data.get('location_problem'):
-            df_loc_prob = pd.DataFrame([{
-                'Ubicación': r.location_description,
-                'Tipo de Problema': r.problem_type_name,
-                'Cantidad': r.ticket_count
-            } for r in report_data['location_problem']])
-            df_loc_prob.to_excel(writer, sheet_name='Resumen_Ubicacion_Problema', index=False)
-            dataframes['Resumen_Ubicacion_Problema'] = df_loc_prob
+            sheet = SheetWriter(workbook, 'Resumen_Ubicacion_Problema', ['Ubicación', 'Tipo de Problema', 'Cantidad'])
+            for r in report_data['location_problem']:
+                sheet.write_row([r.location_description, r.problem_type_name, r.ticket_count])
+            sheet.close()
 
         # --- Hoja 7: Volumen Diario ---
-        all_dates = sorted(list(set(
-            [row.creation_day for row in report_data.get('volume', [])] +
-            [row.assignment_day for row in report_data.get('assigned', [])] +
-            [row.rejection_day for row in report_data.get('rejected', [])] +
-            [row.resolution_day for row in report_data.get('resolved_vol', [])]
-        )))
+        created_counts = {row.creation_day: row.daily_count for row in report_data.get('volume', [])}
+        assigned_counts = {row.assignment_day: row.daily_count for row in report_data.get('assigned', [])}
+        rejected_counts = {row.rejection_day: row.daily_count for row in report_data.get('rejected', [])}
+        resolved_counts = {row.resolution_day: row.daily_count for row in report_data.get('resolved_vol', [])}
+        all_dates = sorted(set(created_counts) | set(assigned_counts) | set(rejected_counts) | set(resolved_counts))
 
         if all_dates:
-            created_counts = {row.creation_day: row.daily_count for row in report_data.get('volume', [])}
-            assigned_counts = {row.assignment_day: row.daily_count for row in report_data.get('assigned', [])}
-            rejected_counts = {row.rejection_day: row.daily_count for row in report_data.get('rejected', [])}
-            resolved_counts = {row.resolution_day: row.daily_count for row in report_data.get('resolved_vol', [])}
-
-            volume_rows = []
+            sheet = SheetWriter(workbook, 'Volumen_Diario', ['Fecha', 'Creados', 'Asignados', 'Resueltos', 'Rechazados'])
             for d in all_dates:
                 date_str = (datetime.strptime(d, '%Y-%m-%d') if isinstance(d, str) else d).strftime('%Y-%m-%d')
-                volume_rows.append({
-                    'Fecha': date_str,
-                    'Creados': created_counts.get(d, 0),
-                    'Asignados': assigned_counts.get(d, 0),
-                    'Resueltos': resolved_counts.get(d, 0),
-                    'Rechazados': rejected_counts.get(d, 0)
-                })
-            
-            df_volume = pd.DataFrame(volume_rows)
-            df_volume.to_excel(writer, sheet_name='Volumen_Diario', index=False)
-            dataframes['Volumen_Diario'] = df_volume
-
-        # --- Ajuste automático del ancho de las columnas ---
-        for sheet_name, df in dataframes.items():
-            worksheet = writer.sheets[sheet_name]
-            for idx, col in enumerate(df):  # iterar sobre los nombres de las columnas del dataframe
-                series = df[col]
-                max_len = max((
-                    series.astype(str).map(len).max(),  # longitud del dato más largo
-                    len(str(series.name))  # longitud del encabezado de la columna
-                )) + 2  # un poco de espacio extra
-                worksheet.set_column(idx, idx, max_len)
-
-    return output.getvalue()
\ No newline at end of file
+                sheet.write_row([date_str, created_counts.get(d, 0), assigned_counts.get(d, 0),
+                                 resolved_counts.get(d, 0), rejected_counts.get(d, 0)])
+            sheet.close()
+
+        # --- Hoja 8: Análisis ad-hoc (desde el cubo analítico de la página de reportes) ---
+        if report_data.get('adhoc') and report_data['adhoc']['rows']:
+            adhoc = report_data['adhoc']
+            sheet = SheetWriter(workbook, 'Analisis_AdHoc', adhoc['columns'], title=adhoc['title'])
+            for row in adhoc['rows']:
+                sheet.write_row(row)
+            sheet.close()
+    finally:
+        workbook.close()
+
+
+def generate_excel_report(report_data: dict) -> bytes:
+    """
+    Genera un archivo Excel en memoria a partir de los datos del reporte.
+
+    Args:
+        report_data: Un diccionario que contiene todos los datos procesados para el reporte.
+
+    Returns:
+        Los bytes del archivo Excel generado.
+    """
+    output = io.BytesIO()
+    write_excel_report(report_data, output)
+    return output.getvalue()
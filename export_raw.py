@@ -0,0 +1,152 @@
+# --- Exportación de tickets individuales ---
+# Exporta cada ticket del período con su solicitante, técnico, tipo de problema, ubicación, fechas e indicadores
+# de SLA. Las filas se leen con un SELECT de SQLAlchemy Core (sin objetos ORM) en bloques de `yield_per`
+# y cada bloque se escribe en el archivo antes de leer el siguiente, por lo que la memoria usada no depende
+# de la cantidad de tickets del período.
+import csv
+import enum
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from database import engine
+from models import Ticket, User, ProblemType, Location
+from export_excel import SheetWriter
+import xlsxwriter
+
+RAW_EXPORT_CHUNK_SIZE = 5_000
+
+# Filas por hoja en XLSX (el límite de Excel es 1.048.576 incluyendo el encabezado).
+XLSX_MAX_ROWS_PER_SHEET = 1_000_000
+
+RAW_EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'xlsx': ('Excel (XLSX)', '.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+}
+
+Requester = aliased(User)
+Technician = aliased(User)
+
+# (encabezado, columna)
+RAW_COLUMNS = [
+    ('ID', Ticket.id),
+    ('Título', Ticket.title),
+    ('Descripción', Ticket.description),
+    ('Estado', Ticket.status),
+    ('Urgencia', Ticket.urgency),
+    ('Solicitante', Requester.username),
+    ('Correo Solicitante', Requester.email),
+    ('Técnico', Technician.username),
+    ('Tipo de Problema', ProblemType.name),
+    ('Ubicación', Location.description),
+    ('Creado (UTC)', Ticket.created_at),
+    ('Asignado (UTC)', Ticket.assigned_at),
+    ('Resuelto (UTC)', Ticket.resolved_at),
+    ('Nivel Advertencia SLA (min)', Ticket.sla_warning_sent_level),
+    ('Fuera de SLA', Ticket.sla_violation_sent),
+]
+RAW_HEADERS = [header for header, _ in RAW_COLUMNS]
+
+
+def raw_tickets_statement(start_date: datetime, end_date: datetime, date_field: str = 'created_at'):
+    """SELECT de los tickets con `date_field` en [start_date, end_date), ordenados por id."""
+    date_column = getattr(Ticket, date_field)
+    return (
+        select(*[column for _, column in RAW_COLUMNS])
+        .select_from(Ticket)
+        .join(Requester, Ticket.requester_id == Requester.id)
+        .outerjoin(Technician, Ticket.technician_id == Technician.id)
+        .outerjoin(ProblemType, Ticket.problem_type_id == ProblemType.id)
+        .outerjoin(Location, Ticket.location_id == Location.id)
+        .where(date_column >= start_date, date_column < end_date)
+        .order_by(Ticket.id)
+    )
+
+
+def iter_raw_ticket_chunks(start_date: datetime, end_date: datetime, date_field: str = 'created_at',
+                           chunk_size: int = RAW_EXPORT_CHUNK_SIZE):
+    """Genera bloques de filas (tuplas con los valores ya convertidos a tipos simples)."""
+    statement = raw_tickets_statement(start_date, end_date, date_field)
+    with engine.connect() as conn:
+        # `yield_per` activa además el cursor del lado del servidor en los drivers que lo soportan (MariaDB).
+        result = conn.execution_options(yield_per=chunk_size).execute(statement)
+        for chunk in result.partitions():
+            yield [tuple(_plain(value) for value in row) for row in chunk]
+
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime) and value.tzinfo:
+        return value.replace(tzinfo=None)
+    return value
+
+
+def _write_csv(chunks, path: str) -> int:
+    count = 0
+    # utf-8-sig para que Excel reconozca los acentos al abrir el CSV.
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(RAW_HEADERS)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def _write_xlsx(chunks, path: str) -> int:
+    count = 0
+    # Los textos de los tickets se escriben tal cual: sin convertirlos en fórmulas ni en enlaces.
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd hh:mm',
+                                         'strings_to_formulas': False, 'strings_to_urls': False})
+    sheet = None
+    try:
+        for chunk in chunks:
+            for row in chunk:
+                if sheet is None or sheet.row > XLSX_MAX_ROWS_PER_SHEET:
+                    if sheet:
+                        sheet.close()
+                    sheet_number = count // XLSX_MAX_ROWS_PER_SHEET + 1
+                    sheet = SheetWriter(workbook, 'Tickets' if sheet_number == 1 else f'Tickets_{sheet_number}', RAW_HEADERS)
+                sheet.write_row(row)
+                count += 1
+        if sheet is None:
+            sheet = SheetWriter(workbook, 'Tickets', RAW_HEADERS)
+        sheet.close()
+    finally:
+        workbook.close()
+    return count
+
+
+def _write_parquet(chunks, path: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("La exportación a Parquet requiere el paquete 'pyarrow'.")
+
+    schema = pa.schema([
+        ('id', pa.int64()), ('titulo', pa.string()), ('descripcion', pa.string()), ('estado', pa.string()),
+        ('urgencia', pa.string()), ('solicitante', pa.string()), ('correo_solicitante', pa.string()),
+        ('tecnico', pa.string()), ('tipo_problema', pa.string()), ('ubicacion', pa.string()),
+        ('creado_utc', pa.timestamp('s')), ('asignado_utc', pa.timestamp('s')), ('resuelto_utc', pa.timestamp('s')),
+        ('nivel_advertencia_sla', pa.int32()), ('fuera_de_sla', pa.bool_()),
+    ])
+    count = 0
+    with pq.ParquetWriter(path, schema, compression='snappy') as writer:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            writer.write_batch(pa.record_batch([pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema))
+            count += len(chunk)
+    return count
+
+
+_WRITERS = {'csv': _write_csv, 'xlsx': _write_xlsx, 'parquet': _write_parquet}
+
+
+def write_raw_ticket_export(start_date: datetime, end_date: datetime, export_format: str, path: str,
+                            date_field: str = 'created_at') -> int:
+    """Escribe los tickets del período en `path` con el formato indicado. Retorna la cantidad de tickets exportados."""
+    return _WRITERS[export_format](iter_raw_ticket_chunks(start_date, end_date, date_field), path)
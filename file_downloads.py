@@ -0,0 +1,58 @@
+# --- Descargas de archivos generados ---
+# Los archivos grandes (exportaciones) se generan en un archivo temporal y se entregan con una respuesta
+# de archivo que el servidor envía por partes, en lugar de cargar todo el contenido en memoria y mandarlo
+# por el websocket con `ui.download(bytes)`. Cada descarga usa un token aleatorio de un solo uso que vence
+# a los DOWNLOAD_TTL_SECONDS; el archivo se borra al terminar de enviarse o al vencer.
+import os
+import secrets
+import tempfile
+import time
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse
+from nicegui import app
+from starlette.background import BackgroundTask
+
+DOWNLOAD_TTL_SECONDS = 600
+
+_downloads: dict[str, tuple[str, str, str, float]] = {}
+
+
+def new_temp_path(suffix: str) -> str:
+    """Ruta de un archivo temporal nuevo donde escribir una exportación."""
+    fd, path = tempfile.mkstemp(prefix='helpdeskoi_', suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def remove_temp_file(path: str):
+    """Borra un archivo temporal (p. ej. el de una exportación que falló); no falla si ya no existe."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _discard_expired():
+    now = time.monotonic()
+    for token, (path, _, _, expires_at) in list(_downloads.items()):
+        if expires_at < now:
+            _downloads.pop(token, None)
+            remove_temp_file(path)
+
+
+def register_download(path: str, filename: str, media_type: str = 'application/octet-stream') -> str:
+    """Publica `path` para una única descarga y retorna la URL relativa que la sirve."""
+    _discard_expired()
+    token = secrets.token_urlsafe(24)
+    _downloads[token] = (path, filename, media_type, time.monotonic() + DOWNLOAD_TTL_SECONDS)
+    return f'/downloads/{token}'
+
+
+@app.get('/downloads/{token}')
+def serve_download(token: str):
+    entry = _downloads.pop(token, None)
+    if not entry or entry[3] < time.monotonic() or not os.path.exists(entry[0]):
+        raise HTTPException(status_code=404, detail="La descarga no existe o ya venció.")
+    path, filename, media_type, _ = entry
+    return FileResponse(path, filename=filename, media_type=media_type, background=BackgroundTask(remove_temp_file, path))
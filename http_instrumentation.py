@@ -0,0 +1,37 @@
+# --- Instrumentación del servidor web ---
+# Conecta las métricas (metrics.py) y el conteo de consultas (query_stats.py) con NiceGUI: agrupa las consultas
+# de cada solicitud HTTP, mide su tiempo de respuesta por ruta y expone `/metrics`. Se mantiene aparte para que
+# `worker.py` pueda usar esos módulos sin importar NiceGUI.
+import time
+
+from nicegui import app
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+import metrics
+import query_stats
+
+
+@app.middleware('http')
+async def _track_request(request, call_next):
+    with query_stats.track(f"{request.method} {request.url.path}"):
+        return await call_next(request)
+
+
+@app.middleware('http')
+async def _time_request(request, call_next):
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        # Se usa la plantilla de la ruta (`/ticket/{ticket_id}`) y no la URL, para no crear una serie por ticket.
+        route = request.scope.get('route')
+        metrics.REQUEST_DURATION.observe(time.perf_counter() - start, method=request.method,
+                                         route=getattr(route, 'path', 'sin_ruta'))
+
+
+@app.get('/metrics', include_in_schema=False)
+def metrics_endpoint(request: Request) -> Response:
+    if not metrics.is_authorized(request.headers.get('authorization')):
+        return PlainTextResponse('No autorizado', status_code=401)
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
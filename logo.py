@@ -1,3 +0,0 @@
-# Contiene la representación en base64 de un logo.
-# Esto evita la necesidad de gestionar archivos de imagen.
-logo_base64 = 'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAWQAAAErCAYAAADpFfmZAAAAAXNSR0IB2cksfwAAAARnQU1BAACxjwv8YQUAAAAgY0hSTQAAeiYAAICEAAD6AAAAgOgAAHUwAADqYAAAOpgAABdwnLpRPAAAAAZiS0dEAP8A/wD/oL2nkwAAAAlwSFlzAAALEwAACxMBAJqcGAAAAAd0SU1FB+kKBRQxHqeMOQQAACAASURBVHja7d15uB1Vne7x7y8n80AGMjDEhCQMYZZGEUSgxSsIjo1c5aI4YIPSODwtIGLTjfq0txFBLyherhel0Sa22IADiNgMMgrIIFMwQGZIyEiGk/mc/PqPqtM5hnP2rlqrap/aZ7+f58nzwD41rFpV9e7aVavWAhEREREREREREREREREREREREREREREREREREREREREREREREREREREREREREREREREREZGWYzEzu/uNwB7AtpLKNwS4zcy+UcXKc/cDgSuAUcDWChVtMLABOM/Mnqlo3V0EvBfYUrGiDQF+bWb/UtF6Ozg95kZU7JhrS/Pkf5vZ7RWtu38A3l3iMTcIWGJmHwpdwMDIArwTGFNyPS6p8BfaWODECpdvTIXL9kbgqIqWbXHF9+k7K1y+N1S4bIc14JhbEzPzgMiVv9qASlxZ4R3cDqyraNnWp+WrqlUqW/Axt151V9ksicrE2EAe0IANtArvYKtw+apcb82wX1V3KlvDM3EA1Te+wmUbSXL/uKplG6392u/KNjrdt6q7/lU2IP4eck8WAc8W9I00HLi/wvW3CPgm1XvAMhjYCCyocN3dDCwHNlesXEOBBypcbwuAy9Jzo0rHXFeWPF7hursf2DU9N2JtB6YBB1Rm69x9jr/edxER6efc/awe8m9OzDLLuGUxRLtKRFrAiKIXWEYgm/aTiLSAtmYIZBGRVuAKZBGRfkqBLCKiQBYREQWyiIgCWUREFMgiIgpkERFRIIuIKJBFRESBLCKiQBYREQWyiIgCWUREqhLInvEzEZFWEJV/sYE8qYfPxmifiEgLGJ4xEzOLHVPvSWBqt2+FAcBc7ScRaQGvAvNJxteDZHCOhTELjBrdw90HkvSa792W12FmndpXItKfufsAYNBO+ddpZh2qHRERERERERERERERERERERERERERERERERERkb5gqoLa3H0wMBIo+3XwQcAGM9ukWm/o/t0LmALsD4wGul57bQM2kvTN8pKZvdSAsuwH7JP+a2NHHwkDSfpNeBGYa2bLSy6HAQeT9FOzT5oT3furWQzMA54xs806ioozUFVQ1xeAj3c7UcsyBLgd+OJOJ8eHgY/28oUwAFgFXFjvJHX3s4H39rIcS0/+fzCz2SWe6OcAJ3ULmp3L4MCVZnZPA8LvZOAM4Dhg9zqTr3T3+4BZZnZTweUYCJyV1svbgLF1ZnnB3f8I3GxmNxdclgnAp4ATgaPSY7KWR9J6+aGZzVFUSCOuoL7njfPbHtZ/eYb5ZmTYjn/NsJy3l1yXszKU4eySy3CQu/8sYh/d5+6HF1SWM9z9mYiy3O7uUwoqywXuvjCwHCvc/VvuPkyJEUcjhtT3Wh+va02deZYCWzMse1m9cxLYUPL2Zfmpva7EMH43cB/woYjFHAM8kF7tx5Tl28CPgYMiFvMu4C53PzqiHCPc/ZfAZemtmxDjgfOBe919qiJDgVwm6yfrshary52D5wPAzRluCWQxFPi+u38+sCxXA39f0KbtDdzp7ocFlGM0cCfwvoLK8mbgQXefqdhQIIv0FjwnALcAgwte9JXufmbOsnwR+LuCyzEU+JW775GjHAOAG4EjCy7LnsCv3X1XHXkKZJGergK/V+Iqvuvu0zKWZQbwtZLKMRm4NMf0XwVOKKkse5PcwhAFcuHaGrgutXop3lkkTbfKMjwNtyy+QNKEsixnuPshGb4YplHcLZPenFPUA8dWogCob3QD1zVS1V3o1fEI4DMZJ98E/AF4Iv3vN6U/57Pcc/4bd7/IzJbUKMtY4D0Zy/Ia8BDJmJXbgbeSPEwckmHec4FP15nm4zmOtYXAvSTtsaeSNIfbP+N5c3rOq3YFsqqgrlkkDeG39PL3bcABGU78XwB3k7wA0lsYP67qLtThwIwM080BPmVmD+4UovsD/x+o14phFPAB4Ps1pnkTkOXWxt3AZ83s+Z3KcixwHTC9zvxvdvdBZratxjRZHwBeBXzNzFZ3K8cg4PPA5RnmP8HdL9cYc9LoK7FDMrTV/GTgsi+us9wl7v6GDMu5rM5ytrv7ESXX05UZ6um0Atf3tQzrW5y+ENHrVba7P5phOdfXKcuFGZax3N3H1znO1tZZxlp3P6jGMka6++MZyvL/6mzPBRmWsdHdpyshstM95GLsnmGacaqmhjs0wzTfMrMVvf3RzDYA/5RhOfulV4+9yXI/9SYzW1mjLE+TtF2uZRdgYo2/7wnUa5a2HLi41gRm9i3gT3WWMyzDFb0okPvmQlpV0HC71fn7BpKmX/U8mN7WqGUstZ83ZGkG9p8ZprkzwzR71inn8Drz31PrS6qbWyPLIgpkaZHbSKOAMXUmm0v9NyExs/VAvc6FxvX2Kyjtr6LeleJ2YH2GTZufYboRNf6Wpa3yCxmr+fmCfj2KAln6uV0zBPL6HL9c6vVqNp7eb0t1dd5UyzqSh8dZztl6Zd4aecXanrFONmUoi66QFcgibKV+D30LzGxLxuUtqvP3bem/Hi+Sqd99a2eG0IekXXy987bWK+pZtnd+xjqZn4ZyzBeZKJBF6gZXzLShZcnSDHV7hqvSwQ3KBeWHAlmkT47/qpwrI0naPdfiDaqXAWiQi0LpxRCR5rIOuBZY0e12wKL088FpQN6talIgi0jJzOwpkv45pMV/somIiAJZRESBLCIiCmQREQWyiIgokEVEWpeavYlUlLuPA04m6Sxoa4ZZjGQAhLvM7CXVoAJZRIqzH/CTgPkuINuIHlIxumUhUl3bCOucZ52qToEsIsXaTv1uO3uiMewUyCJSEerwp0lF3UNOR0IYzI6+XgcCm8xsu6pWRPozdx9AMm5g1y+SNmBzTP7FPtS7EZjUrUCDgauBf9PuEtGv2H7udOBcdrSAGUjSaf9H+yqQj+f1Azverv0kUoih6T+ppunAkTt9tkfMAmMDeWkPgbxe+0mkEC8D/4cd7ZA7gQnAKcAQVU+f6ynrFscsMDaQe/o5pQcKIgUws0XA33f/zN2nAO9SIFdjF/XwWVvRgSoi1TWR5G086YcUyCLNxVUFCmQREVEgi4gokEVERIEsIqJAFmklVtK0ZZfZKlIvauKqQBYpzJaSpi0zCLdRfm9um3NM16nDSIEs5V4N9gdtGY7v0WkHMVnskuFcijmfOjMG4RDi2iFnKePojMsaTdJ/Tb39IArkltGZXjVlubJqJR0Zrt6mkv2Ntz3r/H17jfVZhhAdAeyWoRxvAIZHfPlmuaKdlrFOpmQIZF1BK5Bbah8NJekCkMgTw/rT8WBmS4HVGa7wsnaVWK+Tn1eBFTXCur3O/MOB8RnKkeXquNZV6fwM8w/PWCcjMkyzQKewArmVjAPelGG6w5slSwtcVr2hjKZlqRd3nwG8pc5k7fTSsZaZdQLzMpR37wzTvCXDNMtr/G1NhvmPyVi/J2SYZqVOUQVyfzI3wz78TJ1AeTtJhzT1TuJlfbytDqwqcHlPZZjmXzJMcyEwss40c8ysVtgtzbCej9TZj+OBM+osowN4pcbfF2Y4po5w9zPrlOVYkl7n6vmzTmEFcn+S5crqeHe/rJcT5wjg2gxXni/WOZEbZbq77+3u++f4d0gaVju7P8P6jnX3q2oEzz8BZ2VYzp/q/P3ZLFe/7v6lXsoxBPgBsGudZcwHXuj154fZiozH1BXu/o5eyrJfekzVy4/ZwEs6hbMbqCqovOeAOSRDwtdygbsfA9yWngRjgLcCp5LtHvMTZra1ArcrLk9//g/MeRzfQDJ6Q3f3pcuqd3X7OXc/FPgl8BhJa4fDgJOA92dYfwfw2zrT/DG9hVKvtcY33f3IdHlPk9wPPgr4MNluTT1d50q9K7TrGQPc6u43pMfUQmAycCzwMZJ+meu5z8w26BRWIPcbZrbO3e/NEMiQjF5wZOCqfl2RTR5BtodFOxvaQ90tdfcbgTOzXCmn/7o6gh+WY92Pm9kjdfbjPHe/J2PA/036b3P6JZWn7+OfZ5hmFnB2xjr9VPpvI9kf9nXRUG66ZdEvXUnYcPBZ/dHM/rPJ62hNjbrblGM5g3OGMcDXMk73A/J1nzk0Zxg/a2Y/y/Alfy/5h1rLG8a3m9mDOnUVyP3xKnk2cE2Jq/hKfz2Wzexp4NslrneWmd2ecT/+BrijxLJclGPa89gxOGcZvqozV4Hcn11Eci+5aN8xszv7+RfaxcBdJSz6aeDzOec5l/rto0NcZWa35qiT54G/LanKv25mj+qUVSBXWdRID2a2juT+48sFlul+4B9bpP4/CDxQ4PKeB95vZqty7sd5wMkk92SLcjNwfsAx9RPgnILr+dtmdolOdwVyX8rycHRY7ErMbA5wdEE/e68DTm7wU/C2vtoHZrYW+B/A1QWs6ybgWDNbELgfHyF5gPhQAWW5GviQmW0LLMs1wOlka3lRyzrgQjM7T3GgQG6GQB5axIrSkYhPSq+Ins05ewfwIHCKmZ1pZu0NrqdxJS57fIa622JmnwXeDdwdsI7HgNPM7FQzWxm5Hx8HjgO+RNJeN49OkmZ0p5jZZ9M3AWPK8lPgzcB3yP+q83LgJ8ARZnaZoiDy/I76De4+B9h3p4/PM7Nvt1IluvsEktdNt/H61hADSPofeCL0iqrGegeRNI86EjgU2Cdd3x7seJW3Pb36+QPw+/QJe1/V07EkbWqL/Lk+IP2ye9DMHshZnpPTq+aZ6XE8kh1dW7aRtM5YRPLG311m9quS6mUo8IH0GDqE5JXuAd2OpYEkryC/CDwJ3G9m95RUlonAe4G3pfUypetP7OiL+VWS5xkPAb81sxdbMTzd/YvAFTt9/JCZHa1AbnHuPpBkiPgBJI36N6f/tqRvZ0n9IBraLQQt/YJd3cgXZtI38iak6/duXzrtZra6wXUyjNe/GWjA2vSZRqsfM4UHsl4M6S8/dcw6gCXp/76sGsldf8srUo4tVdl/ZrZJx1Jj6R6yiIgCWUREFMgiIgpkERFRIIuIKJBFRESBLCKiQBYREQWyiIgCWUREFMgiUnnubqqF2tSXhYhkDdTdSQZHHUS+MR67Bmq9jKTXOlEgi0ikrxM+7NOPSbqDlRIDeVoPn41RtYr0u6vjGRFhfIuZfbwfVktPWTelLwP5uyQjNXTvt/UPOnxF+p2rAud7HPhEP62TP5CMltK9D+35OlREpMyr43d4mOfTjv9FRKSgQP5xQBhvdfe3qfZERIoL4yPcfUtAIH9BtSciUmwg3xYQxr9RzYmIFBvGbwkI41fS9soiIlJgIN+TM4w3uvsbVXMiIsWG8SkBV8d/p5oTESk2jAe5+6M5w/j/quZERIoP5NNyhvFD7q5uGERECg7jNneflyOMF+shnohIOYH8lRxhvN3d365aK45+ZohIVxiPAc4CtgDtNSZtAwYD55vZPaq54qjDaBHpCuSRwASgE9hWJzfazGyxak1ERERERMqjWxbSFz+NhwHDSPrR9m5/agM2m9kG1ZIokEXKCeBDgAOAQ4A9gRkkoy1s3ymQBwFrgTnAy8DTwGwze1a1KApkKSOcjgCOB7ZGLmowMA+4ycw6K7idU4HTgZOAgwkf2us14M/AncBPzez5BpX/cOBdwKYcsw0BVgGzzKw9Yt0HAu+h9oO1nowAnjCz2wLXezDwbqCDfIOYDgUeN7M7dIZLswXyDV6c1e4+tmLbt7+7X+Xua7147e5+ffqlVvZ2XBxYxjXpl1HMus+OqKNbI9b7xYj13qSzO94AVUHDTSlwWWOASgSyu09092+ltxk+B+xSwmpGAB8DHnH369x9rxI3aVPEfFsi170xYt6YkZ1XR8y7Vqe2ArnZro5HAkWGiAFvrMB2vQN4BDifxr1s9AngQXc/taTlbw+cr6OIKo2Yt7OP1rtdZ7gCudnMIGl4X6T9+jiMPw3cVvAXTVZ7AD9393/UoSUKZMnrAJIHP0Wa2Ydh/CXgmhK2Ka+vu/tndXiJAlnyOKiEZfbJFbK7nwN8s0J1+113P12HmCiQJaupJSxzd3cf1+AwPhr4fgXr94caQkgUyJIlxNpI7iEXHsgkL1w0ajvGAP9W0WoeCvzY3QfriBMFstQyPg3Pog0iebjVKOfTNw/wsjoY+LION1EgSy17AZNKWvaBDbo6HknS3KzqPufuu+mQEwWy1LpyG1rSsvdv0DacR9IXRTP8GrlEh5wokKU3ZbaGmOzuQ8ssvLuPB84ucJGdwArgFWAJsIz4N9y6O7vkN/lEFMhNbNcSl30g5d/XPYZi7lW/AlxK0onNYWnZDyR54/AE4BvAooKO7ffrsBMFsvRkRInLHg6Ufc/0fxawjFnAMWZ2kZndYWavmNlaM1tjZq+a2X1mdnEa/jcXsL7TdNiJAll2/rk/jHLaIHe3b4nlHwOcGLmYa83sI2Y2v96EZrbIzD4I/CxynYe5+746AkWBLN1NovxOgPYucdkHADEvnzwMnBsw31nAcxHrHQK8SYefKJCluymU39/DjBKXHRNqW4CLzCx3h/xmth74SuxVsg4/USBLd41oJ3yYu4+oYPkXmtnvQ2c2s19FXiUfoMNPFMjSqNsJ3a/Cy3pjL6bt8VMFrP83EfOO1+EnCmTprhF9TbRRQlecab8QMUF/fwHFiFnGBHffXYegKJCF9IWNvE/6nbARGEaVsAlDI5e7oIAyxCxjFDBaR6IokAVgGvnHvXsA+PeQq8ESyt9J+LBEW4EXCihD1xt9ITrIP3qziAK5n5oJjMw5z2MkwyLldUjFtr2DuAE7uwf7Bh1KokCWWFNJBiPNY3n6L68ZFTy+imju1waoj2Pp96JGCE5HGx7X7SfhEOAxM5urqv1vhwbMs5CwjnamuvsuZrauQtvvFVuOSDEHpPsMkjb6XefqYGCpmQU/hI4dsn0WMHGnzy4m6SBGO8x9IGHtYJcAm0ju37blmG8SyQPEx1T7IqU7DfjnnT57kYhuDGJvWfT09lWH9tN/m9jDF1Y9W9JAXgmszznvMKp320Kkv+op66KedcQGck8PbPREu9stBPK/VLEBeBV4GVgVsE4N8inSGNuqFshS2+4kY97lsQhoN7OONJjzmqxqF+kzFjOzArlcIUMrzTazrgdYCwPmn+HuQ1T1Is1HgVyukNsH3UN4XsD8e1HOCyIiokBuTukr01MCZl3Qy39ntRvJrRIRUSBLaixhnf0s6OVqOSujcaNQi4gCuSlMAXbJOU8HSZO3Li+StEfOa29Vv4gCWXYIuX/c1f64ywrCblvoCllEgSzdhNyuWASs7vb/m9PPcl8hu7v2rYgCWbpCMWCel7uPPWdm2wOvkPcm7IGiiCiQ+5f06nSfkEDu4bOQB3sjgf20J0QUyJKEcUjTs546c38psAwztRtEFMgCB5F/2KNOklYVPV0hh3Q9eYh2g4gCWZLbBXnfaX+Nv2zy1mUVSWuLvKZrN4gokCV5fTmvFcDiHj5fBiwNWN5kd99Fu0JEgdyy3N0Ie6C3ysxe9xKImbUT9mDvDag9sogCucWNI38fyADza/xtQcDyhgSWQ0QUyP3G1PTqNK9aPbstCiyLWlqIKJBb2jRgaMB8C0oI5KnaHSIK5FYWOqbdwjp/C+lkaJ90oFURUSC3pJDbBBuAuXWukNcELPcgkv6RRUSB3FrSq9GQFhYLqN20bRl/2QtcVhPIP+q1iCiQ+4VxwIEB8803s15H607H2FsYWCb1jSyiQG5J00hGCgm5Qq5nXmCZ9MaeiAK5Je0TON/CgqbpyWHaLSIK5FZ0aOB8czNMMztw2Ye7+yDtGhEFcqsJaWGxnWy3I2aTjLmX1yTU0kJEgdxK3H0wsG/ArMv4y2GbetNOzx3Y1zMc9WkhokBuMTMIa2K2hKSLzXrWE9anxQCSh40iokBuGdOBkO4u55nZxnoTpc3iQh/svVG7R0SB3Er2DqzPhSVN251uWYgokFvKXoHzLcgx7dzAdUxw92HaRSIK5H4vHWX6wMDZF+eYdmngOiajN/ZEFMgtYlfC3ohbBTyVY/oXCOvTYhfCRsEWkQZS14zFmETY6ByrgPa0yVy9fbENWEtyH3l8wLr2B36nXSWiQO7vJhPWKf104GFgC9BWZ9qOdH+Fdjp/gHaTiAK5FewfUf+Nure7l7sPMLPt2l0i1aR7yMU4uAnKuC9htzpEpEkC2Vu9At3daI4WDFMI6xpURBqUibGB3NN907YW2wFjCe92s9FfvofqfBEpTE9ZN6QvA3mIApl9aZ7e1BTIIuUG8tCYBcY+1DsRGM2ObiEHAi+1YCA3C3UyJFKc64EHd8q/1TELjApkM3ta+4RDmqisB2l3iRTDzJYS/vZsj9TKIt5+TVTWPdx9gnaZSDUpkCOkLSymNFGRx6CuOEUUyP3UXjRXHxFtNNc9bxEFsmQ2FRjXZGWert0mokDujw6k+Zr5Nbqzei9oGa30EtJWnVqtSX1ZxAl9IWQl8AuSgUuHBJysQ4H3EXa7ZJK7t5lZZ4PCuKNCy2kWu+jUUiBLfqHteu83s7OiEsp9F+B/Bcw6neQ+8vM5fkWF/pIakn5pLIqs5xGEdW8aW/4QHQVc4cbc5zedls1LtyzCA3E0yUjTIVYVUIRXA+cbQ/4uPD3i+JpRwLZOTkM5NKBCQip0m0cRNvp4d5si5h2ss1OB3Ip2j7hCXljA+udHzLtX5jQzWw8sj1hXES/OxLzQsgx4JWC+0FdgxxLfFDKmb5QlOjUVyK1oCjA8cN4FBax/UQNP+JhAPqqAbX1HxLyvmdmGkPkizqkDI7f3yIh5V+jUVCC3otCrtk2Ejx7d3WJgY+C8M9OBWbN6NqKcB7h7cFttd58CnBCx/hcC55sTsc73RGzvOyOvsNfr1FQgt6LQBy+vEf+Qq+sKOfTn6eHku8/5ZEQ5xwMXR8x/Kcl971DPBM63DNgcOO/x7v6+wHnPJfxheyfwJ52aCuRWFDpG3RoK6JDEzFamoRFiEpCnT4unSAZZDXWWu+duEeLunwY+HLHeTuCRwHlfBl6MWPc17j4t5/aeCJwUeXX8gk5NBXJLcfeYTukXFjiu3SsR8+Zp/bAQ+GPEugYBs9z9Uznq+PPANZHH6CLg0cAvvPXA7Ih17w7ckDWU3f2TwI3EtZKYnfZAJgrkljKT8KZNcwssR0xrjcxX+GbmwM8KKO+17v4jdz+uRjC92d1/BFxZwPpujfzyeyRy/UcBD7v7V9z9OHefnHZIhbuPdfe93f0j7n4T8CPiXwj5vU7N5qYXQ8KMi/gym19gOWKWlXccwDvS2xaDIsv8SeCj7j4beA5Ym9bliPSLbiYwsqD6+Wnk/L8jeQg7LGIZE4FvpHW3HFjt7lvSY2gk8W2Wu7tdp6YCuRXFBMbCAsuxkOQFhpAXHw7P+RN+jrv/Eji1gHIPIhlOqswhpR4EHo9ZgJk95+5PAEcXtM17Ev7GYT3PEPfwVXTLomnFdNBT5BBXCwhv+hbSWf0VhLc8aLTvmFkRnfRc3STbe31ge2tRIDe90DbIy0ie3hcZyKEvMIwiZ9M9M3uYuId7jXIXcHNBy7qJ6rdceBX4V52WCuSWk75QEfrK9DwKbLhvZhtJXhAJMYSwttSXNsFuujh9EFlEHW8Fvlrx7b3SzFbp7FQgt6LdSNrxhlhY0M/onUM+1MyAgPoN8IOK76NvuPtRBS7vP0ge8FXRc8A3dVoqkFvVdPK9VPEXgVxCeWJaWgTdejGzTwMPVXgfHQ/c5e7/4e4fc/fD3H1C+m90wPZuAz5DXC9sZbmwqF8DokBuRtMIb7y/oITyxIT8RHcP3ZYzKeYV8LIMAz4IXA88kf57Ergk8EtoPnB+xbbxy2Z2m05JBXIr26+PwrM3MS+aDCOwn2EzmwMcS1zHQ400maTJWWi3mpjZ9ysUypeYmW5VKJBbXmgfFpspp6/aVwgf3mgiEYO0mtnC9PbADU20/6KaHZrZFcA5JH2S9IXVwPlm9nWdigrklpYOmxTah8UrhI/yUcsysg/HtLMJ5OisvpeAWmFmHwU+FFGORiqiY6drgLcBtzS47L8D3pp+KZRyiOssVyA3k30Ib4O8jriO3mstN6bJUxFvoWFmPweOAS6g2NfDi7a8oO19zsxOAT5Gcn+6TM8Cp5rZiemtorLEdHM6TvEQT69O59NB8mBoXc6ridHALWU8DTczd/db0pMp78/o0SR9SRRVllXA5e7+Q+B04AySWzyjIhe9FthCfL8P2yi4A3cz+0naOdC7SPrpOIJi+qdYQdK50bXAXWbW3oDj+6V0ndvIdxtsFPCw4qGA40lVIGVy98PTsDqU5EWU3TME1jKS++0vkHS4/ts0SO8gbtDUpcAxZja3xO2dDvx1+mthH5JmkvVGTOlMA3gxSf8bTwK/NzP1baxAFiktrEaTjCAykaSrye09HI9r09sKK9M+ibvPfxxwN+G32p5LA/m1Bm1vV4dCE9NfMJ3pT/s9SJpAtqfbvCr9dbMsfftSRKQpQv3jHu5+1aBUmR7qSXP9pDO7HvhI4OwrVYOiQBYpNpRnASeTf4ilNao9USCLFB/KtwNvAb6XI2hfVs2JAlmknFBuN7PPAccBV1F/lOhNqjWp9DGtKpD+Ih0B5TCSts9/RdIR1CSS4ZO2AheY2a9UU6JAFumbkB6cHudeQl/UIiIiIiIiIiIiIiIiDRH1UM/dv0zSp+629KPBwKNm9u+qWhHpz9K+VT5A0hMhJK15VpjZpX1VoDU99BfwC+0qEWmBQL6kh/yLehs09sWQnkbAWKZdJSItYF3GTGxYIFsJyxQRaQaW8bOGBbKIiBREgSwiokAWEREFsoiIAllERBTIIiIKZBERUSCLiCiQRUREgSwiokAWEREFsoiIAllERBTIIiIKZIW8iAjQ1gzh+Zr2k4i0gCVFL3BgCYX8K3f/RBr2VkD5/mxm91Zxb7j7SOAgkrG0tlfsl8824Fkza69o3c0A9qhYvXXV3RIzm6tjLpeuc/3PZrayonV3HDAT6ChgcVuAzJwl0wAAAP5JREFUE6q2gXO8fDdW9evR3Y9w961eTdvc/cgK1911Xl3XVbjejkz3bVWdUeG6u7EB2z+narcsiramwmXbzo4Rt6tmG9BZ4brrUNmCdFb4mKt63VU5SwoJ5Eb8ZNpe8YOvQ2UL/sJQ2frfft1a8QuoSq8jNpDHNWADR1V4Bw8FRlS0bCPT8lHh8qlsYcec6q66WRKVibEP9RaRNP3YXNLGDQeWV3gHbwHmA2NLrIPQk3ZtWr6qWpH+hNxQsXKNSMtW9WNudMWOuUEkD/baK1x3y0lagW0s8bxbhIiIiIiIiIiIiIiIiIiIiIiIiIiIiIiIiIiIiIiIiIiISAX8F0h3/HJTdp1lAAAAAElFTkSuQmCC'
\ No newline at end of file
@@ -0,0 +1,102 @@
+import asyncio
+import enum
+import heapq
+import itertools
+import os
+import time
+
+# --- Límite de envío SMTP ---
+# Correos por minuto permitidos por el proveedor y ráfaga máxima tolerada.
+# Con SMTP_RATE_PER_MINUTE=0 se desactiva la limitación y los correos se envían de inmediato.
+SMTP_RATE_PER_MINUTE = float(os.environ.get("SMTP_RATE_PER_MINUTE", 60))
+SMTP_BURST = int(os.environ.get("SMTP_BURST", 10))
+
+
+class MailPriority(enum.IntEnum):
+    """Prioridad de un correo saliente. Un valor menor se envía antes."""
+    SLA_VIOLATION = 0
+    SLA_WARNING = 1
+    ASSIGNMENT = 2
+    UPDATE = 3
+
+
+class TokenBucket:
+    """Token bucket clásico: `rate` tokens por segundo, hasta un máximo de `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Segundos que faltan para disponer de un token (0 si ya hay uno)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class PriorityMailQueue:
+    """
+    Cola de correos salientes ordenada por prioridad y limitada por un token bucket.
+
+    Cuando el proveedor limita el envío, los correos de menor prioridad esperan en la cola
+    y cada token disponible se asigna al correo más urgente pendiente en ese momento.
+    Dentro de una misma prioridad se respeta el orden de llegada.
+    """
+
+    def __init__(self, deliver, rate_per_minute: float = SMTP_RATE_PER_MINUTE, burst: int = SMTP_BURST):
+        self._deliver = deliver
+        self._bucket = TokenBucket(rate_per_minute / 60, burst) if rate_per_minute > 0 else None
+        self._heap: list[tuple[int, int, str, str, str]] = []
+        self._counter = itertools.count()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    def put(self, to_address: str, subject: str, html_content: str, priority: MailPriority = MailPriority.UPDATE):
+        """Encola un correo. Debe llamarse desde el event loop."""
+        if self._bucket is None:
+            self._deliver(to_address, subject, html_content)
+            return
+        heapq.heappush(self._heap, (int(priority), next(self._counter), to_address, subject, html_content))
+        self._ensure_dispatcher()
+        self._wakeup.set()
+
+    def depth(self) -> int:
+        """Cantidad de correos retenidos por el limitador."""
+        return len(self._heap)
+
+    def _ensure_dispatcher(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self):
+        while True:
+            while not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # Se espera el token antes de elegir el correo, para que uno urgente que llegue
+            # mientras tanto pase por delante de los que ya estaban en cola.
+            wait = self._bucket.wait_time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            _, _, to_address, subject, html_content = heapq.heappop(self._heap)
+            self._bucket.consume()
+            try:
+                self._deliver(to_address, subject, html_content)
+            except Exception as e:
+                print(f"ERROR: Could not dispatch email to {to_address}. Reason: {e}")
@@ -12,6 +12,8 @@ from datetime import datetime, timezone
 from database import SessionLocal, get_password_hash
 from models import User, Ticket, TicketStatus, TicketUrgency, ProblemType, MailSettings, UserRole
 from crypto_utils import decrypt_text
+import ticket_events
+import metrics
 
 # --- Constantes para la lógica de reintentos de conexión ---
 MAX_RETRIES = 3
@@ -25,6 +27,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MESSAGES_SCANNED = metrics.Counter('helpdeskoi_mail_messages_scanned_total', 'Correos no leídos revisados por el lector de correo.')
+TICKETS_CREATED = metrics.Counter('helpdeskoi_mail_tickets_created_total', 'Tickets creados a partir de correos.')
+
 def get_body(msg):
     """Extrae el cuerpo del mensaje de correo electrónico."""
     if msg.is_multipart():
@@ -97,6 +102,7 @@ async def check_new_emails():
             email_ids = messages[0].split()
             if email_ids and email_ids[0]:
                 logger.info(f"Se encontraron {len(email_ids)} correos nuevos.")
+                MESSAGES_SCANNED.inc(len(email_ids))
 
                 for email_id in email_ids:
                     res, msg_data = mail.fetch(email_id, '(RFC822)')
@@ -170,6 +176,8 @@ async def check_new_emails():
                         db.add(new_ticket)
                         db.commit()
                         logger.info(f"Ticket #{new_ticket.id} creado exitosamente para el usuario {user.username} (pendiente de clasificación).")
+                        ticket_events.publish(ticket_events.CREATED, new_ticket.id)
+                        TICKETS_CREATED.inc()
                         
                         mail.store(email_id, '+FLAGS', r'\Seen')
 
@@ -5,13 +5,14 @@ import ssl
 import socket
 
 from database import SessionLocal
-from models import MailSettings
+from models import MailSettings, UserRole
 from crypto_utils import encrypt_text, decrypt_text
 from main_layout import create_main_layout
+import session_user
 
 @ui.page('/admin/mail_settings')
 def admin_mail_settings():
-    if not app.storage.user.get('authenticated', False) or app.storage.user.get('role') != 'administrador':
+    if not session_user.has_role(UserRole.ADMINISTRADOR.value):
         return ui.navigate.to('/')
 
     db = SessionLocal()
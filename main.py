@@ -1,9 +1,8 @@
 from dotenv import load_dotenv
 from nicegui import app, ui, run
-import asyncio
 
 load_dotenv()  # Carga las variables de entorno desde el archivo .env
-from sqlalchemy import func
+from sqlalchemy import func, or_, and_
 from sqlalchemy.orm import joinedload
 from datetime import datetime, timezone
 import imaplib
@@ -12,19 +11,27 @@ import os
 
 from database import init_db, SessionLocal
 from models import Ticket, User, ProblemType, UserRole, TicketUrgency, TicketStatus, TicketUpdate, SLA, MailSettings, ITILCategory, ITILSubCategory, Location
-from auth import authenticate_user
+from auth import authenticate_user_async, LoginThrottled
 from datetime_utils import to_local_time, format_utc_time
 from main_layout import create_main_layout
-from mail_reader import check_new_emails
-from sla_checker import check_sla_warnings
 from crypto_utils import encrypt_text
 
 import notification_manager as notifier
+import ticket_events
+import ticket_transitions
+import session_user
+import http_instrumentation
+import background_jobs
+import scheduler
+from ticket_transitions import TransitionConflict
 from search import search_page
 import dashboard
 import mail_settings_page
 import reports_page
 
+# Entradas del historial de un ticket que se cargan al abrirlo y cada vez que se piden las anteriores.
+TIMELINE_PAGE_SIZE = 20
+
 # --- PÁGINAS DE LA APLICACIÓN ---
 
 @ui.page('/')
@@ -44,386 +51,451 @@ def show_ticket_details(ticket_id: int):
         return ui.navigate.to('/')
 
     create_main_layout()
-    main_container = ui.column().classes('w-full')
-
-    def build_ticket_view():
-        """Construye o reconstruye toda la interfaz de la página de detalles del ticket."""
-        main_container.clear()
-        with main_container:
-            # --- Lógica de Acciones ---
-            # Se definen aquí para que tengan acceso a las variables de la vista que se está construyendo.
-            def handle_details_update(new_title, new_description):
-                db = SessionLocal()
-                try:
-                    ticket_to_update = db.query(Ticket).options(joinedload(Ticket.creator), joinedload(Ticket.technician)).filter(Ticket.id == ticket_id).first()
-                    if not ticket_to_update: return ui.notify("El ticket no fue encontrado.", color='negative')
-                    current_user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-                    if not current_user: return ui.notify("No se pudo identificar al usuario.", color='negative')
-
-                    update_comments = []
-                    if new_title != ticket_to_update.title:
-                        update_comments.append(f"Título actualizado a: '{new_title}'.")
-                        ticket_to_update.title = new_title
-                    if new_description != ticket_to_update.description:
-                        update_comments.append("Descripción actualizada.")
-                        ticket_to_update.description = new_description
-                    
-                    if update_comments:
-                        update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment="\n".join(update_comments))
-                        db.add(update)
-                        db.commit()
-                        ui.notify("Ticket actualizado.", color='positive') # Notificar al usuario
-                        notifier.notify_ticket_update(ticket_to_update, update)
-                        build_ticket_view() # Refrescar vista
-                    else:
-                        ui.notify("No hay cambios para guardar.", color='info')
-                except Exception as e:
-                    db.rollback()
-                    ui.notify(f"Error al actualizar: {e}", color='negative')
-                finally:
-                    db.close()
-
-            def assign_ticket(technician_id):
-                db = SessionLocal()
-                try:
-                    ticket_to_update = db.query(Ticket).options(joinedload(Ticket.technician), joinedload(Ticket.creator)).filter(Ticket.id == ticket_id).first()
-                    if not ticket_to_update: return ui.notify("Ticket no encontrado.", color='negative')
-
-                    tech_user = db.query(User).filter(User.id == technician_id).first()
-                    current_user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-
-                    ticket_to_update.technician_id = technician_id
-                    ticket_to_update.status = TicketStatus.ASIGNADO
-                    ticket_to_update.assigned_at = datetime.now(timezone.utc)
-                    
-                    update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment=f"Ticket asignado a {tech_user.username}.")
-                    db.add(update)
-                    db.commit()
 
-                    ui.notify("Ticket asignado correctamente", color='positive')
-                    notifier.notify_ticket_assigned(ticket_to_update, current_user)
-                    build_ticket_view() # Refrescar la vista
-                except Exception as e:
-                    db.rollback()
-                    ui.notify(f"Error al asignar ticket: {e}", color='negative')
-                finally:
-                    db.close()
+    # --- Estado de la vista ---
+    # Cada sección de la página es un `ui.refreshable` que se redibuja solo cuando una acción cambia lo que muestra.
+    # El historial se muestra del evento más reciente al más antiguo: al abrir el ticket se leen las últimas
+    # TIMELINE_PAGE_SIZE entradas y las anteriores se piden al llegar al final de la lista. Las entradas nuevas
+    # se agregan arriba sin volver a dibujarlo.
+    state = {'ticket': None, 'editing': False, 'last_update_id': 0, 'oldest_update': None, 'has_older': False,
+             'loading_older': False, 'catalogues': None}
+    refs = {}
+
+    def load_ticket():
+        """Lee el ticket con sus relaciones (sin el historial, que se carga por separado)."""
+        db = SessionLocal()
+        try:
+            state['ticket'] = db.query(Ticket).options(
+                joinedload(Ticket.requester),
+                joinedload(Ticket.creator),
+                joinedload(Ticket.technician),
+                joinedload(Ticket.problem_type),
+                joinedload(Ticket.location)
+            ).filter(Ticket.id == ticket_id).first()
+        finally:
+            db.close()
 
-            async def reject_ticket():
-                with ui.dialog() as dialog, ui.card().classes('rounded-lg'):
-                    ui.label("Rechazar Ticket").classes('text-lg font-semibold p-4')
-                    with ui.column().classes('p-4 gap-4'):
-                        reason_input = ui.textarea().props("filled label='Motivo del rechazo'").classes('w-full')
-                    with ui.row().classes('w-full justify-end gap-2 p-4'):
-                        ui.button("Confirmar Rechazo", on_click=lambda: dialog.submit(reason_input.value), color='negative')
-                        ui.button("Cancelar", on_click=dialog.close)
-                
-                reason = await dialog
-                if reason:
-                    db = SessionLocal()
-                    try:
-                        ticket_to_update = db.query(Ticket).options(joinedload(Ticket.creator)).filter(Ticket.id == ticket_id).first()
-                        if not ticket_to_update: return ui.notify("Ticket no encontrado.", color='negative')
-
-                        current_user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-                        
-                        ticket_to_update.status = TicketStatus.RECHAZADO
-                        update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment=f"Ticket Rechazado. Motivo: {reason}")
-                        db.add(update)
-                        db.commit()
-                        db.refresh(update)
-                        
-                        ui.notify("Ticket rechazado.", color='positive')
-                        notifier.notify_ticket_update(ticket_to_update, update)
-                        build_ticket_view() # Refrescar la vista
-                    except Exception as e:
-                        db.rollback()
-                        ui.notify(f"Error al rechazar ticket: {e}", color='negative')
-                    finally:
-                        db.close()
-
-            async def reassign_ticket():
-                db = SessionLocal()
-                try:
-                    current_ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-                    technicians = db.query(User).filter(User.role == UserRole.TECNICO, User.is_active == 1, User.id != current_ticket.technician_id).all()
-                    tech_options = {t.id: t.username for t in technicians}
-                finally:
-                    db.close()
+    def load_updates_since(last_id: int) -> list:
+        """Entradas posteriores a `last_id`, de la más antigua a la más reciente."""
+        db = SessionLocal()
+        try:
+            return db.query(TicketUpdate).options(joinedload(TicketUpdate.author)).filter(
+                TicketUpdate.ticket_id == ticket_id, TicketUpdate.id > last_id
+            ).order_by(TicketUpdate.timestamp, TicketUpdate.id).all()
+        finally:
+            db.close()
 
-                with ui.dialog() as dialog, ui.card().classes('rounded-lg'):
-                    ui.label("Reasignar Ticket").classes('text-lg font-semibold p-4')
-                    with ui.column().classes('p-4 gap-4'):
-                        tech_select = ui.select(tech_options, label="Seleccionar Nuevo Técnico").props("filled")
-                        reason_input = ui.textarea().props("filled label='Motivo de la reasignación'").classes('w-full')
-                    with ui.row().classes('w-full justify-end gap-2 p-4'):
-                        ui.button("Confirmar", on_click=lambda: dialog.submit((tech_select.value, reason_input.value)), color='primary')
-                        ui.button("Cancelar", on_click=dialog.close)
-                
-                result = await dialog
-                if result:
-                    new_tech_id, reason = result
-                    if not all([new_tech_id, reason]): return ui.notify("Debe seleccionar un técnico y un motivo.", color='warning')
-                    
-                    db = SessionLocal()
-                    try:
-                        ticket_to_update = db.query(Ticket).options(joinedload(Ticket.creator), joinedload(Ticket.technician)).filter(Ticket.id == ticket_id).first()
-                        if not ticket_to_update: return ui.notify("Ticket no encontrado.", color='negative')
-
-                        old_technician = ticket_to_update.technician
-                        new_tech_user = db.query(User).filter(User.id == new_tech_id).first()
-                        current_user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-
-                        update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment=f"Ticket reasignado de {old_technician.username if old_technician else 'Sin asignar'} a {new_tech_user.username}. Motivo: {reason}")
-                        db.add(update)
-
-                        ticket_to_update.technician_id = new_tech_id
-                        ticket_to_update.assigned_at = datetime.now(timezone.utc)
-                        db.commit()
-
-                        notifier.notify_reassignment(ticket_to_update, old_technician, current_user)
-                        notifier.notify_ticket_update(ticket_to_update, update)
-                        
-                        ui.notify("Ticket reasignado.", color='positive')
-                        build_ticket_view() # Refrescar la vista
-                    except Exception as e:
-                        db.rollback()
-                        ui.notify(f"Error al reasignar: {e}", color='negative')
-                    finally:
-                        db.close()
-
-            def handle_technician_update(new_status, comment):
-                db = SessionLocal()
-                try:
-                    ticket_to_update = db.query(Ticket).options(joinedload(Ticket.technician), joinedload(Ticket.creator)).filter(Ticket.id == ticket_id).first()
-                    if not ticket_to_update: return ui.notify("Ticket no encontrado.", color='negative')
-
-                    current_user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-                    if not comment and new_status == ticket_to_update.status: return ui.notify("No hay cambios para guardar.", color='info')
-
-                    updates_to_notify = []
-                    if comment:
-                        update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment=comment)
-                        db.add(update)
-                        updates_to_notify.append(update)
-
-                    if new_status and new_status != ticket_to_update.status:
-                        status_comment = f"Estado cambiado de {ticket_to_update.status.value} a {new_status.value}."
-                        status_update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment=status_comment)
-                        db.add(status_update)
-                        ticket_to_update.status = new_status
-                        if new_status == TicketStatus.RESUELTO:
-                            ticket_to_update.resolved_at = datetime.now(timezone.utc)
-                        updates_to_notify.append(status_update)
+    def load_updates_before(before: tuple | None, limit: int) -> list:
+        """
+        Hasta `limit` entradas anteriores a `before` = (timestamp, id), de la más reciente a la más antigua.
+        Usa el índice (ticket_id, timestamp) y pagina por clave en lugar de OFFSET.
+        """
+        db = SessionLocal()
+        try:
+            query = db.query(TicketUpdate).options(joinedload(TicketUpdate.author)).filter(TicketUpdate.ticket_id == ticket_id)
+            if before:
+                timestamp, update_id = before
+                query = query.filter(or_(TicketUpdate.timestamp < timestamp,
+                                         and_(TicketUpdate.timestamp == timestamp, TicketUpdate.id < update_id)))
+            return query.order_by(TicketUpdate.timestamp.desc(), TicketUpdate.id.desc()).limit(limit).all()
+        finally:
+            db.close()
 
-                    db.commit()
-                    ui.notify("Ticket actualizado.", color='positive')
-                    for update in updates_to_notify:
-                        db.refresh(update)
-                        notifier.notify_ticket_update(ticket_to_update, update)
-                    build_ticket_view() # Refrescar la vista
-                except Exception as e:
-                    db.rollback()
-                    ui.notify(f"Error al actualizar: {e}", color='negative')
-                finally:
-                    db.close()
+    def load_catalogues() -> dict:
+        """Catálogos para clasificar y asignar; solo se leen si el panel de acciones los necesita."""
+        if state['catalogues'] is None:
+            db = SessionLocal()
+            try:
+                state['catalogues'] = {
+                    'problem_types': db.query(ProblemType).all(),
+                    'technicians': db.query(User).filter(User.role == UserRole.TECNICO, User.is_active == 1).all(),
+                    'locations': db.query(Location).all(),
+                }
+            finally:
+                db.close()
+        return state['catalogues']
+
+    def is_supervisor() -> bool:
+        return session_user.current_user().role in [UserRole.SUPERVISOR.value, UserRole.MONITOR.value, UserRole.ADMINISTRADOR.value]
+
+    def timeline_entry(update):
+        update_subtitle = f"{update.author.username} - {to_local_time(update.timestamp)}"
+        return ui.timeline_entry(update.comment, subtitle=update_subtitle, icon='comment', color='blue-6')
+
+    def add_newer_entries(updates: list):
+        """Agrega arriba del historial las entradas nuevas (recibidas de la más antigua a la más reciente)."""
+        with refs['timeline']:
+            for update in updates:
+                timeline_entry(update).move(target_index=0)
+        if updates:
+            state['last_update_id'] = max(state['last_update_id'], *(update.id for update in updates))
+
+    def add_older_entries():
+        """Agrega al final del historial la siguiente página de entradas anteriores."""
+        updates = load_updates_before(state['oldest_update'], TIMELINE_PAGE_SIZE + 1)
+        state['has_older'] = len(updates) > TIMELINE_PAGE_SIZE
+        updates = updates[:TIMELINE_PAGE_SIZE]
+        with refs['timeline']:
+            for update in updates:
+                timeline_entry(update)
+            if not state['has_older']:
+                ticket = state['ticket']
+                ui.timeline_entry(f"Ticket creado por {ticket.creator.username}", subtitle=to_local_time(ticket.created_at), icon='add_circle', color='grey-6')
+        if updates:
+            state['oldest_update'] = (updates[-1].timestamp, updates[-1].id)
+            state['last_update_id'] = max(state['last_update_id'], *(update.id for update in updates))
+        refs['older_button'].visible = state['has_older']
+
+    def load_older_entries():
+        if state['loading_older'] or not state['has_older']:
+            return
+        state['loading_older'] = True
+        try:
+            add_older_entries()
+        finally:
+            state['loading_older'] = False
+        if state['has_older']:
+            # El observador solo avisa cuando cambia la visibilidad del botón: si sigue en pantalla después de
+            # agregar la página, se vuelve a observar para que avise de nuevo.
+            ui.run_javascript(f'''
+                const button = getHtmlElement({refs['older_button'].id});
+                if (button && button.olderObserver) requestAnimationFrame(() => {{
+                    button.olderObserver.unobserve(button);
+                    button.olderObserver.observe(button);
+                }});
+            ''')
 
-            def handle_classify_and_assign(problem_type_id, urgency_str, technician_id, location_id):
-                if not all([problem_type_id, urgency_str, technician_id, location_id]): return ui.notify("Debe completar todos los campos.", color='negative')
+    def after_change(*sections) -> list:
+        """
+        Agrega al historial las entradas nuevas y redibuja solo las secciones que dependen de lo que cambió.
+        Retorna las entradas nuevas del usuario actual (con su autor cargado) para las notificaciones.
+        """
+        updates = load_updates_since(state['last_update_id'])
+        add_newer_entries(updates)
+        if sections:
+            load_ticket()
+            for section in sections:
+                section.refresh()
+        return [update for update in updates if update.author_id == app.storage.user.get('id')]
+
+    def handle_conflict(error: TransitionConflict):
+        """Otro usuario cambió el ticket antes: se avisa y se muestra su estado actual."""
+        ui.notify(str(error), color='warning')
+        if error.current_status is None:
+            return
+        state['editing'] = False
+        after_change(header_section, description_section, actions_section, attributes_section)
+
+    def names(catalogue: str, attribute: str) -> dict:
+        return {item.id: getattr(item, attribute) for item in load_catalogues()[catalogue]}
+
+    # --- Lógica de Acciones ---
+    # Cada acción es un UPDATE condicionado al estado que muestra la página (ver ticket_transitions.py).
+    def handle_details_update(new_title, new_description):
+        ticket = state['ticket']
+        previous = ticket_events.snapshot(ticket)
+        try:
+            changed = ticket_transitions.update_details(ticket_id, app.storage.user.get('id'), new_title, new_description,
+                                                        ticket.title, ticket.description)
+        except TransitionConflict as e:
+            return handle_conflict(e)
+        except Exception as e:
+            return ui.notify(f"Error al actualizar: {e}", color='negative')
+        if not changed:
+            return ui.notify("No hay cambios para guardar.", color='info')
+
+        ui.notify("Ticket actualizado.", color='positive') # Notificar al usuario
+        ticket_events.publish(ticket_events.UPDATED, ticket_id, previous)
+        state['editing'] = False
+        for update in after_change(header_section, description_section):
+            notifier.notify_ticket_update(state['ticket'], update)
+
+    def assign_ticket(technician_id):
+        if not technician_id: return ui.notify("Debe seleccionar un técnico.", color='warning')
+        previous = ticket_events.snapshot(state['ticket'])
+        try:
+            ticket_transitions.assign(ticket_id, app.storage.user.get('id'), technician_id,
+                                      names('technicians', 'username')[technician_id], expected=previous)
+        except TransitionConflict as e:
+            return handle_conflict(e)
+        except Exception as e:
+            return ui.notify(f"Error al asignar ticket: {e}", color='negative')
+
+        ui.notify("Ticket asignado correctamente", color='positive')
+        ticket_events.publish(ticket_events.ASSIGNED, ticket_id, previous)
+        updates = after_change(header_section, actions_section, attributes_section)
+        if updates:
+            notifier.notify_ticket_assigned(state['ticket'], updates[0].author)
+
+    async def reject_ticket():
+        with ui.dialog() as dialog, ui.card().classes('rounded-lg'):
+            ui.label("Rechazar Ticket").classes('text-lg font-semibold p-4')
+            with ui.column().classes('p-4 gap-4'):
+                reason_input = ui.textarea().props("filled label='Motivo del rechazo'").classes('w-full')
+            with ui.row().classes('w-full justify-end gap-2 p-4'):
+                ui.button("Confirmar Rechazo", on_click=lambda: dialog.submit(reason_input.value), color='negative')
+                ui.button("Cancelar", on_click=dialog.close)
 
-                db = SessionLocal()
-                try:
-                    ticket_to_update = db.query(Ticket).options(joinedload(Ticket.technician), joinedload(Ticket.creator)).filter(Ticket.id == ticket_id).first()
-                    if not ticket_to_update: return ui.notify("Ticket no encontrado.", color='negative')
+        reason = await dialog
+        if reason:
+            previous = ticket_events.snapshot(state['ticket'])
+            try:
+                ticket_transitions.reject(ticket_id, app.storage.user.get('id'), reason, expected=previous)
+            except TransitionConflict as e:
+                return handle_conflict(e)
+            except Exception as e:
+                return ui.notify(f"Error al rechazar ticket: {e}", color='negative')
+
+            ui.notify("Ticket rechazado.", color='positive')
+            ticket_events.publish(ticket_events.STATUS_CHANGED, ticket_id, previous)
+            for update in after_change(header_section, actions_section):
+                notifier.notify_ticket_update(state['ticket'], update)
+
+    async def reassign_ticket():
+        current_technician_id = state['ticket'].technician_id
+        tech_options = {t_id: username for t_id, username in names('technicians', 'username').items() if t_id != current_technician_id}
+
+        with ui.dialog() as dialog, ui.card().classes('rounded-lg'):
+            ui.label("Reasignar Ticket").classes('text-lg font-semibold p-4')
+            with ui.column().classes('p-4 gap-4'):
+                tech_select = ui.select(tech_options, label="Seleccionar Nuevo Técnico").props("filled")
+                reason_input = ui.textarea().props("filled label='Motivo de la reasignación'").classes('w-full')
+            with ui.row().classes('w-full justify-end gap-2 p-4'):
+                ui.button("Confirmar", on_click=lambda: dialog.submit((tech_select.value, reason_input.value)), color='primary')
+                ui.button("Cancelar", on_click=dialog.close)
 
-                    current_user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-                    problem_type = db.query(ProblemType).filter(ProblemType.id == problem_type_id).first()
-                    tech_user = db.query(User).filter(User.id == technician_id).first()
-                    location = db.query(Location).filter(Location.id == location_id).first()
+        result = await dialog
+        if result:
+            new_tech_id, reason = result
+            if not all([new_tech_id, reason]): return ui.notify("Debe seleccionar un técnico y un motivo.", color='warning')
 
-                    ticket_to_update.problem_type_id = problem_type_id
-                    ticket_to_update.urgency = TicketUrgency[urgency_str]
-                    ticket_to_update.location_id = location_id
+            old_technician = state['ticket'].technician
+            previous = ticket_events.snapshot(state['ticket'])
+            try:
+                ticket_transitions.reassign(ticket_id, app.storage.user.get('id'), new_tech_id, tech_options[new_tech_id],
+                                            reason, expected=previous)
+            except TransitionConflict as e:
+                return handle_conflict(e)
+            except Exception as e:
+                return ui.notify(f"Error al reasignar: {e}", color='negative')
+
+            ticket_events.publish(ticket_events.ASSIGNED, ticket_id, previous)
+            ui.notify("Ticket reasignado.", color='positive')
+            updates = after_change(actions_section, attributes_section)
+            if updates:
+                notifier.notify_reassignment(state['ticket'], old_technician, updates[0].author)
+            for update in updates:
+                notifier.notify_ticket_update(state['ticket'], update)
+
+    def handle_technician_update(new_status, comment):
+        previous = ticket_events.snapshot(state['ticket'])
+        if not comment and new_status == previous['status']: return ui.notify("No hay cambios para guardar.", color='info')
+        try:
+            status_changed = ticket_transitions.technician_update(ticket_id, app.storage.user.get('id'), new_status, comment, previous)
+        except TransitionConflict as e:
+            return handle_conflict(e)
+        except Exception as e:
+            return ui.notify(f"Error al actualizar: {e}", color='negative')
+
+        ui.notify("Ticket actualizado.", color='positive')
+        # Un comentario sin cambio de estado solo agrega su entrada al historial.
+        if status_changed:
+            ticket_events.publish(ticket_events.STATUS_CHANGED, ticket_id, previous)
+            updates = after_change(header_section, actions_section, attributes_section)
+        else:
+            updates = after_change()
+            refs['comment_input'].value = ''
+        for update in updates:
+            notifier.notify_ticket_update(state['ticket'], update)
+
+    def handle_classify_and_assign(problem_type_id, urgency_str, technician_id, location_id):
+        if not all([problem_type_id, urgency_str, technician_id, location_id]): return ui.notify("Debe completar todos los campos.", color='negative')
+
+        previous = ticket_events.snapshot(state['ticket'])
+        try:
+            ticket_transitions.classify_and_assign(
+                ticket_id, app.storage.user.get('id'),
+                problem_type_id, names('problem_types', 'name')[problem_type_id], TicketUrgency[urgency_str],
+                location_id, names('locations', 'description')[location_id],
+                technician_id, names('technicians', 'username')[technician_id], expected=previous)
+        except TransitionConflict as e:
+            return handle_conflict(e)
+        except Exception as e:
+            return ui.notify(f"Error al clasificar y asignar: {e}", color='negative')
+
+        ui.notify("Ticket clasificado y asignado correctamente", color='positive')
+        ticket_events.publish(ticket_events.ASSIGNED, ticket_id, previous)
+        updates = after_change(header_section, actions_section, attributes_section)
+        if updates:
+            notifier.notify_ticket_assigned(state['ticket'], updates[0].author)
+            notifier.notify_ticket_update(state['ticket'], updates[0])
+
+    def toggle_edit_mode(editing: bool):
+        state['editing'] = editing
+        header_section.refresh()
+        description_section.refresh()
+
+    # --- Secciones de la vista ---
+    @ui.refreshable
+    def header_section():
+        ticket = state['ticket']
+        with ui.row().classes('w-full justify-between items-start'):
+            with ui.column().classes('gap-1 flex-grow'):
+                ui.label(f"Ticket #{ticket.id}").classes('text-lg text-gray-500')
+                if state['editing']:
+                    refs['title_edit'] = ui.input(value=ticket.title).classes('w-full text-3xl font-bold').props('dense borderless')
+                else:
+                    ui.label(ticket.title).classes('text-3xl font-bold text-gray-800')
 
-                    class_comment = f"Ticket clasificado con urgencia '{urgency_str}', tipo '{problem_type.name}' y ubicación '{location.description}'."
-                    class_update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment=class_comment)
-                    db.add(class_update)
+            with ui.column().classes('items-end'):
+                status_colors = {
+                    TicketStatus.NUEVO: 'bg-blue-500', TicketStatus.ASIGNADO: 'bg-yellow-500',
+                    TicketStatus.EN_PROCESO: 'bg-orange-500', TicketStatus.RESUELTO: 'bg-green-500',
+                    TicketStatus.CERRADO: 'bg-gray-500', TicketStatus.RECHAZADO: 'bg-red-500',
+                }
+                ui.badge(ticket.status.value, color=status_colors.get(ticket.status, 'gray')).classes('text-white text-md px-4 py-2 rounded-full')
 
-                    ticket_to_update.technician_id = technician_id
-                    ticket_to_update.status = TicketStatus.ASIGNADO
-                    ticket_to_update.assigned_at = datetime.now(timezone.utc)
-                    assign_update = TicketUpdate(ticket_id=ticket_id, author_id=current_user.id, comment=f"Ticket asignado a {tech_user.username}.")
-                    db.add(assign_update)
+    @ui.refreshable
+    def description_section():
+        ticket = state['ticket']
+        with ui.card().classes('w-full rounded-xl shadow-md p-6'):
+            with ui.row().classes('w-full justify-between items-center mb-4'):
+                ui.label("Descripción del Problema").classes('text-xl font-semibold text-gray-700')
+                if is_supervisor():
+                    if state['editing']:
+                        with ui.row().classes('gap-2'):
+                            ui.button('Guardar', icon='save', on_click=lambda: handle_details_update(refs['title_edit'].value, refs['desc_edit'].value)).props('color=positive')
+                            ui.button('Cancelar', icon='cancel', on_click=lambda: toggle_edit_mode(False)).props('flat color=negative')
+                    else:
+                        ui.button('Editar', icon='edit', on_click=lambda: toggle_edit_mode(True)).props('flat color=primary')
 
-                    db.commit()
-                    db.refresh(ticket_to_update)
-                    db.refresh(class_update)
-                    db.refresh(assign_update)
-                    
-                    ui.notify("Ticket clasificado y asignado correctamente", color='positive')
-                    notifier.notify_ticket_assigned(ticket_to_update, current_user)
-                    notifier.notify_ticket_update(ticket_to_update, class_update)
-                    build_ticket_view() # Refrescar la vista
-                except Exception as e:
-                    db.rollback()
-                    ui.notify(f"Error al clasificar y asignar: {e}", color='negative')
-                finally:
-                    db.close()
+            ui.separator()
+            if state['editing']:
+                refs['desc_edit'] = ui.textarea(value=ticket.description or '').classes('w-full mt-4').props('filled')
+            else:
+                ui.markdown(ticket.description or '_Sin descripción._').classes('text-gray-600 mt-4')
+
+    @ui.refreshable
+    def actions_section():
+        ticket = state['ticket']
+        supervisor = is_supervisor()
+        is_assigned_technician = ticket.technician and app.storage.user.get('username') == ticket.technician.username
+        show_assignment = supervisor and ticket.status in [TicketStatus.NUEVO, TicketStatus.ASIGNADO, TicketStatus.EN_PROCESO]
+        show_update = is_assigned_technician and ticket.status not in [TicketStatus.RESUELTO, TicketStatus.CERRADO, TicketStatus.RECHAZADO]
+        if not show_assignment and not show_update:
+            return
 
-            # --- Data Loading for the View ---
-            db = SessionLocal()
-            try:
-                ticket = db.query(Ticket).options(
-                    joinedload(Ticket.requester),
-                    joinedload(Ticket.creator).joinedload(User.location),
-                    joinedload(Ticket.technician),
-                    joinedload(Ticket.problem_type),
-                    joinedload(Ticket.updates).joinedload(TicketUpdate.author),
-                    joinedload(Ticket.location)
-                ).filter(Ticket.id == ticket_id).first()
-
-                if not ticket:
-                    with ui.column().classes('w-full items-center p-8'):
-                        ui.label("Ticket no encontrado").classes('text-2xl text-red-500')
-                    return
+        with ui.card().classes('w-full rounded-xl shadow-md p-6'):
+            if supervisor and ticket.status == TicketStatus.NUEVO:
+                catalogues = load_catalogues()
+                technicians_list = catalogues['technicians']
+                ui.label("Gestión de Asignación").classes('text-xl font-semibold text-gray-700 mb-4')
+                if ticket.problem_type_id is None:
+                    locations_list = catalogues['locations']
+                    ui.label("Clasificar y Asignar Ticket").classes('text-md text-gray-600 mb-4')
+                    with ui.grid(columns=2).classes('w-full gap-4'):
+                        problem_type_select = ui.select({p.id: p.name for p in catalogues['problem_types']}).props("filled label='Tipo de Problema'")
+                        urgency_select = ui.select({u.name: u.value for u in TicketUrgency}).props("filled label='Urgencia'")
+                        tech_select = ui.select({t.id: t.username for t in technicians_list}).props("filled label='Asignar a Técnico'")
+
+                        all_locations_dict = {loc.id: loc.description for loc in locations_list}
+                        location_select = ui.select(
+                            all_locations_dict,
+                            label="Ubicación"
+                        ).props('filled use-input').classes('w-full')
+
+                        def filter_locations(e):
+                            text = e.args[0] if e.args else ''
+                            filtered = {
+                                loc.id: loc.description for loc in locations_list
+                                if not text or text.lower() in loc.description.lower() or text.lower() in loc.name.lower()
+                            }
+                            location_select.options = filtered
+                            location_select.update()
+                        location_select.on('filter', filter_locations)
+                    with ui.row().classes('w-full justify-end gap-2 mt-2'):
+                        ui.button("Guardar y Asignar", on_click=lambda: handle_classify_and_assign(problem_type_select.value, urgency_select.value, tech_select.value, location_select.value), color='primary')
+                        ui.button("Rechazar Ticket", on_click=reject_ticket, color='negative')
+                else:
+                    tech_select = ui.select({t.id: t.username for t in technicians_list}).props("filled label='Seleccionar Técnico'").classes('w-full')
+                    with ui.row().classes('w-full justify-end gap-2 mt-2'):
+                        ui.button("Asignar", on_click=lambda: assign_ticket(tech_select.value), color='primary')
+                        ui.button("Rechazar", on_click=reject_ticket, color='negative')
+
+            elif supervisor and ticket.status in [TicketStatus.ASIGNADO, TicketStatus.EN_PROCESO]:
+                ui.label("Gestión de Asignación").classes('text-xl font-semibold text-gray-700 mb-4')
+                ui.label(f"Actualmente asignado a: {ticket.technician.username}")
+                ui.button("Reasignar Ticket", on_click=reassign_ticket, icon='swap_horiz').props('outline')
+
+            if show_update:
+                ui.label("Actualizar Ticket").classes('text-xl font-semibold text-gray-700 mb-4')
+                possible_statuses = [TicketStatus.EN_PROCESO, TicketStatus.RESUELTO]
+                all_status_options = list(dict.fromkeys([ticket.status] + possible_statuses))
+                status_options = {s: s.value for s in all_status_options}
+                status_select = ui.select(status_options, value=ticket.status).props("filled label='Cambiar Estado'")
+                refs['comment_input'] = ui.textarea().props("filled label='Añadir comentario o descripción de la solución'").classes('w-full')
+                ui.button("Guardar Actualización", on_click=lambda: handle_technician_update(status_select.value, refs['comment_input'].value), color='primary', icon='save')
+
+    def timeline_section():
+        with ui.card().classes('w-full rounded-xl shadow-md p-6'):
+            ui.label("Historial de Eventos").classes('text-xl font-semibold text-gray-700 mb-4')
+            refs['timeline'] = ui.timeline(side='left').classes('w-full')
+            refs['older_button'] = ui.button("Ver eventos anteriores", icon='expand_more', on_click=load_older_entries).props('flat color=primary').classes('self-center')
+        add_older_entries()
+
+        # Las entradas anteriores se cargan solas cuando el botón entra en pantalla al desplazarse.
+        ui.on(f'timeline_older_{ticket_id}', load_older_entries)
+        ui.timer(0, lambda: ui.run_javascript(f'''
+            const button = getHtmlElement({refs['older_button'].id});
+            button.olderObserver = new IntersectionObserver(entries => {{
+                if (entries[0].isIntersecting) emitEvent("timeline_older_{ticket_id}");
+            }});
+            button.olderObserver.observe(button);
+        '''), once=True)
+
+    @ui.refreshable
+    def attributes_section():
+        ticket = state['ticket']
+        with ui.card().classes('w-full rounded-xl shadow-md p-6'):
+            ui.label("Atributos").classes('text-xl font-semibold text-gray-700 mb-2')
+            ui.separator()
+            with ui.list().classes('mt-4'):
+                def add_attribute(icon, label, value):
+                    with ui.item().classes('w-full p-0'):
+                        with ui.row().classes(
+                            'w-full items-center gap-3 p-2'
+                        ):
+                            ui.icon(icon, color='gray-6').classes('text-lg')
+                            with ui.column().classes('gap-0 flex-grow'):
+                                ui.label(label).classes('text-gray-500 text-xs')
+                                ui.label(value).classes('font-semibold')
+
+                add_attribute('person', 'Solicitante', ticket.requester.username)
+                add_attribute('engineering', 'Técnico Asignado', ticket.technician.username if ticket.technician else 'Sin asignar')
+                add_attribute('category', 'Tipo de Problema', ticket.problem_type.name if ticket.problem_type else 'Sin clasificar')
+                add_attribute('location_on', 'Ubicación', ticket.location.description if ticket.location else 'No especificada')
+                add_attribute('priority_high', 'Urgencia', ticket.urgency.value if ticket.urgency else 'Sin clasificar')
+                add_attribute('calendar_today', 'Fecha Creación', to_local_time(ticket.created_at))
+                if ticket.resolved_at:
+                    add_attribute('task_alt', 'Fecha Resolución', to_local_time(ticket.resolved_at))
 
-                current_user_role = app.storage.user.get('role')
-                is_supervisor = current_user_role in [UserRole.SUPERVISOR.value, UserRole.MONITOR.value, UserRole.ADMINISTRADOR.value]
-                is_assigned_technician = ticket.technician and app.storage.user.get('username') == ticket.technician.username
-                problem_types_list = db.query(ProblemType).all()
-                technicians_list = db.query(User).filter(User.role == UserRole.TECNICO, User.is_active == 1).all()
-                locations_list = db.query(Location).all()
-            finally:
-                db.close()
+    # --- Renderizado Inicial ---
+    load_ticket()
+    if not state['ticket']:
+        with ui.column().classes('w-full items-center p-8'):
+            ui.label("Ticket no encontrado").classes('text-2xl text-red-500')
+        return
 
-            # --- UI Construction ---
-            with ui.column().classes('w-full p-4 md:p-6 lg:p-8 gap-6'):
-                with ui.row().classes('w-full justify-between items-start'):
-                    with ui.column().classes('gap-1 flex-grow'):
-                        ui.label(f"Ticket #{ticket.id}").classes('text-lg text-gray-500')
-                        title_view = ui.label(ticket.title).classes('text-3xl font-bold text-gray-800')
-                        title_edit = ui.input(value=ticket.title).classes('w-full text-3xl font-bold').props('dense borderless')
-                    
-                    with ui.column().classes('items-end'):
-                        status_colors = {
-                            TicketStatus.NUEVO: 'bg-blue-500', TicketStatus.ASIGNADO: 'bg-yellow-500',
-                            TicketStatus.EN_PROCESO: 'bg-orange-500', TicketStatus.RESUELTO: 'bg-green-500',
-                            TicketStatus.CERRADO: 'bg-gray-500', TicketStatus.RECHAZADO: 'bg-red-500',
-                        }
-                        ui.badge(ticket.status.value, color=status_colors.get(ticket.status, 'gray')).classes('text-white text-md px-4 py-2 rounded-full')
-
-                with ui.row().classes('w-full grid grid-cols-1 lg:grid-cols-3 gap-6'):
-                    with ui.column().classes('lg:col-span-2 flex flex-col gap-6'):
-                        with ui.card().classes('w-full rounded-xl shadow-md p-6'):
-                            with ui.row().classes('w-full justify-between items-center mb-4'):
-                                ui.label("Descripción del Problema").classes('text-xl font-semibold text-gray-700')
-                                if is_supervisor:
-                                    edit_button = ui.button('Editar', icon='edit').props('flat color=primary')
-                                    with ui.row().classes('gap-2') as edit_actions:
-                                        ui.button('Guardar', icon='save', on_click=lambda: handle_details_update(title_edit.value, desc_edit.value)).props('color=positive')
-                                        cancel_button = ui.button('Cancelar', icon='cancel').props('flat color=negative')
-
-                            ui.separator()
-                            desc_view = ui.markdown(ticket.description or '_Sin descripción._').classes('text-gray-600 mt-4')
-                            desc_edit = ui.textarea(value=ticket.description or '').classes('w-full mt-4').props('filled')
-
-                            title_view.visible, title_edit.visible = True, False
-                            desc_view.visible, desc_edit.visible = True, False
-                            if is_supervisor:
-                                edit_actions.visible = False
-                                def toggle_edit_mode(editing: bool):
-                                    title_view.visible, title_edit.visible = not editing, editing
-                                    desc_view.visible, desc_edit.visible = not editing, editing
-                                    edit_button.visible, edit_actions.visible = not editing, editing
-                                edit_button.on('click', lambda: toggle_edit_mode(True))
-                                cancel_button.on('click', lambda: toggle_edit_mode(False))
-
-                        with ui.card().classes('w-full rounded-xl shadow-md p-6') as card_actions:
-                            if is_supervisor and ticket.status == TicketStatus.NUEVO:
-                                ui.label("Gestión de Asignación").classes('text-xl font-semibold text-gray-700 mb-4')
-                                if ticket.problem_type_id is None:
-                                    ui.label("Clasificar y Asignar Ticket").classes('text-md text-gray-600 mb-4')
-                                    with ui.grid(columns=2).classes('w-full gap-4'):
-                                        problem_type_select = ui.select({p.id: p.name for p in problem_types_list}).props("filled label='Tipo de Problema'")
-                                        urgency_select = ui.select({u.name: u.value for u in TicketUrgency}).props("filled label='Urgencia'")
-                                        tech_select = ui.select({t.id: t.username for t in technicians_list}).props("filled label='Asignar a Técnico'")
-                                        
-                                        all_locations_dict = {loc.id: loc.description for loc in locations_list}
-                                        location_select = ui.select(
-                                            all_locations_dict,
-                                            label="Ubicación"
-                                        ).props('filled use-input').classes('w-full')
-
-                                        def filter_locations(e):
-                                            text = e.args[0] if e.args else ''
-                                            filtered = {
-                                                loc.id: loc.description for loc in locations_list
-                                                if not text or text.lower() in loc.description.lower() or text.lower() in loc.name.lower()
-                                            }
-                                            location_select.options = filtered
-                                            location_select.update()
-                                        location_select.on('filter', filter_locations)
-                                    with ui.row().classes('w-full justify-end gap-2 mt-2'):
-                                        ui.button("Guardar y Asignar", on_click=lambda: handle_classify_and_assign(problem_type_select.value, urgency_select.value, tech_select.value, location_select.value), color='primary')
-                                        ui.button("Rechazar Ticket", on_click=reject_ticket, color='negative')
-                                else:
-                                    tech_select = ui.select({t.id: t.username for t in technicians_list}).props("filled label='Seleccionar Técnico'").classes('w-full')
-                                    with ui.row().classes('w-full justify-end gap-2 mt-2'):
-                                        ui.button("Asignar", on_click=lambda: assign_ticket(tech_select.value), color='primary')
-                                        ui.button("Rechazar", on_click=reject_ticket, color='negative')
-                            
-                            elif is_supervisor and ticket.status in [TicketStatus.ASIGNADO, TicketStatus.EN_PROCESO]:
-                                ui.label("Gestión de Asignación").classes('text-xl font-semibold text-gray-700 mb-4')
-                                ui.label(f"Actualmente asignado a: {ticket.technician.username}")
-                                ui.button("Reasignar Ticket", on_click=reassign_ticket, icon='swap_horiz').props('outline')
-
-                            if is_assigned_technician and ticket.status not in [TicketStatus.RESUELTO, TicketStatus.CERRADO, TicketStatus.RECHAZADO]:
-                                ui.label("Actualizar Ticket").classes('text-xl font-semibold text-gray-700 mb-4')
-                                possible_statuses = [TicketStatus.EN_PROCESO, TicketStatus.RESUELTO]
-                                all_status_options = list(dict.fromkeys([ticket.status] + possible_statuses))
-                                status_options = {s: s.value for s in all_status_options}
-                                status_select = ui.select(status_options, value=ticket.status).props("filled label='Cambiar Estado'")
-                                comment_input = ui.textarea().props("filled label='Añadir comentario o descripción de la solución'").classes('w-full')
-                                ui.button("Guardar Actualización", on_click=lambda: handle_technician_update(status_select.value, comment_input.value), color='primary', icon='save')
-                            
-                            if not card_actions.default_slot.children:
-                                card_actions.visible = False
-
-                        with ui.card().classes('w-full rounded-xl shadow-md p-6'):
-                            ui.label("Historial de Eventos").classes('text-xl font-semibold text-gray-700 mb-4')
-                            with ui.timeline(side='left').classes('w-full'):
-                                created_subtitle = to_local_time(ticket.created_at)
-                                ui.timeline_entry(f"Ticket creado por {ticket.creator.username}", subtitle=created_subtitle, icon='add_circle', color='grey-6')
-                                for update in sorted(ticket.updates, key=lambda u: u.timestamp):
-                                    update_subtitle = f"{update.author.username} - {to_local_time(update.timestamp)}"
-                                    ui.timeline_entry(update.comment, subtitle=update_subtitle, icon='comment', color='blue-6')
-
-                with ui.column().classes('lg:col-span-1 flex flex-col gap-6'):
-                    with ui.card().classes('w-full rounded-xl shadow-md p-6'):
-                        ui.label("Atributos").classes('text-xl font-semibold text-gray-700 mb-2')
-                        ui.separator()
-                        with ui.list().classes('mt-4'):
-                            def add_attribute(icon, label, value):
-                                with ui.item().classes('w-full p-0'):
-                                    with ui.row().classes(
-                                        'w-full items-center gap-3 p-2'
-                                    ):
-                                        ui.icon(icon, color='gray-6').classes('text-lg')
-                                        with ui.column().classes('gap-0 flex-grow'):
-                                            ui.label(label).classes('text-gray-500 text-xs')
-                                            ui.label(value).classes('font-semibold')
-                            
-                            add_attribute('person', 'Solicitante', ticket.requester.username)
-                            add_attribute('engineering', 'Técnico Asignado', ticket.technician.username if ticket.technician else 'Sin asignar')
-                            add_attribute('category', 'Tipo de Problema', ticket.problem_type.name if ticket.problem_type else 'Sin clasificar')
-                            add_attribute('location_on', 'Ubicación', ticket.location.description if ticket.location else 'No especificada')
-                            add_attribute('priority_high', 'Urgencia', ticket.urgency.value if ticket.urgency else 'Sin clasificar')
-                            add_attribute('calendar_today', 'Fecha Creación', to_local_time(ticket.created_at))
-                            if ticket.resolved_at:
-                                add_attribute('task_alt', 'Fecha Resolución', to_local_time(ticket.resolved_at))
+    with ui.column().classes('w-full p-4 md:p-6 lg:p-8 gap-6'):
+        header_section()
+        with ui.row().classes('w-full grid grid-cols-1 lg:grid-cols-3 gap-6'):
+            with ui.column().classes('lg:col-span-2 flex flex-col gap-6'):
+                description_section()
+                actions_section()
+                timeline_section()
 
-    # --- Renderizado Inicial ---
-    build_ticket_view()
+        with ui.column().classes('lg:col-span-1 flex flex-col gap-6'):
+            attributes_section()
 
 
 @ui.page('/search')
@@ -436,11 +508,11 @@ def search_tickets_page():
 # --- PÁGINAS DE ADMINISTRACIÓN ---
 @ui.page('/admin/users')
 def admin_users():
-    if not app.storage.user.get('authenticated', False) or app.storage.user.get('role') != 'administrador':
+    if not session_user.has_role(UserRole.ADMINISTRADOR.value):
         return ui.navigate.to('/')
     
     from database import SessionLocal, get_password_hash
-    from models import User, UserRole
+    from models import User
 
     def get_users_as_dicts():
         db = SessionLocal()
@@ -499,6 +571,7 @@ def admin_users():
                 db.add(user)
             
             db.commit()
+            session_user.refresh(user.id)
             ui.notify(f"Usuario '{user.username}' guardado correctamente.", color='positive')
             dialog.close()
             table.rows = get_users_as_dicts()
@@ -567,6 +640,7 @@ def admin_users():
         if user:
             user.is_active = 1 - user.is_active
             db.commit()
+            session_user.refresh(user.id)
             ui.notify(f"Usuario {user.username} {'activado' if user.is_active else 'desactivado'}.", color='positive' if user.is_active else 'warning')
         db.close()
         table.rows = get_users_as_dicts()
@@ -604,7 +678,7 @@ def admin_users():
 
 @ui.page('/admin/locations')
 def admin_locations():
-    if not app.storage.user.get('authenticated', False) or app.storage.user.get('role') != 'administrador':
+    if not session_user.has_role(UserRole.ADMINISTRADOR.value):
         return ui.navigate.to('/')
 
     from database import SessionLocal
@@ -708,7 +782,7 @@ def admin_locations():
 
 @ui.page('/admin/itil_categories')
 def admin_itil_categories():
-    if not app.storage.user.get('authenticated', False) or app.storage.user.get('role') != 'administrador':
+    if not session_user.has_role(UserRole.ADMINISTRADOR.value):
         return ui.navigate.to('/')
 
     from database import SessionLocal
@@ -887,7 +961,7 @@ def admin_itil_categories():
 
 @ui.page('/admin/slas')
 def admin_slas():
-    if not app.storage.user.get('authenticated', False) or app.storage.user.get('role') != 'administrador':
+    if not session_user.has_role(UserRole.ADMINISTRADOR.value):
         return ui.navigate.to('/')
 
     from database import SessionLocal
@@ -975,10 +1049,14 @@ def show_login():
             
             ui.button('Iniciar Sesión', on_click=lambda: handle_login(username, password))                 .classes('w-full bg-blue-600 hover:bg-blue-700 text-white font-bold py-2 rounded-md mt-4')
 
-def handle_login(username_input, password_input):
-    user = authenticate_user(username_input.value, password_input.value)
+async def handle_login(username_input, password_input):
+    # La verificación bcrypt corre en el pool de procesos; mientras tanto las demás sesiones siguen respondiendo.
+    try:
+        user = await authenticate_user_async(username_input.value, password_input.value, ui.context.client.ip)
+    except LoginThrottled as e:
+        return ui.notify(str(e), color='warning')
     if user:
-        app.storage.user.update({'id': user.id, 'username': user.username, 'authenticated': True, 'role': user.role.value})
+        session_user.login(user)
         ui.notify(f"Inicio de sesión exitoso como {user.username}", color='positive')
         ui.navigate.to('/dashboard')
     else:
@@ -987,45 +1065,21 @@ def handle_login(username_input, password_input):
 # Inicializa la base de datos al arrancar la aplicación
 init_db()
 
-_background_tasks = set()
-
 @app.on_startup
 async def start_background_tasks():
-    """Inicia las tareas de fondo para la revisión de correos y SLAs."""
-    async def run_periodically(wait_time, task_function):
-        while True:
-            try:
-                await task_function()
-            except Exception as e:
-                print(f"Error en tarea de fondo '{task_function.__name__}': {e}")
-            await asyncio.sleep(wait_time)
-
-    # Tarea para el lector de correo
-    db_session = SessionLocal()
-    mail_settings = db_session.query(MailSettings).first()
-    if mail_settings and mail_settings.is_active:
-        interval = (mail_settings.check_interval_minutes or 5) * 60
-        task = asyncio.create_task(run_periodically(interval, check_new_emails))
-        _background_tasks.add(task)
-        task.add_done_callback(_background_tasks.discard)
-        print(f"Lector de correo activado. Revisando cada {interval / 60} minuto(s).")
-    else:
-        print("Lector de correo desactivado.")
-    db_session.close()
-
-    # Tarea para el verificador de SLA
-    sla_interval = 600  # 10 minutos
-    sla_task = asyncio.create_task(run_periodically(sla_interval, check_sla_warnings))
-    _background_tasks.add(sla_task)
-    sla_task.add_done_callback(_background_tasks.discard)
-    print(f"Verificador de SLA activado. Revisando cada {sla_interval / 60} minutos.")
+    """
+    Inicia las tareas de fondo para la revisión de correos, SLAs y reportes mensuales, salvo que las ejecute
+    `worker.py` (ver background_jobs.py).
+    """
+    if background_jobs.runs_in_web():
+        background_jobs.start_jobs()
+    background_jobs.start_web_jobs()
 
 @app.on_shutdown
 def stop_background_tasks():
     """Detiene todas las tareas de fondo al cerrar la aplicación."""
     print("Deteniendo tareas de fondo...")
-    for task in _background_tasks:
-        task.cancel()
+    scheduler.stop()
     print("Tareas de fondo detenidas.")
 
 # En una aplicación real, este secreto debe ser largo, aleatorio y cargado de forma segura (p. ej., una variable de entorno)
@@ -1033,4 +1087,8 @@ STORAGE_SECRET = os.environ.get("STORAGE_SECRET")
 if not STORAGE_SECRET:
     raise ValueError("La clave secreta de almacenamiento (STORAGE_SECRET) no está configurada en las variables de entorno.")
 
+# El pool de procesos de `run.cpu_bound` solo verifica contraseñas (ver auth.py); con "fork" los procesos no
+# vuelven a importar este módulo (que inicializa la BD al cargarse).
+run.process_pool_start_method = 'fork'
+
 ui.run(title="HelpdeskOI", favicon='🔧', storage_secret=STORAGE_SECRET, tailwind=True)
@@ -1,6 +1,7 @@
 from nicegui import ui, app
 from models import UserRole
-from logo import logo_base64
+from branding import asset_url
+import session_user
 
 def logout():
     """Cierra la sesión del usuario y lo redirige a la página de inicio."""
@@ -9,7 +10,10 @@ def logout():
 
 def create_main_layout():
     """Crea la interfaz principal de la aplicación, incluyendo la cabecera y el menú lateral."""
-    
+    # El menú usa el rol actual del usuario, no el guardado al iniciar sesión (ver session_user.py).
+    principal = session_user.current_user()
+    role = principal.role if principal else None
+
     # Estilo general de la página para un fondo consistente
     ui.query('body').classes('bg-slate-100')
 
@@ -28,7 +32,7 @@ def create_main_layout():
                     with ui.menu().classes('bg-white shadow-lg rounded-lg') as menu:
                         with ui.column().classes('p-2'):
                             ui.label(f"Usuario: {app.storage.user.get('username')}").classes('text-gray-700 font-semibold')
-                            ui.label(f"Rol: {app.storage.user.get('role')}").classes('text-gray-500 text-sm')
+                            ui.label(f"Rol: {role}").classes('text-gray-500 text-sm')
                         ui.separator().classes('my-1')
                         ui.menu_item('Cerrar Sesión', on_click=logout, auto_close=True)
 
@@ -47,20 +51,20 @@ def create_main_layout():
                             ui.label(text)
 
                 # Link al Dashboard
-                if app.storage.user.get('role') != UserRole.AUTOSERVICIO.value:
+                if role != UserRole.AUTOSERVICIO.value:
                     create_menu_item('Dashboard', '/dashboard', 'dashboard')
                 
-                if app.storage.user.get('role') in [UserRole.ADMINISTRADOR.value, UserRole.SUPERVISOR.value, UserRole.MONITOR.value, UserRole.TECNICO.value]:
+                if role in [UserRole.ADMINISTRADOR.value, UserRole.SUPERVISOR.value, UserRole.MONITOR.value, UserRole.TECNICO.value]:
                     create_menu_item('Búsqueda', '/search', 'search')
 
                 # Links de Análisis (visibles para roles con permisos)
-                if app.storage.user.get('role') in [UserRole.ADMINISTRADOR.value, UserRole.SUPERVISOR.value, UserRole.MONITOR.value]:
+                if role in [UserRole.ADMINISTRADOR.value, UserRole.SUPERVISOR.value, UserRole.MONITOR.value]:
                     ui.separator().classes('bg-gray-700 my-2')
                     ui.label('Análisis').classes('text-xs text-gray-400 font-bold uppercase p-2')
                     create_menu_item('Reportes', '/reports', 'analytics')
 
                 # Links de Administración (visibles solo para el rol 'administrador')
-                if app.storage.user.get('role') == UserRole.ADMINISTRADOR.value:
+                if role == UserRole.ADMINISTRADOR.value:
                     ui.separator().classes('bg-gray-700 my-2')
                     ui.label('Administración').classes('text-xs text-gray-400 font-bold uppercase p-2')
                     
@@ -79,4 +83,4 @@ def create_main_layout():
             with ui.column().classes('w-full items-center p-4'):
                 ui.separator().classes('bg-gray-700 w-full mb-4')
                 # Como el logo es blanco con fondo oscuro, sí será visible.
-                ui.image(logo_base64).classes('w-32 opacity-30')
\ No newline at end of file
+                ui.image(asset_url('logo.png')).classes('w-32 opacity-30')
\ No newline at end of file
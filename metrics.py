@@ -0,0 +1,201 @@
+# --- Métricas en formato Prometheus ---
+# Registro mínimo de contadores, gauges e histogramas (sin dependencias externas) en el formato de texto de
+# Prometheus. Los módulos crean sus métricas al importarse (p. ej. `sla_checker`) y las actualizan en el momento;
+# los valores que ya existen en otro lado (profundidad de la cola de correo, uso del pool de conexiones) se
+# registran como gauges con una función que se evalúa en cada lectura.
+#
+# El proceso web las expone en `/metrics` (ver http_instrumentation.py) y `worker.py` con `serve`, sin NiceGUI.
+# Si se define `METRICS_TOKEN`, ambos exigen la cabecera `Authorization: Bearer <token>`.
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from database import engine
+
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+
+# Límites (en segundos) de los histogramas de duración: de 5 ms a 5 minutos.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_registry: list = []
+_lock = threading.Lock()
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names: tuple, values: tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(label_names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, '') for name in self.label_names)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Valor que solo crece (p. ej. notificaciones enviadas)."""
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple, float] = {} if labels else {(): 0.0}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+                for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """Valor instantáneo. Con `function` se calcula en cada lectura de `/metrics`."""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, function=None):
+        super().__init__(name, documentation)
+        self._function = function
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    def _samples(self) -> list[str]:
+        try:
+            value = self._function() if self._function else self._value
+        except Exception:
+            return []
+        return [] if value is None else [f"{self.name} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """Distribución de duraciones en intervalos acumulados, más la suma y la cantidad de observaciones."""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with _lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def _samples(self) -> list[str]:
+        lines = []
+        for key, (counts, total, count) in sorted(self._series.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+def render() -> str:
+    """Todas las métricas registradas en el formato de texto de Prometheus."""
+    return '\n'.join(metric.render() for metric in _registry) + '\n'
+
+
+def is_authorized(authorization: str | None) -> bool:
+    """Indica si la cabecera `Authorization` recibida permite leer las métricas."""
+    return not METRICS_TOKEN or authorization == f"Bearer {METRICS_TOKEN}"
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            status, content_type, body = 404, 'text/plain; charset=utf-8', 'No encontrado'
+        elif not is_authorized(self.headers.get('authorization')):
+            status, content_type, body = 401, 'text/plain; charset=utf-8', 'No autorizado'
+        else:
+            status, content_type, body = 200, CONTENT_TYPE, render()
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port: int, host: str = '0.0.0.0') -> ThreadingHTTPServer:
+    """Expone `/metrics` en un hilo aparte, para procesos sin servidor web (ver worker.py)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
+
+
+# --- Tareas de fondo (ver scheduler.py) ---
+TASK_DURATION = Histogram('helpdeskoi_background_task_duration_seconds',
+                          'Duración de cada ejecución de una tarea de fondo.', labels=('task',))
+TASK_LAG = Histogram('helpdeskoi_background_task_lag_seconds',
+                     'Retraso del inicio de una tarea de fondo respecto de su momento programado.', labels=('task',))
+TASK_FAILURES = Counter('helpdeskoi_background_task_failures_total',
+                        'Ejecuciones de tareas de fondo que terminaron con error.', labels=('task',))
+TASK_SKIPPED = Counter('helpdeskoi_background_task_skipped_total',
+                       'Ejecuciones de tareas de fondo omitidas porque otro proceso tiene su turno.', labels=('task',))
+
+# --- Páginas y solicitudes HTTP ---
+REQUEST_DURATION = Histogram('helpdeskoi_http_request_duration_seconds',
+                             'Tiempo de respuesta por ruta (incluye la construcción de las páginas).',
+                             labels=('method', 'route'))
+
+
+def _pool_value(method: str):
+    # StaticPool (SQLite en memoria) y NullPool no llevan la cuenta de conexiones.
+    function = getattr(engine.pool, method, None)
+    return function() if function else None
+
+
+def _pool_overflow():
+    # SQLAlchemy informa un valor negativo mientras el pool todavía no abrió todas sus conexiones.
+    overflow = _pool_value('overflow')
+    return None if overflow is None else max(0, overflow)
+
+
+Gauge('helpdeskoi_db_pool_size', 'Conexiones permanentes del pool de SQLAlchemy.', lambda: _pool_value('size'))
+Gauge('helpdeskoi_db_pool_checked_out', 'Conexiones del pool en uso.', lambda: _pool_value('checkedout'))
+Gauge('helpdeskoi_db_pool_checked_in', 'Conexiones abiertas y libres en el pool.', lambda: _pool_value('checkedin'))
+Gauge('helpdeskoi_db_pool_overflow', 'Conexiones abiertas por encima del tamaño del pool.', _pool_overflow)
+
@@ -1,5 +1,6 @@
 from sqlalchemy import (
-    create_engine, Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, Boolean, Text
+    create_engine, Column, Integer, String, ForeignKey, DateTime, Enum as SQLEnum, Boolean, Text, LargeBinary,
+    UniqueConstraint, Index
 )
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.sql import func
@@ -82,9 +83,9 @@ class Ticket(Base):
     description = Column(Text)
     status = Column(SQLEnum(TicketStatus), default=TicketStatus.NUEVO)
     urgency = Column(SQLEnum(TicketUrgency), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    assigned_at = Column(DateTime(timezone=True))
-    resolved_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    assigned_at = Column(DateTime(timezone=True), index=True)
+    resolved_at = Column(DateTime(timezone=True), index=True)
     sla_warning_sent_level = Column(Integer, nullable=True) # Almacena el último nivel de advertencia SLA enviado (ej. 30, 15, 5 minutos).
     sla_violation_sent = Column(Boolean, default=False, nullable=False)
 
@@ -103,11 +104,13 @@ class Ticket(Base):
 
 class TicketUpdate(Base):
     __tablename__ = "ticket_updates"
+    # El historial de un ticket se lee por páginas ordenadas por fecha (ver show_ticket_details).
+    __table_args__ = (Index('ix_ticket_updates_ticket_id_timestamp', 'ticket_id', 'timestamp'),)
     id = Column(Integer, primary_key=True)
     ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     comment = Column(Text, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     ticket = relationship("Ticket", back_populates="updates")
     author = relationship("User")
@@ -119,6 +122,25 @@ class SLA(Base):
     assignment_time_hours = Column(Integer, nullable=False)
     resolution_time_hours = Column(Integer, nullable=False)
 
+class MonthlyReport(Base):
+    """Reporte precalculado de un mes cerrado: los datos de la página y el libro Excel (ver monthly_reports.py)."""
+    __tablename__ = "monthly_reports"
+    __table_args__ = (UniqueConstraint('year', 'month'),)
+    id = Column(Integer, primary_key=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    payload = Column(Text(length=2**24 - 1), nullable=False) # ReportData en JSON (MEDIUMTEXT en MariaDB).
+    workbook = Column(LargeBinary(length=2**24 - 1), nullable=False) # Archivo .xlsx (MEDIUMBLOB en MariaDB).
+    built_at = Column(DateTime(timezone=True), nullable=False) # Momento en que se empezaron a leer los datos.
+    invalidated_at = Column(DateTime(timezone=True), nullable=True) # Último cambio de un ticket del mes.
+
+class SchedulerLease(Base):
+    """Turno de un proceso para ejecutar una tarea de fondo que no debe correr en paralelo (ver scheduler.py)."""
+    __tablename__ = "scheduler_leases"
+    name = Column(String(100), primary_key=True) # Nombre de la tarea.
+    owner = Column(String(255), nullable=False) # Proceso que tiene el turno (host:pid:aleatorio).
+    expires_at = Column(DateTime, nullable=False) # Hasta cuándo (UTC) ningún otro proceso puede tomar el turno.
+
 class MailSettings(Base):
     __tablename__ = "mail_settings"
     id = Column(Integer, primary_key=True)
@@ -0,0 +1,205 @@
+# --- Reportes mensuales precalculados ---
+# Al comenzar cada mes todos los supervisores piden a la vez el reporte (y el Excel) del mes anterior.
+# Una tarea de fondo arma una sola vez el reporte de cada mes cerrado, lo guarda en la tabla `monthly_reports`
+# (los datos en JSON y el libro .xlsx ya generado) y lo deja cargado en `report_month_cache`, de donde la página
+# de reportes lo toma sin consultar la BD.
+#
+# Un mes guardado solo se vuelve a armar cuando cambia un ticket con alguna fecha en ese mes (un cambio con
+# fecha retroactiva): el evento marca `invalidated_at` y la siguiente ejecución de la tarea lo reconstruye.
+#
+# Con varios procesos, solo uno arma los reportes (ver scheduler.py) y cada uno los carga en su memoria cada
+# `MONTHLY_REPORTS_RELOAD_SECONDS`: recarga los meses cuyo `built_at` en la tabla difiere del que tiene cargado
+# y descarta los que quedaron desactualizados, que se calculan en vivo hasta que se vuelven a armar.
+import asyncio
+import io
+import json
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import and_, func, or_
+
+from database import SessionLocal
+from models import MonthlyReport, Ticket
+from datetime_utils import period_bounds
+from export_excel import excel_report_data, write_excel_report
+from report_queries import ReportData, load_report_data, report_to_dict, report_from_dict, report_month_cache
+import period_cache
+
+# Cada cuántos segundos se buscan meses cerrados sin reporte guardado o con cambios.
+MONTHLY_REPORTS_INTERVAL_SECONDS = float(os.environ.get("MONTHLY_REPORTS_INTERVAL_SECONDS", 3600))
+# Cada cuántos segundos cada proceso recarga los reportes guardados que reconstruyó otro proceso.
+MONTHLY_REPORTS_RELOAD_SECONDS = float(os.environ.get("MONTHLY_REPORTS_RELOAD_SECONDS", 300))
+
+# `built_at` de cada mes cargado en `report_month_cache` desde la tabla.
+_loaded_versions: dict[tuple[int, int], datetime] = {}
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _is_fresh():
+    """Condición de un reporte guardado sin cambios posteriores a su armado."""
+    return or_(MonthlyReport.invalidated_at.is_(None), MonthlyReport.invalidated_at < MonthlyReport.built_at)
+
+
+def _closed_months(db) -> list[tuple[int, int]]:
+    """Meses cerrados desde el del primer ticket hasta el mes anterior al actual."""
+    first = db.query(func.min(Ticket.created_at)).scalar()
+    if first is None:
+        return []
+    now = _utc_now()
+    months = []
+    year, month = first.year, first.month
+    while (year, month) < (now.year, now.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def stored_months() -> list[tuple[int, int]]:
+    """Meses con reporte guardado y vigente, del más reciente al más antiguo."""
+    db = SessionLocal()
+    try:
+        rows = db.query(MonthlyReport.year, MonthlyReport.month).filter(_is_fresh()).order_by(
+            MonthlyReport.year.desc(), MonthlyReport.month.desc()).all()
+        return [(row.year, row.month) for row in rows]
+    finally:
+        db.close()
+
+
+def load_stored_workbook(year: int, month: int) -> bytes | None:
+    """Libro Excel guardado del mes, o `None` si no existe o quedó desactualizado."""
+    db = SessionLocal()
+    try:
+        return db.query(MonthlyReport.workbook).filter(
+            MonthlyReport.year == year, MonthlyReport.month == month, _is_fresh()).scalar()
+    finally:
+        db.close()
+
+
+def build_month(year: int, month: int) -> ReportData:
+    """
+    Calcula el reporte del mes, genera su libro Excel, los guarda (reemplazando el anterior) y deja el reporte
+    cargado en `report_month_cache`.
+    """
+    # `built_at` es el momento previo a la lectura: un cambio durante el armado deja el mes desactualizado.
+    built_at = _utc_now()
+    start_date, end_date = period_bounds(year, month)
+    report = load_report_data(start_date, end_date)
+    output = io.BytesIO()
+    write_excel_report(excel_report_data(report, start_date, end_date), output)
+
+    db = SessionLocal()
+    try:
+        stored = db.query(MonthlyReport).filter(MonthlyReport.year == year, MonthlyReport.month == month).first()
+        if not stored:
+            stored = MonthlyReport(year=year, month=month)
+            db.add(stored)
+        stored.payload = json.dumps(report_to_dict(report))
+        stored.workbook = output.getvalue()
+        stored.built_at = built_at
+        db.commit()
+    finally:
+        db.close()
+    report_month_cache.store(year, month, report)
+    _loaded_versions[(year, month)] = built_at
+    return report
+
+
+def _stored_versions() -> dict[tuple[int, int], datetime]:
+    """`built_at` de cada mes con reporte guardado y vigente."""
+    db = SessionLocal()
+    try:
+        rows = db.query(MonthlyReport.year, MonthlyReport.month, MonthlyReport.built_at).filter(_is_fresh()).all()
+        return {(row.year, row.month): row.built_at for row in rows}
+    finally:
+        db.close()
+
+
+def _load_payloads(months: list[tuple[int, int]]) -> dict[tuple[int, int], tuple[ReportData, datetime]]:
+    if not months:
+        return {}
+    db = SessionLocal()
+    try:
+        rows = db.query(MonthlyReport.year, MonthlyReport.month, MonthlyReport.payload,
+                        MonthlyReport.built_at).filter(_is_fresh()).all()
+        wanted = set(months)
+        return {(row.year, row.month): (report_from_dict(json.loads(row.payload)), row.built_at)
+                for row in rows if (row.year, row.month) in wanted}
+    finally:
+        db.close()
+
+
+def refresh_monthly_reports(build: bool = True) -> int:
+    """
+    Arma los meses cerrados que no tienen reporte guardado o que cambiaron, y carga en `report_month_cache`
+    los guardados que no tiene cargados o que otro proceso reconstruyó. Con `build=False` solo los carga.
+    Retorna la cantidad de meses reconstruidos.
+    """
+    db = SessionLocal()
+    try:
+        months = _closed_months(db)
+    finally:
+        db.close()
+
+    versions = _stored_versions()
+    for month_key in months:
+        if month_key not in versions:
+            # Desactualizado en la tabla (p. ej. por un cambio hecho en otro proceso): se calcula en vivo
+            # hasta que se vuelva a armar.
+            report_month_cache.discard(*month_key)
+            _loaded_versions.pop(month_key, None)
+    outdated = [m for m in months if m in versions and
+                (_loaded_versions.get(m) != versions[m] or report_month_cache.lookup(*m) is None)]
+    for (year, month), (report, built_at) in _load_payloads(outdated).items():
+        report_month_cache.store(year, month, report)
+        _loaded_versions[(year, month)] = built_at
+
+    built = 0
+    if not build:
+        return built
+    for year, month in months:
+        if (year, month) not in versions:
+            build_month(year, month)
+            built += 1
+    return built
+
+
+async def precompute_monthly_reports():
+    """Tarea de fondo: ejecuta `refresh_monthly_reports` fuera del event loop."""
+    built = await asyncio.get_running_loop().run_in_executor(None, refresh_monthly_reports)
+    if built:
+        print(f"Reportes mensuales: {built} mes(es) reconstruido(s).")
+
+
+async def load_monthly_reports():
+    """
+    Tarea de fondo de cada proceso: carga en su `report_month_cache` los reportes que armó el proceso que
+    ejecuta `precompute_monthly_reports` (ver scheduler.py).
+    """
+    await asyncio.get_running_loop().run_in_executor(None, refresh_monthly_reports, False)
+
+
+class _StoredMonthInvalidator:
+    """
+    Se registra en `period_cache` como si fuera una caché más: cuando cambian tickets, marca como
+    desactualizados los reportes guardados de los meses de sus fechas, con un solo UPDATE por publicación.
+    """
+    date_fields = ('created_at', 'assigned_at', 'resolved_at')
+
+    def invalidate_months(self, months: set[tuple[int, int]]):
+        closed = [(year, month) for year, month in months if period_cache.PeriodCache._is_closed(year, month)]
+        if not closed:
+            return
+        db = SessionLocal()
+        try:
+            db.query(MonthlyReport).filter(
+                or_(*(and_(MonthlyReport.year == year, MonthlyReport.month == month) for year, month in closed))
+            ).update({MonthlyReport.invalidated_at: _utc_now()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+period_cache.register(_StoredMonthInvalidator())
@@ -1,17 +1,104 @@
-from asyncio import get_running_loop
+from asyncio import Future, get_running_loop
+import os
 from database import SessionLocal
 from models import Ticket, User, TicketUpdate
-from email_utils import send_email_notification
+from email_utils import send_email_notification, SMTP_DELIVERY_MODE
+from mail_queue import PriorityMailQueue, MailPriority
 import notification_templates as nt
+import metrics
 
+NOTIFICATIONS_SENT = metrics.Counter('helpdeskoi_notifications_sent_total', 'Correos de notificación entregados al servidor SMTP.')
 
-def _send_email_in_background(to_address: str, subject: str, html_content: str):
-    """Ejecuta el envío de correo en un hilo separado para no bloquear la interfaz."""
+
+def _deliver_email(to_address: str, subject: str, html_content: str):
+    """Ejecuta el envío de correo sin bloquear la interfaz (en un hilo o en el event loop, según `SMTP_DELIVERY_MODE`)."""
+    NOTIFICATIONS_SENT.inc()
+    if SMTP_DELIVERY_MODE == 'async':
+        from email_async import async_sender
+        _track_send(async_sender.send(to_address, subject, html_content))
+        return
+    loop = get_running_loop()
+    _track_send(loop.run_in_executor(None, send_email_notification, to_address, subject, html_content))
+
+
+# Envíos entregados a un hilo o al envío asíncrono que todavía no terminaron (ver `sends_in_flight`).
+_sends_in_flight: set[Future] = set()
+
+
+def _track_send(future: Future):
+    _sends_in_flight.add(future)
+    future.add_done_callback(_sends_in_flight.discard)
+
+
+def sends_in_flight() -> set[Future]:
+    """Envíos en curso, para esperarlos antes de detener el proceso."""
+    return set(_sends_in_flight)
+
+
+# Cola de salida con prioridad: respeta el límite del proveedor SMTP sin que los avisos
+# de SLA queden detrás de las actualizaciones rutinarias.
+outbound_queue = PriorityMailQueue(_deliver_email)
+metrics.Gauge('helpdeskoi_mail_queue_depth', 'Correos retenidos por el límite de envío SMTP.', outbound_queue.depth)
+
+
+def _send_email_in_background(to_address: str, subject: str, html_content: str, priority: MailPriority = MailPriority.UPDATE):
+    """Encola un correo en la cola de salida con la prioridad indicada."""
     if not to_address:
         print(f"WARN: No email address for notification with subject: {subject}")
         return
-    loop = get_running_loop()
-    loop.run_in_executor(None, send_email_notification, to_address, subject, html_content)
+    outbound_queue.put(to_address, subject, html_content, priority)
+
+
+# --- Agrupación de notificaciones por ticket y destinatario ---
+# Una sola acción (p. ej. clasificar y asignar) puede generar varios correos para la misma persona.
+# Se retienen durante una ventana corta y se envían como un único mensaje.
+COALESCE_WINDOW_SECONDS = float(os.environ.get("NOTIFICATION_COALESCE_SECONDS", 5))
+
+# (ticket_id, email normalizado) -> lista de (destinatario, asunto, contenido html, prioridad)
+_pending_notifications: dict[tuple[int, str], list[tuple[str, str, str, MailPriority]]] = {}
+
+
+def _queue_ticket_email(ticket_id: int, to_address: str, subject: str, html_content: str, priority: MailPriority = MailPriority.UPDATE):
+    """Encola un correo de un ticket para agruparlo con otros dirigidos al mismo destinatario."""
+    if not to_address:
+        print(f"WARN: No email address for notification with subject: {subject}")
+        return
+    if COALESCE_WINDOW_SECONDS <= 0:
+        _send_email_in_background(to_address, subject, html_content, priority)
+        return
+
+    key = (ticket_id, to_address.strip().lower())
+    pending = _pending_notifications.get(key)
+    if pending is None:
+        _pending_notifications[key] = [(to_address, subject, html_content, priority)]
+        get_running_loop().call_later(COALESCE_WINDOW_SECONDS, _flush_ticket_emails, key)
+    else:
+        pending.append((to_address, subject, html_content, priority))
+
+
+def _flush_ticket_emails(key: tuple[int, str]):
+    """Envía en un solo correo todas las notificaciones acumuladas para un ticket y destinatario."""
+    pending = _pending_notifications.pop(key, None)
+    if not pending:
+        return
+
+    to_address, subject, html_content, priority = pending[0]
+    if len(pending) > 1:
+        # El mensaje combinado hereda la prioridad más alta de sus partes.
+        priority = min(item[3] for item in pending)
+        ticket_id = key[0]
+        if len({item[1] for item in pending}) > 1:
+            subject = f"Actualizaciones en Ticket #{ticket_id}"
+        # Se descartan los contenidos repetidos conservando el orden original.
+        html_contents = list(dict.fromkeys(item[2] for item in pending))
+        html_content = nt.merge_notifications(html_contents) if len(html_contents) > 1 else html_contents[0]
+    _send_email_in_background(to_address, subject, html_content, priority)
+
+
+def flush_pending_notifications():
+    """Envía ya las notificaciones retenidas para agruparlas, sin esperar a que venza su ventana."""
+    for key in list(_pending_notifications):
+        _flush_ticket_emails(key)
 
 
 def notify_new_ticket(ticket: Ticket):
@@ -23,7 +110,7 @@ def notify_new_ticket(ticket: Ticket):
             title=ticket.title,
             creator_name=ticket.creator.username
         )
-        _send_email_in_background(ticket.creator.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.creator.email, subject, html_content)
 
 
 def notify_ticket_assigned(ticket: Ticket, assigner: User):
@@ -36,7 +123,7 @@ def notify_ticket_assigned(ticket: Ticket, assigner: User):
             title=ticket.title,
             technician_name=ticket.technician.username
         )
-        _send_email_in_background(ticket.technician.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.technician.email, subject, html_content, MailPriority.ASSIGNMENT)
 
     # 2. Notificar al solicitante
     if ticket.creator and ticket.creator.email:
@@ -48,7 +135,7 @@ def notify_ticket_assigned(ticket: Ticket, assigner: User):
             author_name=assigner.username,
             comment=comment
         )
-        _send_email_in_background(ticket.creator.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.creator.email, subject, html_content)
 
 
 def notify_ticket_update(ticket: Ticket, update: TicketUpdate):
@@ -62,7 +149,7 @@ def notify_ticket_update(ticket: Ticket, update: TicketUpdate):
             author_name=update.author.username,
             comment=update.comment
         )
-        _send_email_in_background(ticket.creator.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.creator.email, subject, html_content)
 
     # 2. Notificar al técnico (si no es quien actualiza)
     if ticket.technician and ticket.technician.email and ticket.technician_id != update.author_id:
@@ -73,7 +160,7 @@ def notify_ticket_update(ticket: Ticket, update: TicketUpdate):
             author_name=update.author.username,
             comment=update.comment
         )
-        _send_email_in_background(ticket.technician.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.technician.email, subject, html_content)
 
 
 def notify_status_change(ticket: Ticket, old_status: str, author: User):
@@ -87,7 +174,7 @@ def notify_status_change(ticket: Ticket, old_status: str, author: User):
             author_name=author.username,
             comment=comment
         )
-        _send_email_in_background(ticket.creator.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.creator.email, subject, html_content)
 
 
 def notify_reassignment(ticket: Ticket, old_technician: User, assigner: User):
@@ -96,21 +183,52 @@ def notify_reassignment(ticket: Ticket, old_technician: User, assigner: User):
     if ticket.technician and ticket.technician.email:
         subject = f"Nuevo Ticket Asignado #{ticket.id}: {ticket.title}"
         html_content = nt.ticket_assigned_notification(ticket.id, ticket.title, ticket.technician.username)
-        _send_email_in_background(ticket.technician.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.technician.email, subject, html_content, MailPriority.ASSIGNMENT)
 
     # Notificar al técnico anterior
     if old_technician and old_technician.email:
         subject = f"Ticket Reasignado #{ticket.id}: {ticket.title}"
         comment = f"El ticket que tenías asignado ha sido reasignado a {ticket.technician.username} por {assigner.username}."
         html_content = nt.ticket_update_notification(ticket.id, ticket.title, assigner.username, comment)
-        _send_email_in_background(old_technician.email, subject, html_content)
+        _queue_ticket_email(ticket.id, old_technician.email, subject, html_content)
 
     # Notificar al creador
     if ticket.creator and ticket.creator.email:
         subject = f"Actualización en tu Ticket #{ticket.id}"
         comment = f"El ticket ha sido reasignado al técnico {ticket.technician.username}."
         html_content = nt.ticket_update_notification(ticket.id, ticket.title, assigner.username, comment)
-        _send_email_in_background(ticket.creator.email, subject, html_content)
+        _queue_ticket_email(ticket.id, ticket.creator.email, subject, html_content)
+
+def notify_bulk_update(tickets: list[Ticket], author: User, comments: dict[int, str], assigned: bool = False):
+    """
+    Notifica una acción masiva del dashboard con un correo por destinatario que lista todos sus tickets,
+    en lugar de uno por ticket. Los tickets deben tener cargados `creator` y `technician`.
+    Con `assigned`, el técnico recibe el aviso con la prioridad de una asignación.
+    """
+    # email normalizado -> (destinatario, prioridad, [(id, título, comentario)])
+    recipients: dict[str, tuple[str, MailPriority, list[tuple[int, str, str]]]] = {}
+
+    def add(user: User, priority: MailPriority, ticket: Ticket):
+        if not user or not user.email or user.id == author.id:
+            return
+        key = user.email.strip().lower()
+        address, current, items = recipients.get(key, (user.email, priority, []))
+        items.append((ticket.id, ticket.title, comments[ticket.id]))
+        recipients[key] = (address, min(current, priority), items)
+
+    for ticket in tickets:
+        add(ticket.creator, MailPriority.UPDATE, ticket)
+        add(ticket.technician, MailPriority.ASSIGNMENT if assigned else MailPriority.UPDATE, ticket)
+
+    for address, priority, items in recipients.values():
+        if len(items) == 1:
+            ticket_id, title, comment = items[0]
+            subject = f"Actualización en Ticket #{ticket_id}"
+            html_content = nt.ticket_update_notification(ticket_id, title, author.username, comment)
+        else:
+            subject = f"Nuevos Tickets Asignados ({len(items)})" if priority == MailPriority.ASSIGNMENT else f"Actualización en {len(items)} tickets"
+            html_content = nt.bulk_update_notification(author.username, items)
+        _send_email_in_background(address, subject, html_content, priority)
 
 def notify_sla_event(ticket: Ticket, event_type: str, sla_type: str, time_info: str, recipients: list[User]):
     """
@@ -128,6 +246,7 @@ def notify_sla_event(ticket: Ticket, event_type: str, sla_type: str, time_info:
         return
 
     subject = f"[{event_type}] SLA de {sla_type} para Ticket #{ticket.id}: {ticket.title}"
+    priority = MailPriority.SLA_WARNING if event_type == "ADVERTENCIA" else MailPriority.SLA_VIOLATION
 
     for user in recipients:
         if not user.email:
@@ -150,4 +269,4 @@ def notify_sla_event(ticket: Ticket, event_type: str, sla_type: str, time_info:
                 overdue_time=time_info
             )
         
-        _send_email_in_background(user.email, subject, html_content)
\ No newline at end of file
+        _send_email_in_background(user.email, subject, html_content, priority)
\ No newline at end of file
@@ -18,7 +18,7 @@ def get_base_template(content: str) -> str:
                 <h1>HelpdeskOI</h1>
             </div>
             <div class="content">
-                {content}
+                <!--contenido-->{content}<!--/contenido-->
             </div>
             <div class="footer">
                 <p>Este es un correo generado automáticamente. Por favor, no responda a este mensaje.</p>
@@ -81,6 +81,23 @@ def ticket_status_change_notification(ticket_id: int, title: str, new_status: st
     """
     return get_base_template(body)
 
+def bulk_update_notification(author_name: str, items: list[tuple[int, str, str]]) -> str:
+    """Genera un único correo con los cambios de varios tickets. `items` son tuplas (id, título, comentario)."""
+    rows = "".join(
+        f"<li><b>#{ticket_id}: {title}</b><br>{comment}</li>"
+        for ticket_id, title, comment in items
+    )
+    body = f"""
+    <h2>Actualización de {len(items)} tickets</h2>
+    <p>Hola,</p>
+    <p><b>{author_name}</b> actualizó los siguientes tickets:</p>
+    <ul>
+        {rows}
+    </ul>
+    <p>Puedes ver los detalles de cada ticket en el sistema.</p>
+    """
+    return get_base_template(body)
+
 def sla_warning_notification(ticket_id: int, title: str, technician_name: str, notification_type: str, time_left: str) -> str:
     """Genera el correo de advertencia por vencimiento de SLA."""
     body = f"""
@@ -112,3 +129,16 @@ def sla_violation_notification(ticket_id: int, title: str, technician_name: str,
     <p>Por favor, toma las acciones correctivas necesarias de inmediato.</p>
     """
     return get_base_template(body)
+
+def merge_notifications(html_messages: list[str]) -> str:
+    """Combina varios correos ya generados en uno solo, conservando el contenido de cada uno en orden."""
+    sections = []
+    for html in html_messages:
+        start = html.find('<!--contenido-->')
+        end = html.find('<!--/contenido-->')
+        if start == -1 or end == -1:
+            sections.append(html)
+        else:
+            sections.append(html[start + len('<!--contenido-->'):end])
+    separator = '<hr style="border: none; border-top: 1px solid #ddd; margin: 20px 0;">'
+    return get_base_template(separator.join(sections))
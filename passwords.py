@@ -0,0 +1,12 @@
+# --- Hash de contraseñas ---
+# Módulo sin dependencias de la BD: `verify_password` se ejecuta en el pool de procesos durante el login
+# (ver auth.py) y los procesos del pool solo necesitan importar passlib.
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def get_password_hash(password):
+    return pwd_context.hash(password)
+
+def verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
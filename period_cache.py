@@ -0,0 +1,136 @@
+# --- Caché compartida de agregados por período ---
+# Guarda en memoria resultados calculados por (año, mes) para que todas las sesiones los reutilicen.
+# Los períodos que siguen abiertos (el mes o año en curso, o "todos") vencen tras un TTL corto;
+# los meses ya cerrados se conservan hasta que un cambio en un ticket de ese período los invalide.
+#
+# Las invalidaciones se calculan por publicación de eventos, no por ticket: una acción masiva lee las fechas de
+# todos sus tickets con una sola consulta y descarta cada mes una sola vez, fuera del event loop.
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from database import SessionLocal
+from models import Ticket
+from datetime_utils import period_bounds
+import ticket_events
+
+
+class PeriodCache:
+    """
+    Caché de `loader(year, month)` por período. `year=None` representa todos los años
+    y `month=None` el año completo.
+
+    `date_fields` son los campos de fecha del ticket de los que dependen los resultados: cuando un ticket
+    cambia, se invalidan los períodos de esas fechas, tanto las anteriores al cambio como las nuevas.
+
+    Los eventos solo llegan desde el propio proceso: `closed_ttl_seconds` limita cuánto se conserva un período
+    cerrado para que los cambios hechos en otro proceso (p. ej. worker.py) terminen por verse. Con `None`
+    los períodos cerrados no vencen.
+    """
+
+    def __init__(self, loader, ttl_seconds: float, date_fields: tuple[str, ...] = ('created_at',),
+                 closed_ttl_seconds: float | None = None):
+        self._loader = loader
+        self._ttl = ttl_seconds
+        self._closed_ttl = closed_ttl_seconds
+        self.date_fields = date_fields
+        self._entries: dict[tuple[int | None, int | None], tuple[object, float | None]] = {}
+
+    @staticmethod
+    def _key(year: int | None, month: int | None) -> tuple[int | None, int | None]:
+        return (year, month or None) if year else (None, None)
+
+    def lookup(self, year: int | None = None, month: int | None = None):
+        """Retorna el valor guardado si sigue vigente, o `None`."""
+        entry = self._entries.get(self._key(year, month))
+        if entry and (entry[1] is None or entry[1] > time.monotonic()):
+            return entry[0]
+        return None
+
+    def store(self, year: int | None, month: int | None, value):
+        key = self._key(year, month)
+        if self._is_closed(*key):
+            expires_at = None if self._closed_ttl is None else time.monotonic() + self._closed_ttl
+        else:
+            expires_at = time.monotonic() + self._ttl
+        self._entries[key] = (value, expires_at)
+
+    def get(self, year: int | None = None, month: int | None = None):
+        value = self.lookup(year, month)
+        if value is None:
+            value = self._loader(*self._key(year, month))
+            self.store(year, month, value)
+        return value
+
+    def invalidate_months(self, months: set[tuple[int, int]]):
+        """Descarta los meses indicados, sus años y el agregado de todos los años."""
+        self._entries.pop((None, None), None)
+        for year, month in months:
+            self._entries.pop((year, None), None)
+            self._entries.pop((year, month), None)
+
+    def discard(self, year: int | None, month: int | None):
+        """Descarta solo el período indicado."""
+        self._entries.pop(self._key(year, month), None)
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def _is_closed(year: int | None, month: int | None) -> bool:
+        if not year:
+            return False
+        _, end = period_bounds(year, month)
+        return end <= datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+_caches: list[PeriodCache] = []
+
+
+def register(cache: PeriodCache) -> PeriodCache:
+    """Suscribe la caché a los eventos de tickets para invalidar los períodos del ticket modificado."""
+    _caches.append(cache)
+    return cache
+
+
+def _tickets_dates(ticket_ids: list[int]) -> list[dict]:
+    """Fechas actuales de los tickets, en consultas de hasta 1000 IDs."""
+    db = SessionLocal()
+    try:
+        rows = []
+        for start in range(0, len(ticket_ids), 1000):
+            rows += db.query(Ticket.created_at, Ticket.assigned_at, Ticket.resolved_at).filter(
+                Ticket.id.in_(ticket_ids[start:start + 1000])).all()
+        return [row._asdict() for row in rows]
+    finally:
+        db.close()
+
+
+def invalidate_tickets(previous_by_id: dict[int, dict | None]):
+    """Invalida en todas las cachés los meses de las fechas de los tickets, antes y después del cambio."""
+    states = [previous for previous in previous_by_id.values() if previous] + _tickets_dates(list(previous_by_id))
+    for cache in _caches:
+        months = {(moment.year, moment.month) for state in states
+                  for moment in (state.get(date_field) for date_field in cache.date_fields) if moment}
+        cache.invalidate_months(months)
+
+
+def _invalidate_logged(previous_by_id: dict[int, dict | None]):
+    try:
+        invalidate_tickets(previous_by_id)
+    except Exception as e:
+        print(f"Error al invalidar las cachés de {len(previous_by_id)} ticket(s): {e}")
+
+
+def _on_ticket_events(event_type, previous_by_id):
+    if not _caches:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Publicado desde un hilo sin event loop (p. ej. dentro de `run_in_executor`): ya no bloquea la interfaz.
+        _invalidate_logged(previous_by_id)
+        return
+    loop.run_in_executor(None, _invalidate_logged, dict(previous_by_id))
+
+ticket_events.subscribe_batch(_on_ticket_events)
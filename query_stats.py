@@ -0,0 +1,108 @@
+# --- Instrumentación de consultas SQL ---
+# Cuenta las consultas y el tiempo total en la BD de cada unidad de trabajo: cada solicitud HTTP (la carga de
+# una página, una descarga; ver http_instrumentation.py) y cada ejecución de una tarea de fondo (ver scheduler.py).
+# Al terminar la unidad se registra un resumen, y las sentencias idénticas repetidas muchas veces dentro de la
+# misma unidad se marcan como probable patrón N+1 (una consulta por fila en lugar de una para todas).
+# Las consultas que superan `SQL_SLOW_QUERY_MS` se registran con sus parámetros.
+#
+# La unidad actual se guarda en un `ContextVar`: las consultas que se ejecutan en otro hilo (p. ej. con
+# `run_in_executor`) no se atribuyen a la unidad que las lanzó, pero sí se controlan como consultas lentas.
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+# Milisegundos a partir de los cuales una consulta se registra como lenta (0 desactiva el registro).
+SQL_SLOW_QUERY_MS = float(os.environ.get("SQL_SLOW_QUERY_MS", 200))
+# Ejecuciones de la misma sentencia en una unidad de trabajo para marcarla como posible N+1 (0 lo desactiva).
+SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD", 10))
+
+
+class QueryStats:
+    """Consultas ejecutadas dentro de una unidad de trabajo."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated_statements(self) -> list[tuple[str, int]]:
+        """Sentencias que alcanzaron el umbral de N+1, de la más a la menos repetida."""
+        if SQL_N_PLUS_ONE_THRESHOLD <= 0:
+            return []
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= SQL_N_PLUS_ONE_THRESHOLD]
+
+
+_current: ContextVar[QueryStats | None] = ContextVar('query_stats', default=None)
+_finish_callbacks: list = []
+
+
+def on_finish(callback):
+    """Registra `callback(stats)`, que se llama al terminar cada unidad de trabajo."""
+    _finish_callbacks.append(callback)
+    return callback
+
+
+def _shorten(text: str, limit: int = 300) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+@contextmanager
+def track(name: str):
+    """Agrupa las consultas ejecutadas dentro del bloque bajo `name` y registra el resumen al salir."""
+    stats = QueryStats(name)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        if stats.count:
+            logger.info(f"{name}: {stats.count} consulta(s), {stats.total_seconds * 1000:.1f} ms en la BD")
+        for statement, n in stats.repeated_statements():
+            logger.warning(f"Posible N+1 en {name}: {n} ejecuciones de: {_shorten(statement)}")
+        for callback in _finish_callbacks:
+            try:
+                callback(stats)
+            except Exception as e:
+                logger.error(f"Error al procesar las estadísticas de '{name}': {e}")
+
+
+@event.listens_for(engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info['query_start_time'].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    if SQL_SLOW_QUERY_MS > 0 and seconds * 1000 >= SQL_SLOW_QUERY_MS:
+        origin = f" ({stats.name})" if stats is not None else ""
+        logger.warning(f"Consulta lenta{origin}: {seconds * 1000:.1f} ms: {_shorten(statement, 1000)} "
+                       f"-- parámetros: {_shorten(repr(parameters), 500)}")
+
+
+@event.listens_for(engine, 'handle_error')
+def _handle_error(exception_context):
+    # La consulta falló: se descarta su marca de inicio para no desalinear las siguientes.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start_time'):
+        connection.info['query_start_time'].pop()
+
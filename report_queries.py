@@ -0,0 +1,393 @@
+# --- Consultas de la página de reportes ---
+# Cada métrica es una consulta de agregación independiente. `load_report_data` las ejecuta en orden sobre
+# una sola sesión; `fetch_report_range` las ejecuta en paralelo, cada una con su propia conexión del pool
+# y fuera del event loop, de modo que el tiempo total es el de la consulta más lenta y no la suma de todas.
+#
+# `fetch_report_data` (la que usa la página) arma los reportes mes a mes: los meses cerrados se guardan
+# en `report_month_cache` hasta que un cambio en uno de sus tickets los invalide, y solo el mes en curso
+# se consulta siempre. Un reporte de varios meses se obtiene sumando los agregados de cada mes.
+import asyncio
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import func
+from sqlalchemy.pool import StaticPool
+
+from database import SessionLocal, engine
+from models import Ticket, User, ProblemType, TicketStatus, TicketUrgency, Location, TicketUpdate
+from datetime_utils import period_bounds
+import period_cache
+
+# Consultas simultáneas como máximo. Debe ser menor o igual al tamaño del pool de conexiones (5 por defecto).
+REPORT_QUERY_WORKERS = int(os.environ.get("REPORT_QUERY_WORKERS", 5))
+
+_executor = ThreadPoolExecutor(max_workers=REPORT_QUERY_WORKERS, thread_name_prefix='report-query')
+
+
+@dataclass
+class ReportData:
+    """Resultado de todas las métricas de un reporte para el rango [start_date, end_date)."""
+    tech_performance: list[dict] = field(default_factory=list)
+    problem_analysis: list = field(default_factory=list)
+    ticket_volume: list = field(default_factory=list)
+    location_analysis: list = field(default_factory=list)
+    location_problem: list = field(default_factory=list)
+    assigned_volume: list = field(default_factory=list)
+    rejected_volume: list = field(default_factory=list)
+    resolved_volume: list = field(default_factory=list)
+    tech_distribution: list = field(default_factory=list)
+    sla_violations: dict[str, int] = field(default_factory=dict)
+
+
+# Filas de volumen diario, con el día como texto 'AAAA-MM-DD'.
+CreatedDayCount = namedtuple('CreatedDayCount', ['creation_day', 'daily_count'])
+AssignedDayCount = namedtuple('AssignedDayCount', ['assignment_day', 'daily_count'])
+RejectedDayCount = namedtuple('RejectedDayCount', ['rejection_day', 'daily_count'])
+ResolvedDayCount = namedtuple('ResolvedDayCount', ['resolution_day', 'daily_count'])
+
+
+def query_resolved_by_technician(db, start_date: datetime, end_date: datetime) -> dict[str, int]:
+    """Tickets resueltos en el período por técnico."""
+    rows = db.query(
+        User.username,
+        func.count(Ticket.id).label('resolved_count')
+    ).join(Ticket, User.id == Ticket.technician_id).filter(
+        Ticket.status == TicketStatus.RESUELTO,
+        Ticket.resolved_at.isnot(None),
+        Ticket.assigned_at.isnot(None),
+        Ticket.resolved_at >= start_date,
+        Ticket.resolved_at < end_date
+    ).group_by(User.username).all()
+    return {row.username: row.resolved_count for row in rows}
+
+
+def query_assigned_by_technician(db, start_date: datetime, end_date: datetime) -> dict[str, int]:
+    """Tickets asignados en el período por técnico."""
+    rows = db.query(
+        User.username,
+        func.count(Ticket.id).label('assigned_count')
+    ).join(Ticket, User.id == Ticket.technician_id).filter(
+        Ticket.assigned_at.isnot(None),
+        Ticket.assigned_at >= start_date,
+        Ticket.assigned_at < end_date
+    ).group_by(User.username).all()
+    return {row.username: row.assigned_count for row in rows}
+
+
+def query_problem_analysis(db, start_date: datetime, end_date: datetime):
+    """Análisis de problemas (basado en la fecha de creación)."""
+    return db.query(
+        ProblemType.name,
+        func.count(Ticket.id).label('ticket_count')
+    ).join(ProblemType, Ticket.problem_type_id == ProblemType.id).filter(
+        Ticket.created_at >= start_date,
+        Ticket.created_at < end_date
+    ).group_by(ProblemType.name).order_by(func.count(Ticket.id).desc()).all()
+
+
+def query_ticket_volume(db, start_date: datetime, end_date: datetime):
+    """Volumen de tickets creados por día."""
+    return db.query(
+        func.date(Ticket.created_at).label('creation_day'),
+        func.count(Ticket.id).label('daily_count')
+    ).filter(
+        Ticket.created_at >= start_date,
+        Ticket.created_at < end_date
+    ).group_by('creation_day').order_by('creation_day').all()
+
+
+def query_location_analysis(db, start_date: datetime, end_date: datetime):
+    """Tickets por ubicación (basado en la fecha de creación)."""
+    return db.query(
+        Location.description,
+        func.count(Ticket.id).label('ticket_count')
+    ).join(Ticket, Location.id == Ticket.location_id).filter(
+        Ticket.created_at >= start_date,
+        Ticket.created_at < end_date
+    ).group_by(Location.description).order_by(func.count(Ticket.id).desc()).all()
+
+
+def query_location_problem(db, start_date: datetime, end_date: datetime):
+    """Resumen por ubicación y tipo de problema."""
+    return db.query(
+        Location.description.label('location_description'),
+        ProblemType.name.label('problem_type_name'),
+        func.count(Ticket.id).label('ticket_count')
+    ).join(Ticket, Location.id == Ticket.location_id
+    ).join(ProblemType, Ticket.problem_type_id == ProblemType.id
+    ).filter(
+        Ticket.created_at >= start_date,
+        Ticket.created_at < end_date,
+        Ticket.location_id.isnot(None),
+        Ticket.problem_type_id.isnot(None)
+    ).group_by(
+        Location.description, ProblemType.name
+    ).order_by(
+        Location.description, func.count(Ticket.id).desc()
+    ).all()
+
+
+def query_assigned_volume(db, start_date: datetime, end_date: datetime):
+    """Tickets asignados por día."""
+    return db.query(
+        func.date(Ticket.assigned_at).label('assignment_day'),
+        func.count(Ticket.id).label('daily_count')
+    ).filter(
+        Ticket.assigned_at >= start_date,
+        Ticket.assigned_at < end_date
+    ).group_by('assignment_day').order_by('assignment_day').all()
+
+
+def query_rejected_volume(db, start_date: datetime, end_date: datetime):
+    """Tickets rechazados por día."""
+    return db.query(
+        func.date(TicketUpdate.timestamp).label('rejection_day'),
+        func.count(func.distinct(Ticket.id)).label('daily_count')
+    ).join(
+        TicketUpdate, Ticket.id == TicketUpdate.ticket_id
+    ).filter(
+        TicketUpdate.comment.like('Ticket Rechazado. Motivo: %'),
+        TicketUpdate.timestamp >= start_date,
+        TicketUpdate.timestamp < end_date
+    ).group_by('rejection_day').order_by('rejection_day').all()
+
+
+def query_resolved_volume(db, start_date: datetime, end_date: datetime):
+    """Tickets resueltos por día."""
+    return db.query(
+        func.date(Ticket.resolved_at).label('resolution_day'),
+        func.count(Ticket.id).label('daily_count')
+    ).filter(
+        Ticket.status == TicketStatus.RESUELTO,
+        Ticket.resolved_at >= start_date,
+        Ticket.resolved_at < end_date
+    ).group_by('resolution_day').order_by('resolution_day').all()
+
+
+def query_tech_distribution(db, start_date: datetime, end_date: datetime):
+    """Distribución por técnico (categoría/prioridad)."""
+    return db.query(
+        User.username,
+        ProblemType.name.label('problem_name'),
+        Ticket.urgency,
+        func.count(Ticket.id).label('ticket_count')
+    ).join(Ticket, User.id == Ticket.technician_id
+    ).join(ProblemType, Ticket.problem_type_id == ProblemType.id
+    ).filter(
+        Ticket.assigned_at >= start_date,
+        Ticket.assigned_at < end_date,
+        Ticket.technician_id.isnot(None),
+        Ticket.problem_type_id.isnot(None)
+    ).group_by(
+        User.username, ProblemType.name, Ticket.urgency
+    ).order_by(
+        User.username, func.count(Ticket.id).desc()
+    ).all()
+
+
+def query_sla_violations(db, start_date: datetime, end_date: datetime) -> dict[str, int]:
+    """Tickets fuera de SLA por técnico."""
+    rows = db.query(
+        User.username,
+        func.count(Ticket.id).label('violation_count')
+    ).join(Ticket, User.id == Ticket.technician_id
+    ).filter(
+        Ticket.sla_violation_sent == True,
+        Ticket.assigned_at >= start_date,
+        Ticket.assigned_at < end_date
+    ).group_by(User.username).all()
+    return {row.username: row.violation_count for row in rows}
+
+
+# Orden de las consultas; `_build_report` recibe sus resultados en este mismo orden.
+REPORT_QUERIES = [
+    query_resolved_by_technician,
+    query_assigned_by_technician,
+    query_problem_analysis,
+    query_ticket_volume,
+    query_location_analysis,
+    query_location_problem,
+    query_assigned_volume,
+    query_rejected_volume,
+    query_resolved_volume,
+    query_tech_distribution,
+    query_sla_violations,
+]
+
+
+def _daily_counts(rows, row_type) -> list:
+    # `func.date` retorna texto en SQLite y `date` en MariaDB: se usa siempre 'AAAA-MM-DD' para poder
+    # combinar meses leídos de la BD con meses guardados.
+    return [row_type(str(day), count) for day, count in rows]
+
+
+def _build_report(results: list) -> ReportData:
+    resolved, assigned, problem, volume, location, location_problem, assigned_vol, rejected_vol, resolved_vol, *rest = results
+
+    # Combinar datos de tickets resueltos y asignados
+    tech_performance = [
+        {
+            'username': username,
+            'resolved_count': resolved.get(username, 0),
+            'assigned_count': assigned.get(username, 0),
+        }
+        for username in sorted(set(resolved) | set(assigned))
+    ]
+    return ReportData(tech_performance, problem, _daily_counts(volume, CreatedDayCount), location, location_problem,
+                      _daily_counts(assigned_vol, AssignedDayCount), _daily_counts(rejected_vol, RejectedDayCount),
+                      _daily_counts(resolved_vol, ResolvedDayCount), *rest)
+
+
+def load_report_data(start_date: datetime, end_date: datetime) -> ReportData:
+    """Ejecuta las consultas del reporte una tras otra sobre una sola sesión."""
+    db = SessionLocal()
+    try:
+        return _build_report([query(db, start_date, end_date) for query in REPORT_QUERIES])
+    finally:
+        db.close()
+
+
+def _run_query(query, start_date: datetime, end_date: datetime):
+    db = SessionLocal()
+    try:
+        return query(db, start_date, end_date)
+    finally:
+        db.close()
+
+
+async def fetch_report_range(start_date: datetime, end_date: datetime) -> ReportData:
+    """
+    Ejecuta las consultas del reporte en paralelo en un pool de hilos, cada una con su propia sesión.
+    Con un pool de una sola conexión (SQLite en memoria) no hay paralelismo posible y se usa `load_report_data`.
+    """
+    loop = asyncio.get_running_loop()
+    if isinstance(engine.pool, StaticPool):
+        return await loop.run_in_executor(_executor, load_report_data, start_date, end_date)
+
+    results = await asyncio.gather(*(
+        loop.run_in_executor(_executor, _run_query, query, start_date, end_date)
+        for query in REPORT_QUERIES
+    ))
+    return _build_report(list(results))
+
+
+# --- Reportes por mes ---
+# Filas de los resultados combinados; mantienen los nombres de columna de las consultas.
+ProblemCount = namedtuple('ProblemCount', ['name', 'ticket_count'])
+LocationCount = namedtuple('LocationCount', ['description', 'ticket_count'])
+LocationProblemCount = namedtuple('LocationProblemCount', ['location_description', 'problem_type_name', 'ticket_count'])
+TechDistributionCount = namedtuple('TechDistributionCount', ['username', 'problem_name', 'urgency', 'ticket_count'])
+
+
+def _sum_rows(parts: list[list], row_type) -> list:
+    """Suma `ticket_count` de filas con la misma clave (el resto de los campos)."""
+    totals: dict[tuple, int] = {}
+    for rows in parts:
+        for row in rows:
+            key = tuple(row)[:-1]
+            totals[key] = totals.get(key, 0) + row.ticket_count
+    return [row_type(*key, count) for key, count in totals.items()]
+
+
+def merge_reports(parts: list[ReportData]) -> ReportData:
+    """Combina reportes de meses consecutivos en el reporte del rango completo."""
+    resolved: dict[str, int] = {}
+    assigned: dict[str, int] = {}
+    sla_violations: dict[str, int] = {}
+    for part in parts:
+        for row in part.tech_performance:
+            resolved[row['username']] = resolved.get(row['username'], 0) + row['resolved_count']
+            assigned[row['username']] = assigned.get(row['username'], 0) + row['assigned_count']
+        for username, count in part.sla_violations.items():
+            sla_violations[username] = sla_violations.get(username, 0) + count
+
+    # Los volúmenes diarios no se solapan entre meses: basta con concatenarlos en orden.
+    return ReportData(
+        tech_performance=[
+            {'username': username, 'resolved_count': resolved[username], 'assigned_count': assigned[username]}
+            for username in sorted(resolved)
+        ],
+        problem_analysis=sorted(_sum_rows([p.problem_analysis for p in parts], ProblemCount),
+                                key=lambda r: -r.ticket_count),
+        ticket_volume=[row for p in parts for row in p.ticket_volume],
+        location_analysis=sorted(_sum_rows([p.location_analysis for p in parts], LocationCount),
+                                 key=lambda r: -r.ticket_count),
+        location_problem=sorted(_sum_rows([p.location_problem for p in parts], LocationProblemCount),
+                                key=lambda r: (r.location_description or '', -r.ticket_count)),
+        assigned_volume=[row for p in parts for row in p.assigned_volume],
+        rejected_volume=[row for p in parts for row in p.rejected_volume],
+        resolved_volume=[row for p in parts for row in p.resolved_volume],
+        tech_distribution=sorted(_sum_rows([p.tech_distribution for p in parts], TechDistributionCount),
+                                 key=lambda r: (r.username, -r.ticket_count)),
+        sla_violations=sla_violations,
+    )
+
+
+def report_to_dict(report: ReportData) -> dict:
+    """Versión serializable en JSON del reporte (las urgencias se guardan por su valor)."""
+    data = {name: [list(row) for row in rows] if isinstance(rows, list) else rows for name, rows in vars(report).items()}
+    data['tech_performance'] = report.tech_performance
+    data['tech_distribution'] = [[row.username, row.problem_name, row.urgency.value, row.ticket_count]
+                                 for row in report.tech_distribution]
+    return data
+
+
+def report_from_dict(data: dict) -> ReportData:
+    """Reconstruye un reporte guardado con `report_to_dict`."""
+    return ReportData(
+        tech_performance=data['tech_performance'],
+        problem_analysis=[ProblemCount(*row) for row in data['problem_analysis']],
+        ticket_volume=[CreatedDayCount(*row) for row in data['ticket_volume']],
+        location_analysis=[LocationCount(*row) for row in data['location_analysis']],
+        location_problem=[LocationProblemCount(*row) for row in data['location_problem']],
+        assigned_volume=[AssignedDayCount(*row) for row in data['assigned_volume']],
+        rejected_volume=[RejectedDayCount(*row) for row in data['rejected_volume']],
+        resolved_volume=[ResolvedDayCount(*row) for row in data['resolved_volume']],
+        tech_distribution=[TechDistributionCount(username, problem, TicketUrgency(urgency), count)
+                           for username, problem, urgency, count in data['tech_distribution']],
+        sla_violations=data['sla_violations'],
+    )
+
+
+def _load_month(year: int, month: int) -> ReportData:
+    return load_report_data(*period_bounds(year, month))
+
+
+# Las métricas dependen de las fechas de creación, asignación y resolución. El TTL es 0: el mes en curso
+# nunca se reutiliza, y los meses cerrados se conservan hasta que se invaliden.
+report_month_cache = period_cache.register(
+    period_cache.PeriodCache(_load_month, 0, date_fields=('created_at', 'assigned_at', 'resolved_at'))
+)
+
+
+def _months_in_range(start_date: datetime, end_date: datetime) -> list[tuple[int, int]] | None:
+    """Meses que cubren exactamente [start_date, end_date), o `None` si el rango no empieza y termina en un mes."""
+    months = []
+    year, month = start_date.year, start_date.month
+    if start_date != datetime(year, month, 1):
+        return None
+    while datetime(year, month, 1) < end_date:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    if datetime(year, month, 1) != end_date:
+        return None
+    return months
+
+
+async def fetch_report_data(start_date: datetime, end_date: datetime) -> ReportData:
+    """Reporte del rango usando los agregados mensuales guardados y consultando solo los meses que faltan."""
+    months = _months_in_range(start_date, end_date)
+    if months is None:
+        return await fetch_report_range(start_date, end_date)
+
+    parts = []
+    for year, month in months:
+        part = report_month_cache.lookup(year, month)
+        if part is None:
+            part = await fetch_report_range(*period_bounds(year, month))
+            report_month_cache.store(year, month, part)
+        parts.append(part)
+    return parts[0] if len(parts) == 1 else merge_reports(parts)
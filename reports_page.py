@@ -1,19 +1,20 @@
 from nicegui import app, ui
-from sqlalchemy import func
-from datetime import datetime, timedelta, timezone
+import asyncio
+from datetime import datetime, timedelta
 
-from database import SessionLocal
-from models import Ticket, User, ProblemType, UserRole, TicketStatus, Location, TicketUpdate, TicketUrgency
+from models import UserRole, TicketUrgency
 from main_layout import create_main_layout
-from export_excel import generate_excel_report
-
-def get_available_years():
-    db = SessionLocal()
-    try:
-        years_query = db.query(func.extract('year', Ticket.created_at)).distinct().order_by(func.extract('year', Ticket.created_at).desc()).all()
-        return [year[0] for year in years_query if year[0] is not None]
-    finally:
-        db.close()
+from export_excel import write_excel_report, excel_report_data
+from export_raw import RAW_EXPORT_FORMATS, write_raw_ticket_export
+from file_downloads import new_temp_path, register_download, remove_temp_file
+from ticket_utils import get_available_years
+from report_queries import ReportData, fetch_report_data
+from monthly_reports import stored_months, load_stored_workbook
+from datetime_utils import period_bounds
+import analytics
+import session_user
+
+XLSX_MEDIA_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
 
 class ReportPage:
     def __init__(self):
@@ -29,166 +30,17 @@ class ReportPage:
         self.year_to_selector = None
         self.month_to_selector = None
         self.reports_container = None
+        self.period = None
+        self.adhoc_container = None
+        self.adhoc_rows_selector = None
+        self.adhoc_columns_selector = None
+        self.adhoc_date_selector = None
+        self.raw_format_selector = None
+
+    async def get_report_data(self, start_date: datetime, end_date: datetime) -> ReportData:
+        return await fetch_report_data(start_date, end_date)
 
-    def get_report_data(self, start_date: datetime, end_date: datetime):
-        db = SessionLocal()
-        try: # Tickets resueltos en el período
-            resolved_query = db.query(
-                User.username,
-                func.count(Ticket.id).label('resolved_count')
-            ).join(Ticket, User.id == Ticket.technician_id).filter(
-                Ticket.status == TicketStatus.RESUELTO,
-                Ticket.resolved_at.isnot(None),
-                Ticket.assigned_at.isnot(None),
-                Ticket.resolved_at >= start_date,
-                Ticket.resolved_at < end_date
-            ).group_by(User.username)
-            resolved_data = {row.username: row for row in resolved_query.all()}
-
-            # Tickets asignados en el período
-            assigned_query = db.query(
-                User.username,
-                func.count(Ticket.id).label('assigned_count')
-            ).join(Ticket, User.id == Ticket.technician_id).filter(
-                Ticket.assigned_at.isnot(None),
-                Ticket.assigned_at >= start_date,
-                Ticket.assigned_at < end_date
-            ).group_by(User.username)
-            assigned_data = {row.username: row for row in assigned_query.all()}
-
-            # Combinar datos de tickets resueltos y asignados
-            all_techs = sorted(list(set(resolved_data.keys()) | set(assigned_data.keys())))
-            tech_performance = []
-            for tech_username in all_techs:
-                resolved_info = resolved_data.get(tech_username)
-                assigned_info = assigned_data.get(tech_username)
-                
-                tech_performance.append({
-                    'username': tech_username,
-                    'resolved_count': resolved_info.resolved_count if resolved_info else 0,
-                    'assigned_count': assigned_info.assigned_count if assigned_info else 0,
-                })
-
-            # Análisis de problemas (basado en la fecha de creación)
-            problem_query = db.query(
-                ProblemType.name,
-                func.count(Ticket.id).label('ticket_count')
-            ).join(ProblemType, Ticket.problem_type_id == ProblemType.id).filter(
-                Ticket.created_at >= start_date,
-                Ticket.created_at < end_date
-            )
-            problem_analysis = problem_query.group_by(ProblemType.name).order_by(func.count(Ticket.id).desc()).all()
-
-            # Volumen de tickets (basado en la fecha de creación)
-            volume_query = db.query(
-                func.date(Ticket.created_at).label('creation_day'),
-                func.count(Ticket.id).label('daily_count')
-            ).filter(
-                Ticket.created_at >= start_date,
-                Ticket.created_at < end_date
-            )
-            ticket_volume = volume_query.group_by('creation_day').order_by('creation_day').all()
-
-            # Tickets por ubicación (basado en la fecha de creación)
-            location_query = db.query(
-                Location.description,
-                func.count(Ticket.id).label('ticket_count')
-            ).join(Ticket, Location.id == Ticket.location_id).filter(
-                Ticket.created_at >= start_date,
-                Ticket.created_at < end_date
-            ).group_by(Location.description).order_by(func.count(Ticket.id).desc())
-            location_analysis = location_query.all()
-
-            # Resumen por Ubicación y Tipo de Problema
-            location_problem_query = db.query(
-                Location.description.label('location_description'),
-                ProblemType.name.label('problem_type_name'),
-                func.count(Ticket.id).label('ticket_count')
-            ).join(Ticket, Location.id == Ticket.location_id
-            ).join(ProblemType, Ticket.problem_type_id == ProblemType.id
-            ).filter(
-                Ticket.created_at >= start_date,
-                Ticket.created_at < end_date,
-                Ticket.location_id.isnot(None),
-                Ticket.problem_type_id.isnot(None)
-            ).group_by(
-                Location.description, ProblemType.name
-            ).order_by(
-                Location.description, func.count(Ticket.id).desc()
-            )
-            location_problem_data = location_problem_query.all()
-
-            # Tickets Asignados por día
-            assigned_volume_query = db.query(
-                func.date(Ticket.assigned_at).label('assignment_day'),
-                func.count(Ticket.id).label('daily_count')
-            ).filter(
-                Ticket.assigned_at >= start_date,
-                Ticket.assigned_at < end_date
-            ).group_by('assignment_day').order_by('assignment_day')
-            assigned_volume = assigned_volume_query.all()
-
-            # Tickets Rechazados por día
-            rejected_volume_query = db.query(
-                func.date(TicketUpdate.timestamp).label('rejection_day'),
-                func.count(func.distinct(Ticket.id)).label('daily_count')
-            ).join(
-                TicketUpdate, Ticket.id == TicketUpdate.ticket_id
-            ).filter(
-                TicketUpdate.comment.like('Ticket Rechazado. Motivo: %'),
-                TicketUpdate.timestamp >= start_date,
-                TicketUpdate.timestamp < end_date
-            ).group_by('rejection_day').order_by('rejection_day')
-            rejected_volume = rejected_volume_query.all()
-
-            # Tickets Resueltos por día
-            resolved_volume_query = db.query(
-                func.date(Ticket.resolved_at).label('resolution_day'),
-                func.count(Ticket.id).label('daily_count')
-            ).filter(
-                Ticket.status == TicketStatus.RESUELTO,
-                Ticket.resolved_at >= start_date,
-                Ticket.resolved_at < end_date
-            ).group_by('resolution_day').order_by('resolution_day')
-            resolved_volume = resolved_volume_query.all()
-
-            # Nueva métrica: Distribución por técnico (categoría/prioridad)
-            tech_distribution_query = db.query(
-                User.username,
-                ProblemType.name.label('problem_name'),
-                Ticket.urgency,
-                func.count(Ticket.id).label('ticket_count')
-            ).join(Ticket, User.id == Ticket.technician_id
-            ).join(ProblemType, Ticket.problem_type_id == ProblemType.id
-            ).filter(
-                Ticket.assigned_at >= start_date,
-                Ticket.assigned_at < end_date,
-                Ticket.technician_id.isnot(None),
-                Ticket.problem_type_id.isnot(None)
-            ).group_by(
-                User.username, ProblemType.name, Ticket.urgency
-            ).order_by(
-                User.username, func.count(Ticket.id).desc()
-            )
-            tech_distribution_data = tech_distribution_query.all()
-
-            # Nueva métrica: Tiempos fuera de SLA por técnico
-            sla_violations_query = db.query(
-                User.username,
-                func.count(Ticket.id).label('violation_count')
-            ).join(Ticket, User.id == Ticket.technician_id
-            ).filter(
-                Ticket.sla_violation_sent == True,
-                Ticket.assigned_at >= start_date,
-                Ticket.assigned_at < end_date
-            ).group_by(User.username)
-            sla_violations_data = {row.username: row.violation_count for row in sla_violations_query.all()}
-
-            return tech_performance, problem_analysis, ticket_volume, location_analysis, location_problem_data, assigned_volume, rejected_volume, resolved_volume, tech_distribution_data, sla_violations_data
-        finally:
-            db.close()
-
-    def update_reports(self):
+    async def update_reports(self):
         self.reports_container.clear()
 
         from_year = self.year_from_selector.value
@@ -212,27 +64,22 @@ class ReportPage:
             ui.notify('Por favor, seleccione valores válidos para las fechas.', color='warning')
             return
 
-        tech_data, problem_data, volume_data, location_data, location_problem_data, assigned_data, rejected_data, resolved_vol_data, tech_distribution_data, sla_violations_data = self.get_report_data(start_date, end_date)
-
-        self.report_data['tech'] = tech_data
-        self.report_data['problem'] = problem_data
-        self.report_data['volume'] = volume_data
-        self.report_data['location'] = location_data
-        self.report_data['location_problem'] = location_problem_data
-        self.report_data['assigned'] = assigned_data
-        self.report_data['rejected'] = rejected_data
-        self.report_data['resolved_vol'] = resolved_vol_data
+        with self.reports_container:
+            ui.spinner(size='lg').classes('self-center')
+        data = await self.get_report_data(start_date, end_date)
+        self.reports_container.clear()
 
-        # Procesar y almacenar datos para las nuevas métricas
-        from collections import defaultdict
-        tech_dist_grouped = defaultdict(list)
-        for row in tech_distribution_data:
-            tech_dist_grouped[row.username].append(row)
-        self.report_data['tech_distribution'] = tech_dist_grouped
-        self.report_data['tech_sla_violations'] = sla_violations_data
+        tech_data = data.tech_performance
+        problem_data = data.problem_analysis
+        volume_data = data.ticket_volume
+        location_data = data.location_analysis
+        location_problem_data = data.location_problem
+        assigned_data = data.assigned_volume
+        rejected_data = data.rejected_volume
+        resolved_vol_data = data.resolved_volume
 
-        self.report_data['start_date'] = start_date.strftime('%Y-%m-%d')
-        self.report_data['end_date'] = (end_date - timedelta(days=1)).strftime('%Y-%m-%d')
+        self.report_data.update(excel_report_data(data, start_date, end_date))
+        self.period = (start_date, end_date)
 
         with self.reports_container:
             with ui.card().classes('w-full rounded-xl shadow-md p-6'):
@@ -445,8 +292,51 @@ class ReportPage:
                 else:
                     ui.label("No hay datos de volumen de tickets en este período.").classes('text-gray-500')
 
+        await self.update_adhoc()
+
+    async def update_adhoc(self):
+        """Tabla de análisis ad-hoc: conteo de tickets del período por una o dos dimensiones, desde el cubo analítico."""
+        if not self.period or not self.adhoc_container:
+            return
+        rows_dim = self.adhoc_rows_selector.value
+        columns_dim = self.adhoc_columns_selector.value or None
+        date_field = self.adhoc_date_selector.value
+        choices = analytics.dimension_choices()
+
+        cube = await analytics.get_cube()
+        selected = cube.mask(date_field, *self.period)
+
+        self.adhoc_container.clear()
+        if columns_dim and columns_dim != rows_dim:
+            counts = {(row_label, column_label): count for row_label, column_label, count in cube.group_by([rows_dim, columns_dim], selected)}
+            row_labels = list(dict.fromkeys(label for label, _ in counts))
+            column_labels = sorted({label for _, label in counts}, key=str)
+            headers = [choices[rows_dim]] + column_labels + ['Total']
+            table_rows = [
+                [row_label] + [counts.get((row_label, c), 0) for c in column_labels] + [sum(counts.get((row_label, c), 0) for c in column_labels)]
+                for row_label in row_labels
+            ]
+            title = f"{choices[rows_dim]} × {choices[columns_dim]}"
+        else:
+            headers = [choices[rows_dim], 'Cantidad']
+            table_rows = [list(row) for row in cube.group_by([rows_dim], selected)]
+            title = choices[rows_dim]
+
+        self.report_data['adhoc'] = {'title': f"{title} (fecha de {analytics.DATE_FIELDS[date_field].lower()})", 'columns': headers, 'rows': table_rows}
+
+        with self.adhoc_container:
+            if table_rows:
+                ui.table(
+                    columns=[{'name': f'c{i}', 'label': header, 'field': f'c{i}', 'align': 'left' if i == 0 else 'right', 'sortable': True}
+                             for i, header in enumerate(headers)],
+                    rows=[{f'c{i}': value for i, value in enumerate(row)} for row in table_rows],
+                    pagination=20,
+                ).classes('w-full')
+            else:
+                ui.label("No hay tickets para esta combinación en el período seleccionado.").classes('text-gray-500')
+
     def create(self):
-        if not app.storage.user.get('authenticated', False) or app.storage.user.get('role') not in [UserRole.ADMINISTRADOR.value, UserRole.SUPERVISOR.value, UserRole.MONITOR.value]:
+        if not session_user.has_role(UserRole.ADMINISTRADOR.value, UserRole.SUPERVISOR.value, UserRole.MONITOR.value):
             return ui.navigate.to('/')
 
         create_main_layout()
@@ -481,19 +371,90 @@ class ReportPage:
                     with ui.row().classes('items-center gap-2 self-center'):
                         ui.button('Actualizar', on_click=self.update_reports).props('color=primary')
                         
-                        def handle_export():
+                        async def handle_export():
                             if not self.report_data.get('tech'):
                                 ui.notify("No hay datos para exportar. Por favor, genere un reporte primero.", color='warning')
                                 return
-                            file_content = generate_excel_report(self.report_data)
+                            # El libro se escribe en un archivo temporal fuera del event loop y se descarga por partes.
+                            path = new_temp_path('.xlsx')
+                            try:
+                                await asyncio.get_running_loop().run_in_executor(None, write_excel_report, dict(self.report_data), path)
+                            except Exception as e:
+                                remove_temp_file(path)
+                                ui.notify(f"Error al exportar el reporte: {e}", color='negative')
+                                return
                             filename = f"Reporte_HelpdeskOI_{self.report_data['start_date']}_a_{self.report_data['end_date']}.xlsx"
-                            ui.download(file_content, filename)
+                            ui.download.from_url(register_download(path, filename, XLSX_MEDIA_TYPE), filename)
 
                         ui.button('Exportar a Excel', on_click=handle_export, icon='file_download').props('color=positive outline')
 
+                        async def handle_raw_export():
+                            if not self.period:
+                                ui.notify("Genere un reporte primero para elegir el período.", color='warning')
+                                return
+                            start_date, end_date = self.period
+                            export_format = self.raw_format_selector.value
+                            _, suffix, media_type = RAW_EXPORT_FORMATS[export_format]
+                            # Los tickets se leen y escriben por bloques en un archivo temporal, fuera del event loop.
+                            path = new_temp_path(suffix)
+                            try:
+                                count = await asyncio.get_running_loop().run_in_executor(
+                                    None, write_raw_ticket_export, start_date, end_date, export_format, path)
+                            except RuntimeError as e:
+                                # Formato no disponible (p. ej. Parquet sin pyarrow instalado).
+                                remove_temp_file(path)
+                                ui.notify(str(e), color='negative')
+                                return
+                            except Exception as e:
+                                remove_temp_file(path)
+                                ui.notify(f"Error al exportar los tickets: {e}", color='negative')
+                                return
+                            filename = f"Tickets_HelpdeskOI_{self.report_data['start_date']}_a_{self.report_data['end_date']}{suffix}"
+                            ui.download.from_url(register_download(path, filename, media_type), filename)
+                            ui.notify(f"{count} tickets exportados.", color='positive')
+
+                        self.raw_format_selector = ui.select({key: label for key, (label, _, _) in RAW_EXPORT_FORMATS.items()},
+                                                             label="Formato", value='csv').props('filled dense bg-white min-w-[140px]')
+                        ui.button('Exportar tickets', on_click=handle_raw_export, icon='table_view').props('color=positive outline')
+
+                # Reportes de meses cerrados ya armados por la tarea de fondo (ver monthly_reports.py).
+                stored = stored_months()
+                if stored:
+                    with ui.row().classes('w-full items-center px-4 pb-4 gap-2'):
+                        ui.label("Reportes mensuales:").classes('font-semibold')
+                        stored_selector = ui.select({f'{y}-{m:02d}': f'{months[m]} {y}' for y, m in stored},
+                                                    label="Mes cerrado", value=f'{stored[0][0]}-{stored[0][1]:02d}').props('filled dense bg-white min-w-[180px]')
+
+                        async def handle_stored_download():
+                            year, month = map(int, stored_selector.value.split('-'))
+                            workbook = await asyncio.get_running_loop().run_in_executor(None, load_stored_workbook, year, month)
+                            if workbook is None:
+                                ui.notify("El reporte de ese mes se está actualizando. Intente en unos minutos o use 'Exportar a Excel'.", color='warning')
+                                return
+                            path = new_temp_path('.xlsx')
+                            with open(path, 'wb') as f:
+                                f.write(workbook)
+                            start_date, end_date = period_bounds(year, month)
+                            filename = f"Reporte_HelpdeskOI_{start_date:%Y-%m-%d}_a_{end_date - timedelta(days=1):%Y-%m-%d}.xlsx"
+                            ui.download.from_url(register_download(path, filename, XLSX_MEDIA_TYPE), filename)
+
+                        ui.button('Descargar', on_click=handle_stored_download, icon='file_download').props('color=positive outline')
+
             self.reports_container = ui.column().classes('w-full gap-6')
+
+            with ui.card().classes('w-full rounded-xl shadow-md p-6'):
+                ui.label("Análisis Ad-hoc").classes('text-xl font-semibold text-gray-700')
+                choices = analytics.dimension_choices()
+                with ui.row().classes('items-center gap-4 mt-2'):
+                    self.adhoc_rows_selector = ui.select(choices, label="Agrupar por", value='location').props('filled dense bg-white min-w-[200px]')
+                    self.adhoc_columns_selector = ui.select({'': '(ninguna)', **choices}, label="y por", value='urgency').props('filled dense bg-white min-w-[200px]')
+                    self.adhoc_date_selector = ui.select(analytics.DATE_FIELDS, label="Período según", value='created_at').props('filled dense bg-white min-w-[160px]')
+                    for selector in (self.adhoc_rows_selector, self.adhoc_columns_selector, self.adhoc_date_selector):
+                        selector.on('update:model-value', self.update_adhoc)
+                self.adhoc_container = ui.column().classes('w-full mt-4')
             
-            self.update_reports()
+            # Las consultas corren fuera del event loop; el reporte inicial se carga en cuanto la página está lista.
+            ui.timer(0, self.update_reports, once=True)
 
 @ui.page('/reports')
 def reports_page():
@@ -0,0 +1,181 @@
+# --- Planificador de tareas de fondo ---
+# Cada tarea se ejecuta a frecuencia fija: la siguiente ejecución se programa a partir del inicio de la anterior,
+# no de su final, así el horario no se corre con la duración de cada ejecución. Una ejecución nunca se superpone
+# con la anterior de la misma tarea: si tardó más que el intervalo, los turnos vencidos se omiten en lugar de
+# encadenar ejecuciones. A cada espera se le suma un retraso aleatorio (jitter) para que varios procesos
+# iniciados a la vez no consulten la BD, el IMAP o el SMTP en el mismo instante.
+#
+# Con varios procesos de la aplicación, las tareas `singleton` (lector de correo, SLA, armado de reportes) solo
+# las ejecuta el proceso que tiene el turno de esa tarea en la tabla `scheduler_leases`. El turno se toma con un
+# UPDATE condicionado (libre, vencido o ya propio) o, si la fila no existe, con un INSERT que falla si otro
+# proceso lo insertó antes; dura un intervalo más `SCHEDULER_LEASE_GRACE_SECONDS`, se renueva al comenzar cada
+# ejecución y durante las ejecuciones largas, y se libera al cerrar la aplicación. Si el proceso que lo tiene
+# muere, otro lo toma cuando vence. Los vencimientos usan el reloj de cada servidor: deben estar sincronizados.
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal
+from models import SchedulerLease
+import metrics
+import query_stats
+
+logger = logging.getLogger(__name__)
+
+# Máximo retraso aleatorio (segundos) que se agrega a cada espera; nunca supera el 10% del intervalo.
+SCHEDULER_MAX_JITTER_SECONDS = float(os.environ.get("SCHEDULER_MAX_JITTER_SECONDS", 30))
+# Segundos que el turno de una tarea dura más allá de su intervalo. Debe superar el jitter para que el proceso
+# que tiene el turno alcance a renovarlo antes de que venza.
+SCHEDULER_LEASE_GRACE_SECONDS = float(os.environ.get("SCHEDULER_LEASE_GRACE_SECONDS", 120))
+
+# Identifica a este proceso en `scheduler_leases`; la parte aleatoria distingue procesos con el mismo PID.
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_tasks: set[asyncio.Task] = set()
+_held_leases: set[str] = set()
+
+metrics.Gauge('helpdeskoi_scheduler_leases_held', 'Turnos de tareas de fondo que tiene este proceso.',
+              lambda: len(_held_leases))
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def acquire_lease(name: str, seconds: float) -> bool:
+    """Toma o renueva el turno de la tarea `name` por `seconds` segundos. Retorna `False` si lo tiene otro proceso."""
+    now = _utc_now()
+    expires_at = now + timedelta(seconds=seconds)
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name,
+                   or_(SchedulerLease.owner == INSTANCE_ID, SchedulerLease.expires_at < now))
+            .values(owner=INSTANCE_ID, expires_at=expires_at)
+        )
+        if result.rowcount == 0:
+            try:
+                db.execute(insert(SchedulerLease).values(name=name, owner=INSTANCE_ID, expires_at=expires_at))
+            except IntegrityError:
+                # La fila existe y su turno es de otro proceso (o la acaba de insertar otro).
+                db.rollback()
+                _held_leases.discard(name)
+                return False
+        db.commit()
+    finally:
+        db.close()
+    _held_leases.add(name)
+    return True
+
+
+def release_leases():
+    """Libera los turnos de este proceso para que otro los tome sin esperar a que venzan."""
+    if not _held_leases:
+        return
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.owner == INSTANCE_ID)
+            .values(expires_at=_utc_now())
+        )
+        db.commit()
+    finally:
+        db.close()
+    _held_leases.clear()
+
+
+def _jitter(interval: float) -> float:
+    return random.uniform(0, min(SCHEDULER_MAX_JITTER_SECONDS, interval * 0.1))
+
+
+async def _keep_lease(name: str, seconds: float):
+    """Renueva el turno mientras dura una ejecución más larga que el margen del turno."""
+    while True:
+        await asyncio.sleep(SCHEDULER_LEASE_GRACE_SECONDS / 2)
+        try:
+            renewed = acquire_lease(name, seconds)
+        except Exception as e:
+            logger.error(f"No se pudo renovar el turno de '{name}': {e}")
+            continue
+        if not renewed:
+            logger.warning(f"Otro proceso tomó el turno de '{name}' mientras se ejecutaba.")
+            return
+
+
+async def _run_once(name: str, task_function, lease_seconds: float | None):
+    loop = asyncio.get_running_loop()
+    keeper = asyncio.create_task(_keep_lease(name, lease_seconds)) if lease_seconds else None
+    start = loop.time()
+    try:
+        with query_stats.track(f"tarea {name}"):
+            await task_function()
+    except Exception as e:
+        metrics.TASK_FAILURES.inc(task=name)
+        print(f"Error en tarea de fondo '{name}': {e}")
+    finally:
+        if keeper is not None:
+            keeper.cancel()
+        metrics.TASK_DURATION.observe(loop.time() - start, task=name)
+
+
+async def run_periodically(interval: float, task_function, singleton: bool = True):
+    """
+    Ejecuta `task_function` cada `interval` segundos, la primera vez de inmediato. Con `singleton` solo se
+    ejecuta si este proceso tiene el turno de la tarea.
+    """
+    name = task_function.__name__
+    lease_seconds = interval + SCHEDULER_LEASE_GRACE_SECONDS if singleton else None
+    loop = asyncio.get_running_loop()
+    next_run = loop.time()
+    target = next_run
+    while True:
+        await asyncio.sleep(max(0.0, target - loop.time()))
+        start = loop.time()
+        # El retraso es cuánto después de lo programado arrancó la ejecución (p. ej. por el event loop ocupado).
+        metrics.TASK_LAG.observe(max(0.0, start - target), task=name)
+
+        try:
+            run = not singleton or acquire_lease(name, lease_seconds)
+        except Exception as e:
+            # Sin acceso a la BD no se puede saber si otro proceso tiene el turno: se omite esta ejecución.
+            logger.error(f"No se pudo tomar el turno de '{name}': {e}")
+            run = False
+        if run:
+            await _run_once(name, task_function, lease_seconds)
+        else:
+            metrics.TASK_SKIPPED.inc(task=name)
+
+        next_run += interval
+        now = loop.time()
+        if next_run <= now:
+            missed = int((now - next_run) // interval) + 1
+            logger.warning(f"La tarea '{name}' tardó más que su intervalo; se omiten {missed} ejecución(es).")
+            next_run += missed * interval
+        target = next_run + _jitter(interval)
+
+
+def start(interval: float, task_function, singleton: bool = True):
+    """Programa `task_function` como tarea de fondo de este proceso (ver `run_periodically`)."""
+    task = asyncio.create_task(run_periodically(interval, task_function, singleton))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+def stop():
+    """Cancela las tareas programadas y libera los turnos de este proceso."""
+    for task in list(_tasks):
+        task.cancel()
+    try:
+        release_leases()
+    except Exception as e:
+        logger.error(f"No se pudieron liberar los turnos de las tareas de fondo: {e}")
@@ -5,6 +5,7 @@ from sqlalchemy import or_, func
 from sqlalchemy.orm import joinedload
 from datetime import datetime
 from datetime_utils import to_local_time, format_utc_time
+import session_user
 
 def search_page():
     with ui.column().classes('w-full items-center'):
@@ -42,67 +43,74 @@ def search_page():
             results_table.update()
             return
 
-        db = SessionLocal()
         try:
-            role = app.storage.user.get('role')
-            user_id = app.storage.user.get('id')
+            principal = session_user.current_user()
+            results_table.rows = search_ticket_rows(term, principal.role, principal.id)
+            results_table.update()
+            if not results_table.rows:
+                ui.notify('No se encontraron entradas que coincidan con tu búsqueda.', color='info')
 
-            # Construir la base de la consulta
-            query = db.query(Ticket).options(
-                joinedload(Ticket.creator),
-                joinedload(Ticket.technician),
-                joinedload(Ticket.problem_type)
-            )
+        except Exception as e:
+            ui.notify(f'Error durante la búsqueda: {e}', color='negative')
 
-            # Aplicar filtro de visibilidad por rol
-            if role == UserRole.TECNICO.value:
-                query = query.filter(Ticket.technician_id == user_id)
-            elif role == UserRole.AUTOSERVICIO.value:
-                query = query.filter(Ticket.creator_id == user_id)
+    search_term_input.on('keydown.enter', perform_search)
+    search_button.on('click', perform_search)
 
-            # Construir las condiciones de búsqueda
-            search_conditions = [
-                Ticket.title.ilike(f'%{term}%'),
-                Ticket.description.ilike(f'%{term}%')
-            ]
 
-            # Añadir búsqueda por estado (status)
-            status_values = {s.value.lower(): s for s in TicketStatus}
-            if term.lower() in status_values:
-                search_conditions.append(Ticket.status == status_values[term.lower()])
+def search_ticket_rows(term: str, role: str | None, user_id: int | None) -> list[dict]:
+    """
+    Filas de la tabla de resultados para `term`: coincidencias en el título o la descripción, el estado,
+    el ID o la fecha de creación (AAAA-MM-DD), limitadas a los tickets que el rol puede ver.
+    """
+    db = SessionLocal()
+    try:
+        # Construir la base de la consulta
+        query = db.query(Ticket).options(
+            joinedload(Ticket.creator),
+            joinedload(Ticket.technician),
+            joinedload(Ticket.problem_type)
+        )
 
-            try:
-                ticket_id = int(term)
-                search_conditions.append(Ticket.id == ticket_id)
-            except ValueError:
-                # Si no es un ID, intentar interpretar como fecha
-                try:
-                    search_date = datetime.strptime(term, '%Y-%m-%d').date()
-                    search_conditions.append(func.date(Ticket.created_at) == search_date)
-                except ValueError:
-                    pass # No es un ID ni una fecha válida, se buscará solo en texto.
+        # Aplicar filtro de visibilidad por rol
+        if role == UserRole.TECNICO.value:
+            query = query.filter(Ticket.technician_id == user_id)
+        elif role == UserRole.AUTOSERVICIO.value:
+            query = query.filter(Ticket.creator_id == user_id)
 
-            # Aplicar todas las condiciones con OR y ordenar
-            tickets = query.filter(or_(*search_conditions)).order_by(Ticket.created_at.desc()).all()
+        # Construir las condiciones de búsqueda
+        search_conditions = [
+            Ticket.title.ilike(f'%{term}%'),
+            Ticket.description.ilike(f'%{term}%')
+        ]
 
-            results_table.rows = [{
-                'id': t.id,
-                'title': t.title,
-                'description': t.description,
-                'status': t.status.value,
-                'urgency': t.urgency.value if t.urgency else 'Unclassified',
-                'creator_name': t.creator.username if t.creator else 'N/A',
-                'technician_name': t.technician.username if t.technician else 'Unassigned',
-                'created_at': to_local_time(t.created_at),
-            } for t in tickets]
-            results_table.update()
-            if not tickets:
-                ui.notify('No se encontraron entradas que coincidan con tu búsqueda.', color='info')
+        # Añadir búsqueda por estado (status)
+        status_values = {s.value.lower(): s for s in TicketStatus}
+        if term.lower() in status_values:
+            search_conditions.append(Ticket.status == status_values[term.lower()])
 
-        except Exception as e:
-            ui.notify(f'Error durante la búsqueda: {e}', color='negative')
-        finally:
-            db.close()
+        try:
+            ticket_id = int(term)
+            search_conditions.append(Ticket.id == ticket_id)
+        except ValueError:
+            # Si no es un ID, intentar interpretar como fecha
+            try:
+                search_date = datetime.strptime(term, '%Y-%m-%d').date()
+                search_conditions.append(func.date(Ticket.created_at) == search_date)
+            except ValueError:
+                pass # No es un ID ni una fecha válida, se buscará solo en texto.
 
-    search_term_input.on('keydown.enter', perform_search)
-    search_button.on('click', perform_search)
+        # Aplicar todas las condiciones con OR y ordenar
+        tickets = query.filter(or_(*search_conditions)).order_by(Ticket.created_at.desc()).all()
+
+        return [{
+            'id': t.id,
+            'title': t.title,
+            'description': t.description,
+            'status': t.status.value,
+            'urgency': t.urgency.value if t.urgency else 'Unclassified',
+            'creator_name': t.creator.username if t.creator else 'N/A',
+            'technician_name': t.technician.username if t.technician else 'Unassigned',
+            'created_at': to_local_time(t.created_at),
+        } for t in tickets]
+    finally:
+        db.close()
@@ -0,0 +1,62 @@
+# --- Usuario de la sesión ---
+# Los datos del usuario autenticado (id, rol, correo y ubicación) se cargan una sola vez al iniciar sesión y se
+# guardan en memoria por id, en lugar de buscar al usuario en la BD en cada acción. `app.storage.user` solo
+# guarda lo necesario para identificar la sesión; cuando /admin/users modifica un usuario, `refresh` lo recarga.
+# Los permisos se verifican siempre con `current_user`/`has_role`, no con el rol guardado en la sesión al iniciarla,
+# así un cambio de rol rige sin cerrar sesión.
+from collections import namedtuple
+
+from nicegui import app
+
+from database import SessionLocal
+from models import User
+
+# `role` es el valor del enum (el mismo que se guarda en `app.storage.user`) para compararlo con `UserRole.X.value`.
+Principal = namedtuple('Principal', ['id', 'username', 'role', 'email', 'location_id', 'is_active'])
+
+_principals: dict[int, Principal] = {}
+
+
+def _from_user(user: User) -> Principal:
+    return Principal(user.id, user.username, user.role.value, user.email, user.location_id, bool(user.is_active))
+
+
+def login(user: User) -> Principal:
+    """Registra al usuario autenticado en la sesión actual y en la caché."""
+    principal = _principals[user.id] = _from_user(user)
+    app.storage.user.update({'id': user.id, 'username': user.username, 'authenticated': True, 'role': principal.role})
+    return principal
+
+
+def refresh(user_id: int) -> Principal | None:
+    """Vuelve a cargar un usuario desde la BD (p. ej. después de editarlo). Retorna `None` si no existe."""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == user_id).first()
+    finally:
+        db.close()
+    if not user:
+        _principals.pop(user_id, None)
+        return None
+    principal = _principals[user_id] = _from_user(user)
+    return principal
+
+
+def get(user_id: int) -> Principal | None:
+    """Datos del usuario desde la caché; si no están (p. ej. tras reiniciar el servidor) se cargan de la BD."""
+    principal = _principals.get(user_id)
+    return principal if principal is not None else refresh(user_id)
+
+
+def current_user() -> Principal | None:
+    """Usuario autenticado de la sesión actual, o `None` si no hay sesión."""
+    if not app.storage.user.get('authenticated', False):
+        return None
+    user_id = app.storage.user.get('id')
+    return get(user_id) if user_id is not None else None
+
+
+def has_role(*roles: str) -> bool:
+    """Indica si el usuario de la sesión tiene alguno de `roles` (valores de `UserRole`) según sus datos actuales."""
+    principal = current_user()
+    return principal is not None and principal.role in roles
@@ -4,6 +4,8 @@ import asyncio
 from database import SessionLocal
 from models import Ticket, SLA, TicketStatus, UserRole, User
 import notification_manager
+import ticket_events
+import metrics
 import logging
 
 # --- Configuración de Logging ---
@@ -13,6 +15,9 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger(__name__)
+
+TICKETS_SCANNED = metrics.Counter('helpdeskoi_sla_tickets_scanned_total', 'Tickets activos revisados por el verificador de SLA.')
+SLA_NOTIFICATIONS = metrics.Counter('helpdeskoi_sla_notifications_total', 'Avisos de SLA generados, por tipo.', labels=('event',))
 # Umbrales de advertencia en minutos
 WARNING_THRESHOLDS_MINUTES = [30, 15, 5]
 
@@ -41,9 +46,12 @@ async def check_sla_warnings():
         ).all()
 
         logger.info(f"Verificando {len(active_tickets)} tickets activos...")
+        TICKETS_SCANNED.inc(len(active_tickets))
 
         # Roles a notificar siempre
         base_notification_roles = [UserRole.SUPERVISOR, UserRole.MONITOR]
+        # Tickets marcados como fuera de SLA; el cambio afecta a los reportes de su período.
+        violated_tickets = []
         
         for ticket in active_tickets:
             if not ticket.urgency or ticket.urgency not in slas:
@@ -77,8 +85,10 @@ async def check_sla_warnings():
                         recipients.append(ticket.technician)
 
                     notification_manager.notify_sla_event(ticket, "VIOLACIÓN", sla_type, time_info, list(set(recipients)))
+                    SLA_NOTIFICATIONS.inc(event='violacion')
                     ticket.sla_violation_sent = True
                     db.add(ticket)
+                    violated_tickets.append((ticket.id, ticket_events.snapshot(ticket)))
                 continue # No enviar advertencias si ya está violado
 
             # --- Lógica de Advertencias por Vencimiento ---
@@ -101,10 +111,12 @@ async def check_sla_warnings():
                     recipients.append(ticket.technician)
                 
                 notification_manager.notify_sla_event(ticket, "ADVERTENCIA", sla_type, time_info, list(set(recipients)))
+                SLA_NOTIFICATIONS.inc(event='advertencia')
                 ticket.sla_warning_sent_level = current_warning_level
                 db.add(ticket)
 
         db.commit()
+        ticket_events.publish_many(ticket_events.UPDATED, dict(violated_tickets))
 
     except Exception as e:
         logger.error(f"Error en el verificador de SLA: {e}")
@@ -0,0 +1,79 @@
+# --- Bus de eventos de tickets (en proceso) ---
+# Las acciones que modifican tickets publican aquí un evento, y las páginas abiertas (p. ej. el dashboard)
+# se suscriben para actualizar solo el ticket afectado en lugar de recargar toda la tabla y los gráficos.
+# Las acciones sobre varios tickets publican un solo lote con `publish_many`.
+from models import Ticket
+
+CREATED = 'created'
+ASSIGNED = 'assigned'
+STATUS_CHANGED = 'status_changed'
+UPDATED = 'updated'
+
+_subscribers: list = []
+_batch_subscribers: list = []
+
+
+def subscribe(callback):
+    """
+    Registra `callback(event_type, ticket_id, previous)`, donde `previous` es el estado del ticket
+    antes del cambio (ver `snapshot`) o `None` si el ticket es nuevo.
+    Retorna una función que cancela la suscripción.
+    """
+    _subscribers.append(callback)
+
+    def unsubscribe():
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+    return unsubscribe
+
+
+def subscribe_batch(callback):
+    """
+    Registra `callback(event_type, previous_by_id)`, que recibe en una sola llamada todos los tickets de una
+    publicación (`{ticket_id: previous}`). Sirve a los suscriptores que consultan la BD por cada evento.
+    Retorna una función que cancela la suscripción.
+    """
+    _batch_subscribers.append(callback)
+
+    def unsubscribe():
+        if callback in _batch_subscribers:
+            _batch_subscribers.remove(callback)
+    return unsubscribe
+
+
+def snapshot(ticket: Ticket) -> dict:
+    """Captura los campos de un ticket que afectan a tablas y contadores. Debe llamarse antes de modificarlo."""
+    return {
+        'status': ticket.status,
+        'urgency': ticket.urgency,
+        'technician_id': ticket.technician_id,
+        'technician_name': ticket.technician.username if ticket.technician else None,
+        'created_at': ticket.created_at,
+        'assigned_at': ticket.assigned_at,
+        'resolved_at': ticket.resolved_at,
+    }
+
+
+def publish(event_type: str, ticket_id: int, previous: dict | None = None):
+    """Notifica un cambio en un ticket a todos los suscriptores. Debe llamarse después del commit."""
+    publish_many(event_type, {ticket_id: previous})
+
+
+def publish_many(event_type: str, previous_by_id: dict[int, dict | None]):
+    """
+    Notifica el mismo cambio en varios tickets (p. ej. una acción masiva). Los suscriptores de `subscribe_batch`
+    reciben todos los tickets en una sola llamada; los demás, un evento por ticket. Debe llamarse después del commit.
+    """
+    if not previous_by_id:
+        return
+    for callback in list(_batch_subscribers):
+        try:
+            callback(event_type, previous_by_id)
+        except Exception as e:
+            print(f"Error al procesar el evento '{event_type}' de {len(previous_by_id)} ticket(s): {e}")
+    for ticket_id, previous in previous_by_id.items():
+        for callback in list(_subscribers):
+            try:
+                callback(event_type, ticket_id, previous)
+            except Exception as e:
+                print(f"Error al procesar el evento '{event_type}' del ticket #{ticket_id}: {e}")
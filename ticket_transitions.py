@@ -0,0 +1,241 @@
+# --- Transiciones de estado de los tickets ---
+# Cada acción sobre un ticket (asignar, clasificar, rechazar, reasignar, actualizar) se aplica con un único
+# `UPDATE ... WHERE id = :id AND status IN (...)` condicionado al estado en que el usuario vio el ticket,
+# seguido del INSERT de sus entradas del historial, en una sola transacción. No hay lecturas previas: si otro
+# usuario cambió el ticket antes, el UPDATE no afecta ninguna fila y se lanza `TransitionConflict` en lugar
+# de sobrescribir su cambio.
+#
+# `expected` es el estado del ticket tal como lo mostró la página (ver `ticket_events.snapshot`); el mismo
+# diccionario se usa después como `previous` al publicar el evento.
+#
+# Las acciones masivas del dashboard (`bulk_*`) aplican el mismo cambio a muchos tickets con un solo
+# `UPDATE ... WHERE id IN (...) AND status IN (...)` y un solo INSERT múltiple del historial. Los tickets que
+# ya no están en un estado válido para la acción se omiten y se informan, en lugar de fallar todo el lote.
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from sqlalchemy import update, insert
+
+from database import SessionLocal
+from models import Ticket, TicketUpdate, TicketStatus, TicketUrgency, User
+
+OPEN_STATUSES = (TicketStatus.ASIGNADO, TicketStatus.EN_PROCESO)
+
+
+class TransitionConflict(Exception):
+    """El ticket ya no está en el estado esperado: otro usuario lo modificó (o no existe)."""
+
+    def __init__(self, ticket_id: int, current_status: TicketStatus | None):
+        self.ticket_id = ticket_id
+        self.current_status = current_status
+        if current_status is None:
+            message = f"El ticket #{ticket_id} no existe."
+        else:
+            message = f"El ticket #{ticket_id} fue modificado por otro usuario (estado actual: {current_status.value}). Se recargó la vista."
+        super().__init__(message)
+
+
+def _apply(ticket_id: int, author_id: int, comments: list[str], values: dict,
+           allowed_statuses: tuple[TicketStatus, ...] | None = None, expected: dict | None = None, **conditions):
+    """
+    Ejecuta el UPDATE condicionado y los INSERT del historial en una transacción.
+
+    El UPDATE exige que el estado esté en `allowed_statuses` y, si se indica `expected`, que el estado y el
+    técnico sigan siendo los que vio el usuario. `conditions` agrega igualdades sobre otras columnas.
+    """
+    where = [Ticket.id == ticket_id]
+    if allowed_statuses:
+        if expected and expected['status'] not in allowed_statuses:
+            raise TransitionConflict(ticket_id, expected['status'])
+        statuses = [expected['status']] if expected else list(allowed_statuses)
+        where.append(Ticket.status.in_(statuses))
+    if expected:
+        where.append(Ticket.technician_id == expected['technician_id'] if expected['technician_id'] is not None
+                     else Ticket.technician_id.is_(None))
+    for column, value in conditions.items():
+        where.append(getattr(Ticket, column) == value)
+
+    db = SessionLocal()
+    try:
+        # Sin cambios de columnas (p. ej. solo un comentario) el UPDATE igual verifica las condiciones.
+        result = db.execute(
+            update(Ticket).where(*where).values(values or {Ticket.status: Ticket.status})
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            db.rollback()
+            raise TransitionConflict(ticket_id, db.query(Ticket.status).filter(Ticket.id == ticket_id).scalar())
+        if comments:
+            db.execute(insert(TicketUpdate), [{'ticket_id': ticket_id, 'author_id': author_id, 'comment': comment}
+                                              for comment in comments])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def update_details(ticket_id: int, author_id: int, title: str, description: str, expected_title: str,
+                   expected_description: str | None) -> bool:
+    """Cambia título y descripción. Retorna `False` si no había cambios."""
+    comments, values = [], {}
+    if title != expected_title:
+        comments.append(f"Título actualizado a: '{title}'.")
+        values[Ticket.title] = title
+    if description != expected_description:
+        comments.append("Descripción actualizada.")
+        values[Ticket.description] = description
+    if not comments:
+        return False
+    # Se exige que el texto no haya cambiado desde que se abrió el editor, para no pisar otra edición.
+    _apply(ticket_id, author_id, ["\n".join(comments)], values, title=expected_title, description=expected_description)
+    return True
+
+
+def assign(ticket_id: int, author_id: int, technician_id: int, technician_name: str, expected: dict | None = None):
+    """Asigna un ticket nuevo ya clasificado."""
+    _apply(ticket_id, author_id, [f"Ticket asignado a {technician_name}."],
+           {Ticket.technician_id: technician_id, Ticket.status: TicketStatus.ASIGNADO,
+            Ticket.assigned_at: datetime.now(timezone.utc)},
+           allowed_statuses=(TicketStatus.NUEVO,), expected=expected)
+
+
+def classify_and_assign(ticket_id: int, author_id: int, problem_type_id: int, problem_type_name: str,
+                        urgency: TicketUrgency, location_id: int, location_description: str,
+                        technician_id: int, technician_name: str, expected: dict | None = None):
+    """Clasifica un ticket nuevo (tipo, urgencia y ubicación) y lo asigna."""
+    comments = [
+        f"Ticket clasificado con urgencia '{urgency.name}', tipo '{problem_type_name}' y ubicación '{location_description}'.",
+        f"Ticket asignado a {technician_name}.",
+    ]
+    _apply(ticket_id, author_id, comments,
+           {Ticket.problem_type_id: problem_type_id, Ticket.urgency: urgency, Ticket.location_id: location_id,
+            Ticket.technician_id: technician_id, Ticket.status: TicketStatus.ASIGNADO,
+            Ticket.assigned_at: datetime.now(timezone.utc)},
+           allowed_statuses=(TicketStatus.NUEVO,), expected=expected)
+
+
+def reject(ticket_id: int, author_id: int, reason: str, expected: dict | None = None):
+    """Rechaza un ticket nuevo."""
+    _apply(ticket_id, author_id, [f"Ticket Rechazado. Motivo: {reason}"], {Ticket.status: TicketStatus.RECHAZADO},
+           allowed_statuses=(TicketStatus.NUEVO,), expected=expected)
+
+
+def reassign(ticket_id: int, author_id: int, technician_id: int, technician_name: str, reason: str,
+             expected: dict | None = None):
+    """Cambia el técnico de un ticket abierto."""
+    old_name = expected['technician_name'] if expected and expected['technician_name'] else 'Sin asignar'
+    _apply(ticket_id, author_id, [f"Ticket reasignado de {old_name} a {technician_name}. Motivo: {reason}"],
+           {Ticket.technician_id: technician_id, Ticket.assigned_at: datetime.now(timezone.utc)},
+           allowed_statuses=OPEN_STATUSES, expected=expected)
+
+
+def technician_update(ticket_id: int, author_id: int, new_status: TicketStatus | None, comment: str | None,
+                      expected: dict) -> bool:
+    """
+    Comentario y/o cambio de estado del técnico asignado. Retorna `True` si cambió el estado.
+    Solo lo puede hacer el técnico asignado mientras el ticket está abierto.
+    """
+    comments, values = [], {}
+    if comment:
+        comments.append(comment)
+    status_changed = bool(new_status) and new_status != expected['status']
+    if status_changed:
+        comments.append(f"Estado cambiado de {expected['status'].value} a {new_status.value}.")
+        values[Ticket.status] = new_status
+        if new_status == TicketStatus.RESUELTO:
+            values[Ticket.resolved_at] = datetime.now(timezone.utc)
+    _apply(ticket_id, author_id, comments, values, allowed_statuses=OPEN_STATUSES, expected=expected,
+           technician_id=author_id)
+    return status_changed
+
+
+# Resultado de una acción masiva: `previous` tiene el estado anterior (formato de `ticket_events.snapshot`) de
+# cada ticket modificado, `comments` la entrada del historial de cada uno y `skipped` los tickets omitidos.
+BulkResult = namedtuple('BulkResult', ['previous', 'comments', 'skipped'])
+
+
+def _apply_bulk(ticket_ids: list[int], author_id: int, comment, values: dict,
+                allowed_statuses: tuple[TicketStatus, ...], *criteria) -> BulkResult:
+    """
+    Aplica `values` a todos los tickets de `ticket_ids` que siguen en `allowed_statuses` (y cumplen `criteria`)
+    con un UPDATE y un INSERT del historial, en una transacción. `comment(previous)` arma la entrada del
+    historial de cada ticket a partir de su estado anterior.
+    """
+    ticket_ids = list(dict.fromkeys(ticket_ids))
+    where = [Ticket.id.in_(ticket_ids), Ticket.status.in_(allowed_statuses), *criteria]
+
+    db = SessionLocal()
+    try:
+        # Se bloquean las filas que cumplen las condiciones: el UPDATE afecta exactamente a los tickets leídos.
+        rows = db.query(Ticket.id, Ticket.status, Ticket.urgency, Ticket.technician_id, Ticket.created_at,
+                        Ticket.assigned_at, Ticket.resolved_at).filter(*where).with_for_update().all()
+        technician_ids = {row.technician_id for row in rows if row.technician_id is not None}
+        technician_names = dict(db.query(User.id, User.username).filter(User.id.in_(technician_ids)).all()) if technician_ids else {}
+
+        previous = {
+            row.id: {
+                'status': row.status,
+                'urgency': row.urgency,
+                'technician_id': row.technician_id,
+                'technician_name': technician_names.get(row.technician_id),
+                'created_at': row.created_at,
+                'assigned_at': row.assigned_at,
+                'resolved_at': row.resolved_at,
+            }
+            for row in rows
+        }
+        comments = {ticket_id: comment(state) for ticket_id, state in previous.items()}
+        if previous:
+            db.execute(
+                update(Ticket).where(Ticket.id.in_(list(previous)), Ticket.status.in_(allowed_statuses))
+                .values(values).execution_options(synchronize_session=False)
+            )
+            db.execute(insert(TicketUpdate), [{'ticket_id': ticket_id, 'author_id': author_id, 'comment': text}
+                                              for ticket_id, text in comments.items()])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    return BulkResult(previous, comments, [ticket_id for ticket_id in ticket_ids if ticket_id not in previous])
+
+
+def bulk_classify(ticket_ids: list[int], author_id: int, problem_type_id: int, problem_type_name: str,
+                  urgency: TicketUrgency, location_id: int | None = None,
+                  location_description: str | None = None) -> BulkResult:
+    """Clasifica tickets nuevos (tipo, urgencia y opcionalmente ubicación) sin asignarlos."""
+    values = {Ticket.problem_type_id: problem_type_id, Ticket.urgency: urgency}
+    text = f"Ticket clasificado con urgencia '{urgency.name}' y tipo '{problem_type_name}'."
+    if location_id is not None:
+        values[Ticket.location_id] = location_id
+        text = f"Ticket clasificado con urgencia '{urgency.name}', tipo '{problem_type_name}' y ubicación '{location_description}'."
+    return _apply_bulk(ticket_ids, author_id, lambda previous: text, values, (TicketStatus.NUEVO,))
+
+
+def bulk_assign(ticket_ids: list[int], author_id: int, technician_id: int, technician_name: str) -> BulkResult:
+    """Asigna tickets nuevos ya clasificados; los que no tienen tipo de problema se omiten."""
+    return _apply_bulk(ticket_ids, author_id, lambda previous: f"Ticket asignado a {technician_name}.",
+                       {Ticket.technician_id: technician_id, Ticket.status: TicketStatus.ASIGNADO,
+                        Ticket.assigned_at: datetime.now(timezone.utc)},
+                       (TicketStatus.NUEVO,), Ticket.problem_type_id.isnot(None))
+
+
+def bulk_change_status(ticket_ids: list[int], author_id: int, new_status: TicketStatus) -> BulkResult:
+    """Pasa tickets abiertos a `new_status` (en proceso o resuelto)."""
+    values = {Ticket.status: new_status}
+    if new_status == TicketStatus.RESUELTO:
+        values[Ticket.resolved_at] = datetime.now(timezone.utc)
+    allowed = tuple(status for status in OPEN_STATUSES if status != new_status)
+    return _apply_bulk(ticket_ids, author_id,
+                       lambda previous: f"Estado cambiado de {previous['status'].value} a {new_status.value}.",
+                       values, allowed)
+
+
+def bulk_reject(ticket_ids: list[int], author_id: int, reason: str) -> BulkResult:
+    """Rechaza tickets nuevos."""
+    return _apply_bulk(ticket_ids, author_id, lambda previous: f"Ticket Rechazado. Motivo: {reason}",
+                       {Ticket.status: TicketStatus.RECHAZADO}, (TicketStatus.NUEVO,))
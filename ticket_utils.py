@@ -1,37 +1,109 @@
-from nicegui import app
+import time
+
 from sqlalchemy.orm import joinedload
 from sqlalchemy import func
 
 from database import SessionLocal
-from models import Ticket, User, UserRole, TicketUrgency
+from models import Ticket, UserRole, TicketUrgency
 from datetime_utils import to_local_time
+import ticket_events
+import session_user
+
+# --- Años disponibles para los filtros ---
+# Se calculan con MIN/MAX(created_at), que con el índice de la columna se resuelven leyendo sus extremos,
+# y se guardan en memoria hasta que se crea un ticket o vence el TTL.
+AVAILABLE_YEARS_TTL_SECONDS = 600
+_available_years_cache = {'years': None, 'loaded_at': 0.0}
+
+def get_available_years() -> list[int]:
+    """Retorna los años con tickets, del más reciente al más antiguo."""
+    now = time.monotonic()
+    if _available_years_cache['years'] is None or now - _available_years_cache['loaded_at'] > AVAILABLE_YEARS_TTL_SECONDS:
+        db = SessionLocal()
+        try:
+            first, last = db.query(func.min(Ticket.created_at), func.max(Ticket.created_at)).one()
+        finally:
+            db.close()
+        years = list(range(last.year, first.year - 1, -1)) if first and last else []
+        _available_years_cache.update({'years': years, 'loaded_at': now})
+    return list(_available_years_cache['years'])
+
+def _invalidate_available_years(event_type, ticket_id, previous):
+    if event_type == ticket_events.CREATED:
+        _available_years_cache['years'] = None
+
+ticket_events.subscribe(_invalidate_available_years)
+
+def _ticket_list_query(db):
+    """Consulta base de tickets con las relaciones que se muestran en las tablas."""
+    return db.query(Ticket).options(
+        joinedload(Ticket.creator),
+        joinedload(Ticket.requester),
+        joinedload(Ticket.technician),
+        joinedload(Ticket.problem_type),
+        joinedload(Ticket.location)
+    )
+
+def ticket_to_row(t: Ticket) -> dict:
+    """Convierte un ticket en la fila que muestran las tablas de tickets."""
+    return {
+        'id': t.id,
+        'title': t.title,
+        'description': t.description,
+        'status': t.status.value,
+        'urgency': t.urgency.value if t.urgency else 'Sin clasificar',
+        'requester_name': t.requester.username if t.requester else 'N/A',
+        'technician_name': t.technician.username if t.technician else 'Sin asignar',
+        'location_name': t.location.description if t.location else 'Sin especificar',
+        'created_at': to_local_time(t.created_at),
+    }
+
+def is_ticket_visible(ticket: Ticket, role: str, user_id: int) -> bool:
+    """Aplica a un solo ticket el mismo filtro de visibilidad por rol que `load_tickets`."""
+    if role == UserRole.TECNICO.value:
+        return ticket.technician_id == user_id
+    if role == UserRole.AUTOSERVICIO.value:
+        return ticket.creator_id == user_id
+    return True
+
+def load_ticket_rows(ticket_ids: list[int], role: str, user_id: int) -> dict[int, tuple[dict | None, dict]]:
+    """
+    Carga en una consulta los tickets indicados para actualizar una tabla ya construida.
+    Retorna `{id: (fila, estado)}`: la fila es `None` si el usuario no puede ver el ticket, y los tickets que
+    no existen no aparecen. El estado tiene el formato de `ticket_events.snapshot`.
+    """
+    db = SessionLocal()
+    try:
+        tickets = _ticket_list_query(db).filter(Ticket.id.in_(ticket_ids)).all()
+        return {
+            ticket.id: (ticket_to_row(ticket) if is_ticket_visible(ticket, role, user_id) else None,
+                        ticket_events.snapshot(ticket))
+            for ticket in tickets
+        }
+    finally:
+        db.close()
 
 def load_tickets(status=None, urgency=None, technician_id=None, search_term=None):
     """
     Carga los tickets desde la base de datos, aplicando filtros opcionales.
     También aplica filtros de visibilidad según el rol del usuario (técnicos, autoservicio, etc.).
     """
+    user = session_user.current_user()
+    if not user:
+        return []
+    role = user.role
+
     db = SessionLocal()
     try:
-        role = app.storage.user.get('role')
-        user = db.query(User).filter(User.username == app.storage.user.get('username')).first()
-        if not user:
-            return []
-
-        query = db.query(Ticket).options(
-            joinedload(Ticket.creator),
-            joinedload(Ticket.requester),
-            joinedload(Ticket.technician),
-            joinedload(Ticket.problem_type),
-            joinedload(Ticket.location)
-        ).order_by(Ticket.created_at.desc())
+
+        query = _ticket_list_query(db).order_by(Ticket.created_at.desc())
 
         # Aplicar filtro de visibilidad por rol
         if role == UserRole.TECNICO.value:
             query = query.filter(Ticket.technician_id == user.id)
         elif role == UserRole.AUTOSERVICIO.value:
             query = query.filter(Ticket.creator_id == user.id)
-        
+
         if status:
             query = query.filter(Ticket.status == status)
         if urgency:
@@ -42,17 +114,7 @@ def load_tickets(status=None, urgency=None, technician_id=None, search_term=None
             query = query.filter(Ticket.title.ilike(f'%{search_term}%'))
 
         tickets = query.all()
-        
-        return [{
-            'id': t.id,
-            'title': t.title,
-            'description': t.description,
-            'status': t.status.value,
-            'urgency': t.urgency.value if t.urgency else 'Sin clasificar',
-            'requester_name': t.requester.username if t.requester else 'N/A',
-            'technician_name': t.technician.username if t.technician else 'Sin asignar',
-            'location_name': t.location.description if t.location else 'Sin especificar',
-            'created_at': to_local_time(t.created_at),
-        } for t in tickets]
+
+        return [ticket_to_row(t) for t in tickets]
     finally:
         db.close()
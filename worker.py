@@ -0,0 +1,76 @@
+# --- Proceso de tareas de fondo ---
+# Ejecuta el lector de correo, el verificador de SLA, el armado de los reportes mensuales y el envío de sus
+# notificaciones sin NiceGUI, en un proceso separado del que sirve la interfaz. Se usa junto con
+# `BACKGROUND_TASKS=worker` en el proceso web (ver background_jobs.py):
+#
+#     BACKGROUND_TASKS=worker python main.py
+#     python worker.py
+#
+# Se pueden iniciar varios workers: cada tarea la ejecuta uno solo a la vez (ver scheduler.py).
+import asyncio
+import logging
+import os
+import signal
+
+from dotenv import load_dotenv
+
+load_dotenv()  # Carga las variables de entorno desde el archivo .env
+
+from database import init_db
+import background_jobs
+import metrics
+import notification_manager
+import scheduler
+
+logger = logging.getLogger(__name__)
+
+# Puerto en el que el worker expone `/metrics` (vacío para no exponerlas).
+WORKER_METRICS_PORT = os.environ.get("WORKER_METRICS_PORT", "")
+# Segundos que se espera, al detener el worker, a que se envíen los correos pendientes (retenidos para agruparlos,
+# por el límite SMTP o en pleno envío).
+WORKER_SHUTDOWN_TIMEOUT_SECONDS = float(os.environ.get("WORKER_SHUTDOWN_TIMEOUT_SECONDS", 30))
+
+
+async def _drain_outbound_queue():
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + WORKER_SHUTDOWN_TIMEOUT_SECONDS
+    # Las notificaciones retenidas para agruparlas se envían ya: sus temporizadores no llegarían a vencer.
+    notification_manager.flush_pending_notifications()
+    while notification_manager.outbound_queue.depth() and loop.time() < deadline:
+        await asyncio.sleep(0.5)
+    in_flight = notification_manager.sends_in_flight()
+    if in_flight:
+        _, in_flight = await asyncio.wait(in_flight, timeout=max(0.0, deadline - loop.time()))
+    pending = notification_manager.outbound_queue.depth() + len(in_flight)
+    if pending:
+        logger.warning(f"Se descartan {pending} correo(s) pendiente(s) al detener el worker.")
+
+
+async def run_worker():
+    loop = asyncio.get_running_loop()
+    stop_requested = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_requested.set)
+
+    background_jobs.start_jobs()
+    print(f"Worker {scheduler.INSTANCE_ID} iniciado.")
+    await stop_requested.wait()
+
+    print("Deteniendo tareas de fondo...")
+    scheduler.stop()
+    await _drain_outbound_queue()
+    print("Tareas de fondo detenidas.")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S')
+    init_db()
+    if WORKER_METRICS_PORT:
+        metrics.serve(int(WORKER_METRICS_PORT))
+        print(f"Métricas disponibles en el puerto {WORKER_METRICS_PORT} (/metrics).")
+    asyncio.run(run_worker())
+
+
+if __name__ == "__main__":
+    main()